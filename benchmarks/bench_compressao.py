@@ -0,0 +1,136 @@
+"""
+Benchmark da compressão de respostas: custo de CPU x banda economizada.
+
+Monta páginas típicas de /sessoes (JSON no formato de SessaoResponse, com
+variação realista de IDs, horários e salas) e um relatório em Markdown, e mede
+para cada codificação disponível (gzip, br, zstd) e nível:
+- tamanho comprimido e razão de compressão
+- tempo de compressão (mediana, em ms) e de descompressão no cliente
+- banda de equilíbrio: abaixo dessa velocidade de rede (Mbit/s), o tempo de
+  transmissão economizado supera o custo de comprimir + descomprimir
+
+Uso:
+    python -m benchmarks.bench_compressao
+    python -m benchmarks.bench_compressao --paginas 100 1000 --repeticoes 30 --banda-mbps 10 100
+"""
+import argparse
+import gzip
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+from src.services.sessao_service import SessaoService
+from src.utils import compressao
+from src.utils.serializacao import para_json
+
+NIVEIS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 9), "zstd": (1, 3, 6, 12)}
+
+
+def _descompressores() -> Dict[str, Callable[[bytes], bytes]]:
+    descompressores = {"gzip": gzip.decompress}
+    if compressao.brotli is not None:
+        descompressores["br"] = compressao.brotli.decompress
+    if compressao.zstandard is not None:
+        descompressores["zstd"] = compressao.zstandard.ZstdDecompressor().decompress
+    return descompressores
+
+
+def pagina_sessoes(quantidade: int, semente: int = 42) -> bytes:
+    """Página de sessões serializada como na rota GET /sessoes"""
+    rng = random.Random(semente)
+    salas = [
+        {"coworking_id": c, "nome_da_sala": f"Sala {c} - Unidade {c // 3 + 1}", "unidade_id": c // 3 + 1,
+         "unidade_nome": f"Sede - Subsecional {c // 6 + 1}", "subsecional_id": c // 6 + 1,
+         "subsecional_nome": f"Subsecional {c // 6 + 1}"}
+        for c in range(1, 13)
+    ]
+    linhas = []
+    for i in range(quantidade):
+        sala = rng.choice(salas)
+        inicio = datetime(2025, 3, 3, 8) + timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 600),
+                                                     seconds=rng.randint(0, 59))
+        ativa = rng.random() < 0.1
+        linhas.append({
+            "sessao_id": 250_000 - i, "data": inicio.date(), "inicio_de_sessao": inicio,
+            "final_de_sessao": None if ativa else inicio + timedelta(seconds=int(rng.lognormvariate(8, 0.6))),
+            "ativado": ativa, "computador_id": sala["coworking_id"] * 10 + rng.randint(0, 9),
+            "usuario_id": rng.randint(1, 20_000), "administrador_id": sala["coworking_id"], **sala,
+        })
+    return para_json([SessaoService._linha_to_dict(linha) for linha in linhas])
+
+
+def relatorio_markdown(semente: int = 42) -> bytes:
+    """Relatório com a estrutura típica do gerado pelo LLM (seções, listas e tabelas)"""
+    rng = random.Random(semente)
+    partes = ["# Relatório de Uso - Sala 1\n\n## Sumário Executivo\n\n"]
+    for secao in ("Sessões Ativas", "Histórico", "Picos de Acesso", "Frequência Mensal", "Recomendações"):
+        partes.append(f"## {secao}\n\n")
+        partes.append("A sala apresentou utilização consistente ao longo do período analisado, "
+                      "com concentração de acessos no início da tarde e queda nas sextas-feiras.\n\n")
+        partes.append("| Mês | Sessões | Média (min) |\n|---|---|---|\n")
+        for mes in range(1, 13):
+            partes.append(f"| {date(2025, mes, 1):%m/%Y} | {rng.randint(200, 900)} | {rng.uniform(20, 90):.1f} |\n")
+        partes.append("\n")
+        for _ in range(5):
+            partes.append(f"- Computador {rng.randint(1, 40)}: {rng.randint(10, 300)} sessões, "
+                          f"{rng.uniform(0, 100):.1f}% de ocupação\n")
+        partes.append("\n")
+    return "".join(partes).encode("utf-8")
+
+
+def medir(funcao: Callable[[], bytes], repeticoes: int) -> Tuple[float, bytes]:
+    tempos = []
+    resultado = b""
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, nargs="+", default=[50, 100, 500, 1000],
+                        help="Tamanhos de página de sessões")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--banda-mbps", type=float, nargs="+", default=[10.0, 100.0],
+                        help="Velocidades de rede para o ganho líquido por resposta")
+    args = parser.parse_args()
+
+    compressores = compressao.compressores_disponiveis()
+    descompressores = _descompressores()
+    ausentes = sorted(set(NIVEIS) - set(compressores))
+    padrao = compressao.niveis_padrao()
+    print(f"Codificações: {', '.join(compressores)}"
+          + (f" (não instaladas: {', '.join(ausentes)})" if ausentes else ""))
+    print(f"Níveis configurados: " + ", ".join(f"{c}={padrao[c]}" for c in compressores))
+
+    cargas: List[Tuple[str, bytes]] = [(f"sessoes[{n}]", pagina_sessoes(n)) for n in args.paginas]
+    cargas.append(("relatorio.md", relatorio_markdown()))
+
+    cabecalho_banda = "".join(f"{f'líquido@{b:g}Mbps':>18}" for b in args.banda_mbps)
+    for nome, corpo in cargas:
+        print(f"\n{nome}: {len(corpo) / 1024:.1f} KiB")
+        print(f"  {'codificação':<12}{'nível':>6}{'KiB':>9}{'razão':>8}{'comp ms':>10}{'desc ms':>10}"
+              f"{'equilíbrio':>14}{cabecalho_banda}")
+        for codificacao, compressor in compressores.items():
+            for nivel in NIVEIS[codificacao]:
+                ms_comp, comprimido = medir(lambda: compressor(corpo, nivel), args.repeticoes)
+                ms_desc, original = medir(lambda: descompressores[codificacao](comprimido), args.repeticoes)
+                assert original == corpo
+                economizado_bits = (len(corpo) - len(comprimido)) * 8
+                custo_s = (ms_comp + ms_desc) / 1000
+                equilibrio = economizado_bits / custo_s / 1e6 if custo_s else float("inf")
+                # Tempo de transmissão economizado menos o custo de CPU, em ms por resposta
+                liquidos = "".join(
+                    f"{(economizado_bits / (banda * 1e6) - custo_s) * 1000:>15.2f} ms" for banda in args.banda_mbps
+                )
+                marcador = " *" if nivel == padrao[codificacao] else ""
+                print(f"  {codificacao:<12}{nivel:>6}{len(comprimido) / 1024:>9.1f}{len(corpo) / len(comprimido):>7.1f}x"
+                      f"{ms_comp:>10.3f}{ms_desc:>10.3f}{equilibrio:>9.0f} Mbps{liquidos}{marcador}")
+    print("\n* nível configurado. Equilíbrio: a compressão compensa em redes mais lentas que esse valor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark do cálculo de ocupação (sessões simultâneas) de ocupacao_temporal.
+
+Gera sessões sintéticas espalhadas por um ano (início uniforme, duração log-normal
+em torno de 50 minutos, como no gerador de dados) e mede:
+- curva_concorrencia: ordenação dos eventos + soma acumulada
+- ocupacao_por_intervalo: média/máximo por intervalo (1 ano em intervalos de 1 hora)
+- para_segundos: conversão de datetimes (o custo por linha vinda do banco)
+- varredura em Python puro (referência, só nos tamanhos menores), conferindo o resultado
+
+Uso:
+    python -m benchmarks.bench_ocupacao
+    python -m benchmarks.bench_ocupacao --sessoes 1000000 5000000 --repeticoes 3
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+import numpy as np
+from src.utils.ocupacao_temporal import curva_concorrencia, ocupacao_por_intervalo, para_segundos
+
+ANO_SEGUNDOS = 365 * 86400
+PASSO_SEGUNDOS = 3600
+LIMITE_PYTHON = 200_000
+
+
+def sessoes_sinteticas(quantidade: int, semente: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(semente)
+    inicios = rng.integers(0, ANO_SEGUNDOS, quantidade, dtype=np.int64)
+    fins = inicios + rng.lognormal(8, 0.6, quantidade).astype(np.int64)
+    return inicios, fins
+
+
+def varredura_python(inicios: List[int], fins: List[int]) -> Tuple[List[int], List[int]]:
+    """Mesma curva com eventos ordenados em Python (fins antes dos inícios nos empates)"""
+    eventos = sorted([(fim, -1) for fim in fins] + [(inicio, 1) for inicio in inicios])
+    instantes: List[int] = []
+    sessoes: List[int] = []
+    abertas = 0
+    for instante, delta in eventos:
+        abertas += delta
+        if instantes and instantes[-1] == instante:
+            sessoes[-1] = abertas
+        else:
+            instantes.append(instante)
+            sessoes.append(abertas)
+    return instantes, sessoes
+
+
+def medir(funcao: Callable, repeticoes: int):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 2_000_000, 5_000_000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'sessões':>10}{'curva ms':>11}{'intervalos ms':>15}{'total ms':>11}{'pico':>7}{'python ms':>12}")
+    for quantidade in args.sessoes:
+        inicios, fins = sessoes_sinteticas(quantidade)
+        ms_curva, curva = medir(lambda: curva_concorrencia(inicios, fins), args.repeticoes)
+        ms_serie, serie = medir(
+            lambda: ocupacao_por_intervalo(curva, 0, ANO_SEGUNDOS, PASSO_SEGUNDOS), args.repeticoes
+        )
+        referencia = ""
+        if quantidade <= LIMITE_PYTHON:
+            ms_python, (instantes, sessoes) = medir(
+                lambda: varredura_python(inicios.tolist(), fins.tolist()), 1
+            )
+            assert instantes == curva.instantes.tolist() and sessoes == curva.sessoes.tolist()
+            referencia = f"{ms_python:.1f}"
+        print(f"{quantidade:>10}{ms_curva:>11.1f}{ms_serie:>15.1f}{ms_curva + ms_serie:>11.1f}"
+              f"{int(serie.maximo.max()):>7}{referencia:>12}")
+
+    base = datetime(2025, 1, 1)
+    datas = [base + timedelta(seconds=int(s)) for s in sessoes_sinteticas(100_000)[0]]
+    ms_conversao, _ = medir(lambda: para_segundos(datas), args.repeticoes)
+    print(f"\npara_segundos: {ms_conversao:.1f} ms por 100 mil datetimes")
+
+
+if __name__ == "__main__":
+    main()
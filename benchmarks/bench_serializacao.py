@@ -0,0 +1,124 @@
+"""
+Micro-benchmark da serialização das listagens de sessões.
+
+Compara, para N sessões sintéticas:
+- caminho padrão: SessaoResponse.model_validate por linha (service) seguido da
+  validação/serialização do response_model (FastAPI)
+- caminho rápido: linha projetada (tupla de colunas) -> dicionário + para_json
+  (orjson quando disponível)
+- msgpack: as linhas projetadas em MessagePack tabular (Accept: application/msgpack),
+  se o pacote estiver instalado
+
+Para os caminhos rápido e msgpack, mede também o tamanho do payload e a
+decodificação no cliente.
+
+Uso:
+    python -m benchmarks.bench_serializacao --linhas 1000 --repeticoes 50
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from pydantic import TypeAdapter
+from src.schemas.sessao import SessaoResponse
+from src.services.sessao_service import SessaoService, COLUNAS_EXPORTACAO
+from src.utils import serializacao
+
+
+def gerar_sessoes(quantidade: int) -> list:
+    subsecional = SimpleNamespace(subsecional_id=1, nome="Subseccional Recife")
+    unidade = SimpleNamespace(unidade_id=1, nome="Sede", subsecional=subsecional)
+    sala = SimpleNamespace(coworking_id=1, nome_da_sala="Sala 1", unidade=unidade, subsecional=subsecional)
+    computador = SimpleNamespace(sala=sala)
+    inicio = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        SimpleNamespace(
+            sessao_id=i,
+            data=date(2025, 1, 1),
+            inicio_de_sessao=inicio + timedelta(minutes=i),
+            final_de_sessao=inicio + timedelta(minutes=i + 45),
+            ativado=False,
+            computador_id=i % 40 + 1,
+            usuario_id=i % 300 + 1,
+            administrador_id=1,
+            computador=computador,
+        )
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def para_linhas(sessoes: list) -> List[dict]:
+    """Linhas no formato de SessaoRepository._query_projetada"""
+    linhas = []
+    for s in sessoes:
+        sala = s.computador.sala
+        linhas.append({
+            "sessao_id": s.sessao_id, "data": s.data, "inicio_de_sessao": s.inicio_de_sessao,
+            "final_de_sessao": s.final_de_sessao, "ativado": s.ativado, "computador_id": s.computador_id,
+            "usuario_id": s.usuario_id, "administrador_id": s.administrador_id,
+            "coworking_id": sala.coworking_id, "nome_da_sala": sala.nome_da_sala,
+            "unidade_id": sala.unidade.unidade_id, "unidade_nome": sala.unidade.nome,
+            "subsecional_id": sala.subsecional.subsecional_id, "subsecional_nome": sala.subsecional.nome,
+        })
+    return linhas
+
+
+def medir(funcao, repeticoes: int) -> List[float]:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    sessoes = gerar_sessoes(args.linhas)
+    linhas = para_linhas(sessoes)
+    service = SessaoService.__new__(SessaoService)  # conversões não usam o banco
+    adaptador = TypeAdapter(List[SessaoResponse])
+
+    def caminho_padrao():
+        respostas = [service._sessao_to_response(s) for s in sessoes]
+        return adaptador.dump_json(adaptador.validate_python(respostas))
+
+    def caminho_rapido():
+        return serializacao.para_json([SessaoService._linha_to_dict(linha) for linha in linhas])
+
+    assert adaptador.validate_json(caminho_padrao()) == adaptador.validate_json(caminho_rapido())
+
+    def caminho_msgpack():
+        return serializacao.tabela_para_msgpack(serializacao.Tabela(linhas, COLUNAS_EXPORTACAO))
+
+    decodificar_json = serializacao.orjson.loads if serializacao.orjson else json.loads
+    caminhos = [("padrão", caminho_padrao, None), ("rápido", caminho_rapido, decodificar_json)]
+    if serializacao.msgpack is not None:
+        tabela = serializacao.msgpack.unpackb(caminho_msgpack())
+        assert [dict(zip(tabela["colunas"], linha)) for linha in tabela["linhas"]] == \
+            json.loads(serializacao.para_json(linhas))
+        caminhos.append(("msgpack", caminho_msgpack, serializacao.msgpack.unpackb))
+
+    print(f"{args.linhas} sessões, {args.repeticoes} repetições "
+          f"({'orjson' if serializacao.orjson else 'json'}"
+          f"{'' if serializacao.msgpack else '; msgpack não instalado'})")
+    for nome, funcao, decodificar in caminhos:
+        tempos = medir(funcao, args.repeticoes)
+        linha = f"  {nome:<8} mediana {statistics.median(tempos):8.2f} ms   mín {min(tempos):8.2f} ms"
+        if decodificar is not None:
+            payload = funcao()
+            tempos_decodificacao = medir(lambda: decodificar(payload), args.repeticoes)
+            linha += (f"   {len(payload) / 1024:8.1f} KiB   decodificação "
+                      f"{statistics.median(tempos_decodificacao):6.2f} ms")
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
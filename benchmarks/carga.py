@@ -0,0 +1,378 @@
+"""
+Teste de carga HTTP da API com um cenário de uso realista.
+
+Usuários virtuais (administradores de sala) executam, em paralelo e sem pausa,
+uma mistura de operações:
+- login de administrador
+- início e finalização de sessões nos computadores da própria sala
+- listagem de /sessoes com filtros e de /sessoes/ativas
+- polling do dashboard (reenviando o ETag recebido em If-None-Match)
+- geração de relatório por um analista (use RELATORIO_LLM_SIMULADO=true no servidor)
+
+Ao final mostra, por rota, requisições, erros, vazão e latência p50/p95/p99.
+Os resultados podem ser salvos (--salvar) e comparados com outra execução
+(--comparar), o que permite confrontar configurações: número de workers do
+servidor, cache do dashboard ligado/desligado, réplica de leitura etc.
+
+Pré-requisitos:
+- base populada com src.database.gerador (usa os usuários admin_sala_N e
+  analista_N com a mesma --senha do gerador)
+- httpx instalado (pip install httpx)
+- DATABASE_URL apontando para o mesmo banco do servidor: o script lê do banco
+  os usuários, salas e computadores livres do cenário
+
+Uso:
+    # servidor já em execução (ex.: uvicorn src.main:app --workers 4)
+    python -m benchmarks.carga --alvo http://localhost:8000 --usuarios 50 --duracao 60 --salvar w4.json
+
+    # aplicação no próprio processo (ASGI), com e sem cache do dashboard
+    RELATORIO_LLM_SIMULADO=true python -m benchmarks.carga --usuarios 20 --salvar com_cache.json
+    RELATORIO_LLM_SIMULADO=true python -m benchmarks.carga --usuarios 20 --sem-cache --comparar com_cache.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depende do ambiente
+    httpx = None
+
+
+API = "/api/v1"
+
+# Peso de cada operação por perfil de carga
+PERFIS = {
+    # Dia comum: predominam consultas e o polling do dashboard
+    "padrao": {"login": 3, "iniciar": 10, "finalizar": 10, "listar": 27, "ativas": 10, "dashboard": 37, "relatorio": 3},
+    # Horário de pico: chegada e saída de advogados dominam
+    "pico": {"login": 5, "iniciar": 30, "finalizar": 25, "listar": 15, "ativas": 5, "dashboard": 18, "relatorio": 2},
+}
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por posto mais próximo (valores já ordenados)"""
+    if not valores:
+        return 0.0
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+class Registro:
+    """Latências (ms) e status por rota"""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.erros: Dict[str, int] = defaultdict(int)
+
+    def adicionar(self, rota: str, status_code: int, latencia_ms: float) -> None:
+        self.latencias[rota].append(latencia_ms)
+        if status_code >= 400:
+            self.erros[rota] += 1
+
+    def resumo(self, duracao: float) -> Dict[str, Dict]:
+        resumo = {}
+        todas = []
+        for rota in sorted(self.latencias):
+            valores = sorted(self.latencias[rota])
+            todas.extend(valores)
+            resumo[rota] = self._estatisticas(valores, self.erros[rota], duracao)
+        resumo["TOTAL"] = self._estatisticas(sorted(todas), sum(self.erros.values()), duracao)
+        return resumo
+
+    @staticmethod
+    def _estatisticas(valores: List[float], erros: int, duracao: float) -> Dict:
+        return {
+            "requisicoes": len(valores),
+            "erros": erros,
+            "rps": round(len(valores) / duracao, 2),
+            "p50_ms": round(percentil(valores, 50), 2),
+            "p95_ms": round(percentil(valores, 95), 2),
+            "p99_ms": round(percentil(valores, 99), 2),
+            "max_ms": round(valores[-1], 2) if valores else 0.0,
+        }
+
+
+def carregar_cenario(usuarios: int) -> Dict:
+    """Lê do banco as salas, administradores, analistas e computadores livres"""
+    from sqlalchemy import func, select
+    from src.database.connection import SessionLocal
+    from src.entities import Administrador_sala_coworking, Analista_de_ti, Computador, Sala_coworking, Sessao
+
+    with SessionLocal() as db:
+        salas = db.query(
+            Sala_coworking.coworking_id,
+            Sala_coworking.unidade_id,
+            Sala_coworking.subsecional_id,
+            Administrador_sala_coworking.admin_id,
+            Administrador_sala_coworking.usuario,
+        ).join(
+            Administrador_sala_coworking, Sala_coworking.administrador_id == Administrador_sala_coworking.admin_id
+        ).order_by(Sala_coworking.coworking_id).limit(usuarios).all()
+        if not salas:
+            raise SystemExit("Nenhuma sala com administrador encontrada: popule a base com src.database.gerador")
+
+        ocupados = select(Sessao.computador_id).where(Sessao.ativado == True, Sessao.final_de_sessao.is_(None))
+        livres = defaultdict(list)
+        for computador_id, ip, coworking_id in db.query(
+            Computador.computador_id, Computador.ip_da_maquina, Computador.coworking_id
+        ).filter(
+            Computador.coworking_id.in_([s.coworking_id for s in salas]),
+            ~Computador.computador_id.in_(ocupados),
+        ):
+            livres[coworking_id].append((computador_id, ip))
+
+        analista = db.query(Analista_de_ti.usuario).order_by(Analista_de_ti.analista_id).limit(1).scalar()
+        usuario_id = db.query(func.min(Sessao.usuario_id)).scalar()
+        ano = db.query(func.max(Sessao.data)).scalar()
+
+    # Cada usuário virtual recebe uma sala; os computadores livres de uma sala são
+    # repartidos entre os usuários que a compartilham (sem disputa pelo mesmo computador)
+    por_sala = defaultdict(list)
+    for i in range(usuarios):
+        por_sala[i % len(salas)].append(i)
+    perfis = []
+    for i in range(usuarios):
+        indice_sala = i % len(salas)
+        sala = salas[indice_sala]
+        colegas = por_sala[indice_sala]
+        perfis.append({
+            "usuario": sala.usuario,
+            "admin_id": sala.admin_id,
+            "coworking_id": sala.coworking_id,
+            "unidade_id": sala.unidade_id,
+            "subsecional_id": sala.subsecional_id,
+            "computadores": livres[sala.coworking_id][colegas.index(i)::len(colegas)],
+        })
+    return {
+        "perfis": perfis,
+        "analista": analista,
+        "usuario_id": usuario_id,
+        "ano": ano.year if ano else date.today().year,
+    }
+
+
+class UsuarioVirtual:
+    def __init__(self, cliente, perfil: Dict, cenario: Dict, senha: str, pesos: Dict[str, int],
+                 registro: Registro, rng: random.Random):
+        self.cliente = cliente
+        self.perfil = perfil
+        self.cenario = cenario
+        self.senha = senha
+        self.registro = registro
+        self.rng = rng
+        self.operacoes = list(pesos)
+        self.pesos = list(pesos.values())
+        self.headers: Dict[str, str] = {}
+        self.headers_analista: Optional[Dict[str, str]] = None
+        self.livres = list(perfil["computadores"])
+        self.abertas: List[tuple] = []
+        self.etags: Dict[Optional[int], str] = {}
+
+    async def _requisitar(self, rota: str, metodo: str, url: str, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resposta = await self.cliente.request(metodo, url, **kwargs)
+            status_code = resposta.status_code
+        except httpx.HTTPError:
+            resposta, status_code = None, 599
+        self.registro.adicionar(rota, status_code, (time.perf_counter() - inicio) * 1000)
+        return resposta
+
+    async def login(self) -> None:
+        resposta = await self._requisitar(
+            "POST /auth/login/administrador", "POST", f"{API}/auth/login/administrador",
+            json={"usuario": self.perfil["usuario"], "senha": self.senha},
+        )
+        if resposta is not None and resposta.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+    async def iniciar(self) -> None:
+        if not self.livres:
+            return await self.finalizar()
+        computador = self.livres.pop(self.rng.randrange(len(self.livres)))
+        agora = datetime.now()
+        resposta = await self._requisitar("POST /sessoes", "POST", f"{API}/sessoes", headers=self.headers, json={
+            "data": agora.date().isoformat(),
+            "inicio_de_sessao": agora.isoformat(timespec="seconds"),
+            "computador_id": computador[0],
+            "usuario_id": self.cenario["usuario_id"],
+            "administrador_id": self.perfil["admin_id"],
+        })
+        if resposta is not None and resposta.status_code == 201:
+            self.abertas.append((resposta.json()["sessao_id"], computador))
+        else:
+            self.livres.append(computador)
+
+    async def finalizar(self, registrar: bool = True) -> None:
+        if not self.abertas:
+            return await self.iniciar() if registrar and self.livres else None
+        sessao_id, computador = self.abertas.pop(self.rng.randrange(len(self.abertas)))
+        url = f"{API}/sessoes/{sessao_id}/finalizar"
+        if registrar:
+            await self._requisitar("POST /sessoes/{id}/finalizar", "POST", url, headers=self.headers)
+        else:
+            await self.cliente.post(url, headers=self.headers)
+        self.livres.append(computador)
+
+    async def listar(self) -> None:
+        params = {"limit": 50, "administrador_id": self.perfil["admin_id"]}
+        filtro = self.rng.random()
+        if filtro < 0.3:
+            params["apenas_ativas"] = "true"
+        elif filtro < 0.6:
+            params["datetime_inicio"] = (datetime.now() - timedelta(days=30)).isoformat(timespec="seconds")
+        elif filtro < 0.8 and self.perfil["computadores"]:
+            params["ip_computador"] = self.perfil["computadores"][0][1].rsplit(".", 1)[0] + "."
+            params["busca_ip"] = "prefixo"
+        await self._requisitar("GET /sessoes", "GET", f"{API}/sessoes", headers=self.headers, params=params)
+
+    async def ativas(self) -> None:
+        await self._requisitar("GET /sessoes/ativas", "GET", f"{API}/sessoes/ativas",
+                               headers=self.headers, params={"limit": 100})
+
+    async def dashboard(self) -> None:
+        ano = self.rng.choice([self.cenario["ano"], self.cenario["ano"] - 1, None])
+        params = {
+            "subsecional_id": self.perfil["subsecional_id"],
+            "unidade_id": self.perfil["unidade_id"],
+            "coworking_id": self.perfil["coworking_id"],
+        }
+        if ano is not None:
+            params["ano"] = ano
+        headers = dict(self.headers)
+        if ano in self.etags:
+            headers["If-None-Match"] = self.etags[ano]
+        resposta = await self._requisitar("GET /dashboard", "GET", f"{API}/dashboard", headers=headers, params=params)
+        if resposta is not None and "etag" in resposta.headers:
+            self.etags[ano] = resposta.headers["etag"]
+
+    async def relatorio(self) -> None:
+        if self.headers_analista is None:
+            resposta = await self._requisitar(
+                "POST /auth/login/analista", "POST", f"{API}/auth/login/analista",
+                json={"usuario": self.cenario["analista"], "senha": self.senha},
+            )
+            if resposta is None or resposta.status_code != 200:
+                return
+            self.headers_analista = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        await self._requisitar("POST /relatorios/gerar", "POST", f"{API}/relatorios/gerar",
+                               headers=self.headers_analista, json={
+                                   "subsecional_id": self.perfil["subsecional_id"],
+                                   "unidade_id": self.perfil["unidade_id"],
+                                   "coworking_id": self.perfil["coworking_id"],
+                               })
+
+    async def executar(self, fim: float) -> None:
+        await self.login()
+        while time.monotonic() < fim:
+            operacao = self.rng.choices(self.operacoes, weights=self.pesos)[0]
+            await getattr(self, operacao)()
+
+    async def encerrar(self) -> None:
+        """Finaliza as sessões que ficaram abertas (fora da medição)"""
+        while self.abertas:
+            await self.finalizar(registrar=False)
+
+
+async def executar_carga(args) -> Dict:
+    if args.alvo:
+        cliente = httpx.AsyncClient(base_url=args.alvo, timeout=120,
+                                    limits=httpx.Limits(max_connections=args.usuarios))
+    else:
+        from src.main import app
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://carga", timeout=120)
+
+    cenario = carregar_cenario(args.usuarios)
+    registro = Registro()
+    rng = random.Random(args.semente)
+    usuarios = [
+        UsuarioVirtual(cliente, perfil, cenario, args.senha, PERFIS[args.perfil], registro,
+                       random.Random(rng.random()))
+        for perfil in cenario["perfis"]
+    ]
+
+    async with cliente:
+        inicio = time.monotonic()
+        await asyncio.gather(*(u.executar(inicio + args.duracao) for u in usuarios))
+        duracao = time.monotonic() - inicio
+        await asyncio.gather(*(u.encerrar() for u in usuarios))
+
+    return {
+        "rotulo": args.rotulo,
+        "alvo": args.alvo or "asgi",
+        "perfil": args.perfil,
+        "usuarios": args.usuarios,
+        "duracao_s": round(duracao, 1),
+        "cache_dashboard": not args.sem_cache if not args.alvo else None,
+        "rotas": registro.resumo(duracao),
+    }
+
+
+def imprimir(resultado: Dict, comparacao: Optional[Dict] = None) -> None:
+    print(f"\n{resultado['rotulo'] or resultado['alvo']}: {resultado['usuarios']} usuários, "
+          f"perfil {resultado['perfil']}, {resultado['duracao_s']}s")
+    cabecalho = f"  {'rota':<34}{'req':>7}{'erros':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if comparacao:
+        cabecalho += f"{'Δp95':>9}{'Δreq/s':>9}"
+    print(cabecalho)
+    for rota, r in resultado["rotas"].items():
+        linha = (f"  {rota:<34}{r['requisicoes']:>7}{r['erros']:>7}{r['rps']:>9.1f}"
+                 f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+        base = (comparacao or {}).get("rotas", {}).get(rota)
+        if base:
+            linha += f"{_variacao(base['p95_ms'], r['p95_ms']):>9}{_variacao(base['rps'], r['rps']):>9}"
+        print(linha)
+
+
+def _variacao(antes: float, depois: float) -> str:
+    if not antes:
+        return "-"
+    return f"{(depois / antes - 1) * 100:+.0f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alvo", help="URL de um servidor em execução (padrão: aplicação no próprio processo)")
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuários virtuais simultâneos (padrão: 20)")
+    parser.add_argument("--duracao", type=float, default=30, help="Duração em segundos (padrão: 30)")
+    parser.add_argument("--perfil", choices=sorted(PERFIS), default="padrao")
+    parser.add_argument("--senha", default="senha123", help="Senha dos usuários gerados (padrão do gerador)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Desliga o cache do dashboard (só no modo ASGI; no servidor use DASHBOARD_CACHE_HABILITADO)")
+    parser.add_argument("--rotulo", default="", help="Nome da configuração testada (ex.: '4 workers')")
+    parser.add_argument("--salvar", help="Salva o resultado em JSON")
+    parser.add_argument("--comparar", help="Compara com um resultado JSON salvo anteriormente")
+    args = parser.parse_args()
+
+    if httpx is None:
+        raise SystemExit("O teste de carga requer o pacote httpx (pip install httpx)")
+    if args.sem_cache:
+        # Lido na importação de src.services.dashboard_cache
+        os.environ["DASHBOARD_CACHE_HABILITADO"] = "false"
+
+    resultado = asyncio.run(executar_carga(args))
+
+    comparacao = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparacao = json.load(arquivo)
+    imprimir(resultado, comparacao)
+    if comparacao:
+        print(f"  (Δ em relação a {comparacao['rotulo'] or args.comparar})")
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nResultado salvo em {args.salvar}")
+
+
+if __name__ == "__main__":
+    main()
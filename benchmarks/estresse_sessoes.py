@@ -0,0 +1,212 @@
+"""
+Teste de estresse de concorrência: muitas threads disputando o mesmo computador.
+
+Cada rodada libera todas as threads ao mesmo tempo (threading.Barrier) e cada
+uma tenta abrir uma sessão no mesmo computador pela camada de serviço
+(SessaoService, com uma sessão de banco própria por thread). O índice único
+parcial ux_sessao_computador_ativa (PostgreSQL/SQLite) ou o lock no computador
+(MySQL) deve garantir, em toda rodada, exatamente um sucesso e 409 para as
+demais. Ao fim da rodada o script confere no banco que há uma única sessão
+ativa no computador e a finaliza para a próxima rodada.
+
+Modos:
+- criar: POST /sessoes concorrente (criar_sessao)
+- reativar: cada thread reabre (ativado=true, sem final) uma sessão própria já
+  finalizada no mesmo computador (atualizar_sessao)
+
+O script cria os próprios registros (cadastro, usuário, administrador e um
+computador sem sala) e os remove ao final, salvo com --manter. Usa o banco de
+DATABASE_URL (.env). Código de saída 1 se alguma rodada violar a regra.
+
+Uso:
+    python -m benchmarks.estresse_sessoes
+    python -m benchmarks.estresse_sessoes --threads 32 --rodadas 50 --modo reativar
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List
+from fastapi import HTTPException
+from sqlalchemy import delete, func
+from src.database.connection import SessionLocal
+from src.entities.administrador_sala_coworking import Administrador_sala_coworking
+from src.entities.cadastro import Cadastro
+from src.entities.computador import Computador
+from src.entities.sessao import Sessao
+from src.entities.usuario_advogado import Usuario_advogado
+from src.schemas.sessao import SessaoCreate, SessaoUpdate
+from src.services.sessao_service import SessaoService
+
+
+class Fixture:
+    """Registros criados para o teste (removidos ao final)"""
+
+    def __init__(self):
+        sufixo = uuid.uuid4().hex[:10]
+        db = SessionLocal()
+        try:
+            cadastro = Cadastro(nome="Estresse", email=f"estresse-{sufixo}@teste.local", cpf=sufixo)
+            db.add(cadastro)
+            db.flush()
+            usuario = Usuario_advogado(
+                registro_oab=f"EST{sufixo}", codigo_de_seguranca="estresse", cadastro_id=cadastro.cadastro_id
+            )
+            admin = Administrador_sala_coworking(
+                usuario=f"estresse-{sufixo}", senha="-", cadastro_id=cadastro.cadastro_id
+            )
+            octetos = int(sufixo[:6], 16)
+            computador = Computador(
+                ip_da_maquina=f"10.{octetos >> 16 & 255}.{octetos >> 8 & 255}.{octetos & 255}",
+                numero_de_tombamento=f"EST-{sufixo}"
+            )
+            db.add_all([usuario, admin, computador])
+            db.commit()
+            self.cadastro_id = cadastro.cadastro_id
+            self.usuario_id = usuario.usuario_id
+            self.admin_id = admin.admin_id
+            self.computador_id = computador.computador_id
+        finally:
+            db.close()
+
+    def nova_sessao(self) -> SessaoCreate:
+        agora = datetime.now()
+        return SessaoCreate(
+            data=agora.date(),
+            inicio_de_sessao=agora,
+            computador_id=self.computador_id,
+            usuario_id=self.usuario_id,
+            administrador_id=self.admin_id
+        )
+
+    def contar_ativas(self) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(func.count(Sessao.sessao_id)).filter(
+                Sessao.computador_id == self.computador_id,
+                Sessao.ativado == True,
+                Sessao.final_de_sessao.is_(None)
+            ).scalar()
+        finally:
+            db.close()
+
+    def finalizar_ativas(self) -> None:
+        db = SessionLocal()
+        try:
+            service = SessaoService(db)
+            for (sessao_id,) in db.query(Sessao.sessao_id).filter(
+                Sessao.computador_id == self.computador_id,
+                Sessao.ativado == True,
+                Sessao.final_de_sessao.is_(None)
+            ).all():
+                service.finalizar_sessao(sessao_id)
+        finally:
+            db.close()
+
+    def remover(self) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(delete(Sessao).where(Sessao.computador_id == self.computador_id))
+            db.execute(delete(Computador).where(Computador.computador_id == self.computador_id))
+            db.execute(delete(Administrador_sala_coworking).where(Administrador_sala_coworking.admin_id == self.admin_id))
+            db.execute(delete(Usuario_advogado).where(Usuario_advogado.usuario_id == self.usuario_id))
+            db.execute(delete(Cadastro).where(Cadastro.cadastro_id == self.cadastro_id))
+            db.commit()
+        finally:
+            db.close()
+
+
+def tentativa(operacao: Callable[[SessaoService], object]) -> str:
+    """Executa a operação em uma sessão de banco própria e classifica o resultado"""
+    db = SessionLocal()
+    try:
+        operacao(SessaoService(db))
+        return "ok"
+    except HTTPException as e:
+        return str(e.status_code)
+    except Exception as e:
+        return type(e).__name__
+    finally:
+        db.close()
+
+
+def sessoes_finalizadas(fixture: Fixture, quantidade: int) -> List[int]:
+    """Uma sessão finalizada por thread no computador do teste (modo reativar)"""
+    ids = []
+    for _ in range(quantidade):
+        db = SessionLocal()
+        try:
+            service = SessaoService(db)
+            sessao_id = service.criar_sessao(fixture.nova_sessao()).sessao_id
+            service.finalizar_sessao(sessao_id)
+            ids.append(sessao_id)
+        finally:
+            db.close()
+    return ids
+
+
+def rodada(fixture: Fixture, modo: str, threads: int, sessao_ids: List[int]) -> Counter:
+    barreira = threading.Barrier(threads)
+    resultados: List[str] = [""] * threads
+    reabrir = SessaoUpdate(ativado=True, final_de_sessao=None)
+
+    def executar(indice: int) -> None:
+        if modo == "criar":
+            operacao = lambda service: service.criar_sessao(fixture.nova_sessao())
+        else:
+            operacao = lambda service: service.atualizar_sessao(sessao_ids[indice], reabrir)
+        barreira.wait()
+        resultados[indice] = tentativa(operacao)
+
+    trabalhadores = [threading.Thread(target=executar, args=(i,)) for i in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    return Counter(resultados)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16, help="Threads por rodada (padrão: 16)")
+    parser.add_argument("--rodadas", type=int, default=20, help="Rodadas (padrão: 20)")
+    parser.add_argument("--modo", choices=["criar", "reativar"], nargs="+", default=["criar", "reativar"])
+    parser.add_argument("--manter", action="store_true", help="Não remover os registros criados")
+    args = parser.parse_args()
+
+    fixture = Fixture()
+    falhas = 0
+    try:
+        for modo in args.modo:
+            sessao_ids = sessoes_finalizadas(fixture, args.threads) if modo == "reativar" else []
+            total: Counter = Counter()
+            tempos: List[float] = []
+            for numero in range(1, args.rodadas + 1):
+                inicio = time.perf_counter()
+                resultado = rodada(fixture, modo, args.threads, sessao_ids)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+                total += resultado
+                ativas = fixture.contar_ativas()
+                if resultado["ok"] != 1 or ativas != 1:
+                    falhas += 1
+                    print(f"❌ {modo} rodada {numero}: {dict(resultado)}, {ativas} sessões ativas no computador")
+                fixture.finalizar_ativas()
+            resumo: Dict[str, int] = dict(sorted(total.items()))
+            print(f"{modo:>9}: {args.rodadas} rodadas x {args.threads} threads, resultados {resumo}, "
+                  f"rodada mediana {statistics.median(tempos):.1f} ms")
+    finally:
+        if not args.manter:
+            fixture.remover()
+
+    if falhas:
+        print(f"❌ {falhas} rodadas com mais (ou menos) de uma sessão ativa")
+        sys.exit(1)
+    print("✅ Exatamente uma sessão ativa por rodada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Orçamento de tempo de importação da aplicação.
+
+Importa src.main em processos novos com `python -X importtime`, lê o relatório
+do interpretador (stderr) e verifica:
+- o tempo cumulativo de src.main (mediana das execuções) contra o orçamento
+- que as dependências pesadas e opcionais não são carregadas na inicialização
+  (MODULOS_ADIADOS): são importadas apenas no primeiro uso
+
+Cada worker (uvicorn/gunicorn) paga esse custo ao subir, então ele limita a
+velocidade do autoscaling. Sai com código 1 se o orçamento for excedido ou se
+algum módulo adiado aparecer, para uso em CI.
+
+Uso:
+    python -m benchmarks.tempo_importacao --orcamento-ms 1500 --execucoes 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+MODULO_ALVO = "src.main"
+
+# Carregados sob demanda: relatórios (Gemini), JWT (backends de criptografia), arquivo Parquet
+# e métricas do dashboard calculadas com NumPy
+MODULOS_ADIADOS = ("google.genai", "jose", "pyarrow", "numpy")
+
+_LINHA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class Importacao(NamedTuple):
+    modulo: str
+    proprio_us: int
+    cumulativo_us: int
+    nivel: int
+
+
+def analisar(saida: str) -> List[Importacao]:
+    """Converte as linhas de `-X importtime` em registros (nível = profundidade da indentação)"""
+    importacoes = []
+    for linha in saida.splitlines():
+        casamento = _LINHA.match(linha)
+        if casamento:
+            proprio, cumulativo, indentacao, modulo = casamento.groups()
+            importacoes.append(Importacao(modulo, int(proprio), int(cumulativo), (len(indentacao) - 1) // 2))
+    return importacoes
+
+
+def medir(modulo: str = MODULO_ALVO) -> List[Importacao]:
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {modulo}"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"},
+    )
+    if processo.returncode != 0:
+        raise SystemExit(f"Falha ao importar {modulo}:\n{processo.stderr[-2000:]}")
+    return analisar(processo.stderr)
+
+
+def por_pacote(importacoes: List[Importacao]) -> Dict[str, int]:
+    """Tempo próprio somado por pacote de primeiro nível (em µs)"""
+    totais: Dict[str, int] = defaultdict(int)
+    for importacao in importacoes:
+        totais[importacao.modulo.split(".")[0]] += importacao.proprio_us
+    return dict(sorted(totais.items(), key=lambda item: item[1], reverse=True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orcamento-ms", type=float,
+                        default=float(os.getenv("IMPORTACAO_ORCAMENTO_MS", "1500")),
+                        help="Tempo máximo de importação de src.main em ms (padrão: IMPORTACAO_ORCAMENTO_MS ou 1500)")
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Pacotes mais caros a exibir")
+    args = parser.parse_args()
+
+    execucoes = [medir() for _ in range(args.execucoes)]
+    totais_ms = [
+        next(i.cumulativo_us for i in importacoes if i.modulo == MODULO_ALVO) / 1000
+        for importacoes in execucoes
+    ]
+    mediana = statistics.median(totais_ms)
+    # Pacotes da execução mais próxima da mediana
+    representativa = execucoes[min(range(len(totais_ms)), key=lambda i: abs(totais_ms[i] - mediana))]
+
+    print(f"{MODULO_ALVO}: mediana {mediana:.0f} ms (mín {min(totais_ms):.0f}, máx {max(totais_ms):.0f}) "
+          f"em {args.execucoes} execuções; orçamento {args.orcamento_ms:.0f} ms")
+    print(f"\n  {'pacote':<24}{'tempo próprio':>14}")
+    for pacote, proprio_us in list(por_pacote(representativa).items())[:args.top]:
+        print(f"  {pacote:<24}{proprio_us / 1000:>11.1f} ms")
+
+    falhas = []
+    if mediana > args.orcamento_ms:
+        falhas.append(f"importação de {MODULO_ALVO} em {mediana:.0f} ms excede o orçamento de {args.orcamento_ms:.0f} ms")
+    carregados = sorted({
+        i.modulo for i in representativa
+        if any(i.modulo == m or i.modulo.startswith(m + ".") for m in MODULOS_ADIADOS)
+    })
+    if carregados:
+        falhas.append(f"módulos que deveriam ser carregados sob demanda: {', '.join(carregados[:10])}")
+
+    if falhas:
+        print()
+        for falha in falhas:
+            print(f"⚠️ {falha}")
+        sys.exit(1)
+    print("\n✅ Dentro do orçamento e sem dependências opcionais na inicialização")
+
+
+if __name__ == "__main__":
+    main()
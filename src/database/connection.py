@@ -1,6 +1,9 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
 from urllib.parse import urlparse, parse_qs, unquote
 
@@ -46,21 +49,149 @@ else:
     DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 
 
-# Criar engine com pool_pre_ping para detectar conexões perdidas
-# Adicionar timeout para evitar loading infinito
-connect_args = {}
-if DATABASE_URL and "postgresql" in DATABASE_URL:
-    connect_args = {"connect_timeout": 10}  # Timeout de 10 segundos para PostgreSQL
-else:
-    connect_args = {"connect_timeout": 10}  # Timeout de 10 segundos para MySQL
-
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args=connect_args,
-    pool_timeout=20,  # Timeout de 20 segundos para obter conexão do pool
-    pool_recycle=3600,  # Reciclar conexões após 1 hora
-)
-
-# Criar SessionLocal para usar como dependência
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+def _connect_args(url: str) -> dict:
+    """Retorna os argumentos de conexão adequados ao driver da URL"""
+    if url.startswith("sqlite"):
+        # SQLite (útil em desenvolvimento/testes locais) não aceita connect_timeout
+        return {"check_same_thread": False}
+    # Timeout de 10 segundos para PostgreSQL e MySQL
+    return {"connect_timeout": 10}
+
+
+def _criar_engine(url: str):
+    """Cria engine com pool_pre_ping para detectar conexões perdidas"""
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args=_connect_args(url))
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        connect_args=_connect_args(url),
+        pool_timeout=20,  # Timeout de 20 segundos para obter conexão do pool
+        pool_recycle=3600,  # Reciclar conexões após 1 hora
+    )
+
+
+# Engine principal (primário): recebe todas as escritas
+engine = _criar_engine(DATABASE_URL)
+
+
+# Réplica de leitura opcional (DATABASE_REPLICA_URL).
+# Se não estiver configurada, as leituras usam o próprio primário.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.startswith("mysql://"):
+    DATABASE_REPLICA_URL = DATABASE_REPLICA_URL.replace("mysql://", "mysql+pymysql://", 1)
+
+replica_engine = _criar_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+
+def _engines():
+    return [engine] if replica_engine is engine else [engine, replica_engine]
+
+
+def reiniciar_pools_apos_fork() -> None:
+    """
+    Descarta, no processo filho, as conexões herdadas do processo pai.
+
+    Os engines são criados na importação; se a aplicação for carregada antes do
+    fork (gunicorn --preload), um socket aberto no pai seria compartilhado pelos
+    workers. close=False abandona essas conexões sem fechá-las (fechar enviaria o
+    encerramento pelo socket que o pai ainda usa): cada worker abre as suas.
+    """
+    for e in _engines():
+        e.dispose(close=False)
+
+
+def encerrar_pools() -> None:
+    """Fecha as conexões ociosas do pool ao encerrar o worker"""
+    for e in _engines():
+        e.dispose()
+
+
+# Janela (em segundos) durante a qual as leituras de um cliente continuam no
+# primário após uma escrita de sessão dele, para cobrir o atraso de replicação
+# (read-your-writes)
+REPLICA_JANELA_LEITURA_PRIMARIO = float(os.getenv("REPLICA_JANELA_LEITURA_PRIMARIO", "5"))
+
+# Instante (epoch) até o qual as leituras do cliente vão ao primário: devolvido
+# após a escrita no cookie e no header, e aceito de volta em qualquer um dos dois
+LEITURA_PRIMARIO_COOKIE = "leitura_primario_ate"
+LEITURA_PRIMARIO_HEADER = "X-Leitura-Primario-Ate"
+
+# Estado da requisição HTTP corrente (ver MiddlewareLeituraPrimario). É um dict
+# mutável: o endpoint roda no threadpool com uma cópia do contexto, mas altera
+# o mesmo objeto que o middleware lê ao enviar a resposta
+_escrita_requisicao: ContextVar[Optional[dict]] = ContextVar("escrita_requisicao", default=None)
+
+
+def iniciar_requisicao() -> dict:
+    """Abre o registro de escritas da requisição corrente (chamado pelo middleware)"""
+    estado = {"ate": None}
+    _escrita_requisicao.set(estado)
+    return estado
+
+
+def registrar_escrita() -> None:
+    """
+    Registra que a requisição corrente acabou de confirmar uma escrita no primário.
+
+    A resposta leva LEITURA_PRIMARIO_COOKIE / LEITURA_PRIMARIO_HEADER: durante
+    REPLICA_JANELA_LEITURA_PRIMARIO segundos, as leituras desse cliente (e só
+    dele) serão roteadas para o primário. Fora de uma requisição (scripts), não
+    faz nada.
+    """
+    estado = _escrita_requisicao.get()
+    if estado is not None:
+        estado["ate"] = time.time() + REPLICA_JANELA_LEITURA_PRIMARIO
+
+
+def leitura_deve_usar_primario(ate: Optional[str] = None) -> bool:
+    """
+    Indica se as leituras do cliente ainda devem ir ao primário, a partir do
+    instante `ate` que ele reenviou (cookie ou header).
+
+    Valores acima de agora + janela são ignorados: o cliente não consegue fixar
+    as próprias leituras no primário por mais tempo que a janela.
+    """
+    if replica_engine is engine:
+        return True
+    try:
+        ate = float(ate)
+    except (TypeError, ValueError):
+        return False
+    agora = time.time()
+    return agora < ate <= agora + REPLICA_JANELA_LEITURA_PRIMARIO
+
+
+class RoutingSession(Session):
+    """
+    Sessão que roteia consultas entre primário e réplica.
+
+    - Escritas (flush) e sessões marcadas com usar_primario() vão para o primário
+    - As demais consultas (SELECT) vão para a réplica de leitura
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._usar_primario = False
+
+    def usar_primario(self) -> None:
+        """Força todas as consultas seguintes desta sessão para o primário"""
+        self._usar_primario = True
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._usar_primario or self._flushing:
+            return engine
+        return replica_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _fixar_primario_apos_escrita(session, flush_context):
+    # Após qualquer escrita, a sessão passa a ler do primário para enxergar os próprios dados
+    session.usar_primario()
+
+
+# Criar SessionLocal para usar como dependência (primário)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Sessões somente leitura: consultas vão para a réplica quando configurada
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
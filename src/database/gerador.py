@@ -0,0 +1,451 @@
+"""
+Gerador de dados sintéticos para testes de carga e benchmarks.
+
+Cria uma topologia completa (subsecionais, unidades, salas, administradores,
+computadores, analistas e advogados) e um histórico de sessões finalizadas com
+padrões de uso realistas:
+- Horário: concentração entre 9h e 17h, com queda no almoço
+- Semana: dias úteis cheios, sábado fraco e domingo praticamente vazio
+- Ano: recesso forense (20/12 a 20/01) e férias de julho com menos movimento
+- Salas e advogados com popularidade desigual (poucos concentram o uso)
+
+A geração é determinística para a mesma --semente (e a mesma --data-final: sem
+ela, o histórico termina ontem). As linhas são inseridas em
+lote com INSERT do SQLAlchemy Core (executemany), sem passar pelo ORM, e a senha
+dos administradores/analistas é hasheada uma única vez.
+
+As sessões do histórico são geradas finalizadas; com --ativas, uma fração dos
+computadores recebe uma sessão aberta hoje (no máximo uma por computador, como
+exige o índice único de sessão ativa). Um computador nunca tem duas sessões
+sobrepostas: os dias são gerados em ordem, cada computador guarda quando fica
+livre e, ao final, uma consulta (LAG por computador) confirma a ausência de
+sobreposições.
+
+Execução:
+    python -m src.database.gerador --sessoes 1000000 --semente 42
+    python -m src.database.gerador --url sqlite:///carga.db --advogados 20000
+    python -m src.database.gerador --data-final 2025-12-31 --dias 365
+"""
+import argparse
+import bisect
+import itertools
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from src.database.base import Base
+from src.database.indices import garantir_indices
+from src.entities import (
+    Administrador_sala_coworking,
+    Analista_de_ti,
+    Cadastro,
+    Computador,
+    HierarquiaEnum,
+    Sala_coworking,
+    Sessao,
+    Subsecional,
+    Unidade,
+    Usuario_advogado,
+)
+from src.utils.security import hash_password
+
+
+# Peso relativo de início de sessão por hora do dia (0-23)
+PESO_HORA = [
+    0, 0, 0, 0, 0, 0, 0, 0.2, 1.2, 3.0, 3.6, 3.4,
+    1.8, 1.6, 3.2, 3.5, 3.0, 2.0, 0.8, 0.3, 0.1, 0, 0, 0,
+]
+# Peso por dia da semana (segunda = 0)
+PESO_DIA_SEMANA = [1.0, 1.05, 1.05, 1.0, 0.85, 0.15, 0.02]
+# Peso por mês (julho: férias; dezembro/janeiro: recesso forense)
+PESO_MES = {1: 0.7, 2: 0.95, 3: 1.05, 4: 1.0, 5: 1.05, 6: 1.0,
+            7: 0.75, 8: 1.05, 9: 1.05, 10: 1.05, 11: 1.0, 12: 0.8}
+# Recesso forense (20/12 a 20/01): movimento residual
+PESO_RECESSO = 0.25
+
+DURACAO_MEDIANA_MINUTOS = 75
+DURACAO_MINIMA_MINUTOS = 5
+DURACAO_MAXIMA_MINUTOS = 6 * 60
+HORA_FECHAMENTO = 22
+# Sorteios de computador antes de descartar uma sessão (todos os sorteados ocupados)
+TENTATIVAS_COMPUTADOR = 20
+
+
+def _em_recesso(dia: date) -> bool:
+    return (dia.month == 12 and dia.day >= 20) or (dia.month == 1 and dia.day <= 20)
+
+
+def peso_dia(dia: date) -> float:
+    """Peso relativo de movimento de um dia (semana x mês x recesso)"""
+    peso = PESO_DIA_SEMANA[dia.weekday()] * PESO_MES[dia.month]
+    return peso * PESO_RECESSO if _em_recesso(dia) else peso
+
+
+def _acumular(pesos: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(pesos))
+
+
+def _pesos_popularidade(rng: random.Random, n: int, alfa: float = 1.5) -> List[float]:
+    """Pesos de cauda longa (Pareto): poucos itens concentram a maior parte do uso"""
+    return [rng.paretovariate(alfa) for _ in range(n)]
+
+
+class GeradorDados:
+    """Gera e insere em lote uma base sintética completa"""
+
+    def __init__(self, engine: Engine, semente: int = 42, lote: int = 10000, senha: str = "senha123"):
+        self.engine = engine
+        self.rng = random.Random(semente)
+        self.lote = lote
+        self.senha_hash = hash_password(senha)
+        # Sessões descartadas na última geração (todos os computadores sorteados ocupados)
+        self.descartadas = 0
+
+    # ---------- inserção ----------
+
+    def _inserir(self, entidade, linhas: List[dict]) -> List[int]:
+        """Insere as linhas em lote e retorna os IDs gerados, na ordem de inserção
+
+        Os IDs são lidos de volta pelo intervalo acima do maior ID anterior,
+        o que funciona em todos os dialetos (sem depender de RETURNING).
+        """
+        tabela = entidade.__table__
+        pk = tabela.primary_key.columns.values()[0]
+        with self.engine.begin() as conexao:
+            maior_anterior = conexao.execute(select(func.coalesce(func.max(pk), 0))).scalar()
+            for inicio in range(0, len(linhas), self.lote):
+                conexao.execute(insert(tabela), linhas[inicio:inicio + self.lote])
+            return list(conexao.execute(select(pk).where(pk > maior_anterior).order_by(pk)).scalars())
+
+    def _proximo_numero(self, entidade) -> int:
+        """Base para nomes/documentos únicos, permitindo várias execuções no mesmo banco"""
+        pk = entidade.__table__.primary_key.columns.values()[0]
+        with self.engine.connect() as conexao:
+            return conexao.execute(select(func.coalesce(func.max(pk), 0))).scalar() + 1
+
+    def _cadastros(self, prefixo: str, quantidade: int) -> List[int]:
+        base = self._proximo_numero(Cadastro)
+        return self._inserir(Cadastro, [
+            {
+                "nome": f"{prefixo.capitalize()} {base + i}",
+                "email": f"{prefixo}{base + i}@exemplo.oab.org.br",
+                "telefone": f"819{self.rng.randrange(10**7, 10**8)}",
+                "cpf": f"{base + i:011d}",
+            }
+            for i in range(quantidade)
+        ])
+
+    # ---------- topologia ----------
+
+    def gerar_topologia(
+        self,
+        subsecionais: int,
+        unidades_por_subsecional: int,
+        salas_por_unidade: int,
+        computadores_por_sala: int,
+        advogados: int,
+        analistas: int,
+    ) -> Dict[str, List[int]]:
+        rng = self.rng
+
+        base = self._proximo_numero(Subsecional)
+        subsecional_ids = self._inserir(Subsecional, [
+            {"nome": f"Subsecional {base + i}"} for i in range(subsecionais)
+        ])
+
+        unidades = []
+        for subsecional_id in subsecional_ids:
+            lat, lon = rng.uniform(-9.5, -7.3), rng.uniform(-41.0, -34.9)
+            for i in range(unidades_por_subsecional):
+                unidades.append({
+                    "nome": f"{'Sede' if i == 0 else f'Filial {i}'} - Subsecional {subsecional_id}",
+                    "hierarquia": HierarquiaEnum.SEDE if i == 0 else HierarquiaEnum.FILIAL,
+                    "latitude": round(lat + rng.uniform(-0.05, 0.05), 6),
+                    "longitude": round(lon + rng.uniform(-0.05, 0.05), 6),
+                    "subsecional_id": subsecional_id,
+                })
+        unidade_ids = self._inserir(Unidade, unidades)
+
+        # Um administrador por sala
+        total_salas = len(unidade_ids) * salas_por_unidade
+        base = self._proximo_numero(Administrador_sala_coworking)
+        cadastro_ids = self._cadastros("administrador", total_salas)
+        admin_ids = self._inserir(Administrador_sala_coworking, [
+            {
+                "usuario": f"admin_sala_{base + i}",
+                "senha": self.senha_hash,
+                "adm_local": True,
+                "admin_central": False,
+                "cadastro_id": cadastro_id,
+            }
+            for i, cadastro_id in enumerate(cadastro_ids)
+        ])
+
+        salas = []
+        admins = iter(admin_ids)
+        for unidade_id, dados in zip(unidade_ids, unidades):
+            for i in range(salas_por_unidade):
+                salas.append({
+                    "nome_da_sala": f"Sala {i + 1} - Unidade {unidade_id}",
+                    "subsecional_id": dados["subsecional_id"],
+                    "unidade_id": unidade_id,
+                    "administrador_id": next(admins),
+                })
+        sala_ids = self._inserir(Sala_coworking, salas)
+
+        base = self._proximo_numero(Computador)
+        computadores = []
+        for sala_id in sala_ids:
+            for _ in range(computadores_por_sala):
+                n = base + len(computadores)
+                computadores.append({
+                    "ip_da_maquina": f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}",
+                    "numero_de_tombamento": f"TMB{n:08d}",
+                    "coworking_id": sala_id,
+                })
+        computador_ids = self._inserir(Computador, computadores)
+
+        base = self._proximo_numero(Analista_de_ti)
+        cadastro_ids = self._cadastros("analista", analistas)
+        self._inserir(Analista_de_ti, [
+            {"usuario": f"analista_{base + i}", "senha": self.senha_hash, "cadastro_id": cadastro_id}
+            for i, cadastro_id in enumerate(cadastro_ids)
+        ])
+
+        base = self._proximo_numero(Usuario_advogado)
+        cadastro_ids = self._cadastros("advogado", advogados)
+        usuario_ids = self._inserir(Usuario_advogado, [
+            {
+                "registro_oab": f"PE{base + i:07d}",
+                "codigo_de_seguranca": f"{rng.randrange(16**6):06X}",
+                "adimplencia_oab": rng.random() > 0.08,
+                "cadastro_id": cadastro_id,
+            }
+            for i, cadastro_id in enumerate(cadastro_ids)
+        ])
+
+        return {
+            "salas": sala_ids,
+            "admins": admin_ids,
+            "computadores": computador_ids,
+            "computador_sala": [c["coworking_id"] for c in computadores],
+            "usuarios": usuario_ids,
+        }
+
+    # ---------- sessões ----------
+
+    def _duracao(self) -> timedelta:
+        minutos = self.rng.lognormvariate(math.log(DURACAO_MEDIANA_MINUTOS), 0.6)
+        minutos = min(max(minutos, DURACAO_MINIMA_MINUTOS), DURACAO_MAXIMA_MINUTOS)
+        return timedelta(minutes=minutos)
+
+    def _sessoes_por_dia(self, dias: List[date], quantidade: int) -> List[int]:
+        """Quantas sessões cada dia recebe (sorteio ponderado por peso_dia, em lotes)"""
+        acumulado_dias = _acumular([peso_dia(d) for d in dias])
+        contagem = [0] * len(dias)
+        sorteados = 0
+        while sorteados < quantidade:
+            k = min(self.lote, quantidade - sorteados)
+            for indice in self.rng.choices(range(len(dias)), cum_weights=acumulado_dias, k=k):
+                contagem[indice] += 1
+            sorteados += k
+        return contagem
+
+    def iterar_sessoes(
+        self, topologia: Dict[str, List[int]], quantidade: int, inicio: date, fim: date
+    ) -> Iterator[List[dict]]:
+        """
+        Gera as sessões em lotes de dicionários prontos para o INSERT.
+
+        Os dias são percorridos em ordem e, em cada dia, as sessões em ordem de
+        início. Cada computador guarda o instante em que fica livre: se o sorteado
+        estiver ocupado, outro é sorteado (até TENTATIVAS_COMPUTADOR vezes); se
+        todos os sorteios caírem em computadores ocupados, a sessão é descartada.
+        Assim um computador nunca tem duas sessões sobrepostas.
+        """
+        rng = self.rng
+        dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+        acumulado_horas = _acumular(PESO_HORA)
+        horas = list(range(24))
+
+        # Peso de cada computador = popularidade da sala, dividida entre os computadores dela
+        salas = topologia["salas"]
+        popularidade = dict(zip(salas, _pesos_popularidade(rng, len(salas))))
+        admin_da_sala = dict(zip(salas, topologia["admins"]))
+        computadores = topologia["computadores"]
+        sala_do_computador = topologia["computador_sala"]
+        acumulado_computadores = _acumular([popularidade[s] for s in sala_do_computador])
+        total_computadores = acumulado_computadores[-1]
+        usuarios = topologia["usuarios"]
+        acumulado_usuarios = _acumular(_pesos_popularidade(rng, len(usuarios)))
+        livre_em = [datetime.min] * len(computadores)
+        self.descartadas = 0
+
+        linhas: List[dict] = []
+        for dia, quantidade_dia in zip(dias, self._sessoes_por_dia(dias, quantidade)):
+            if not quantidade_dia:
+                continue
+            fechamento = datetime(dia.year, dia.month, dia.day, HORA_FECHAMENTO)
+            inicios = sorted(
+                datetime(dia.year, dia.month, dia.day, hora, rng.randrange(60), rng.randrange(60))
+                for hora in rng.choices(horas, cum_weights=acumulado_horas, k=quantidade_dia)
+            )
+            usuarios_dia = rng.choices(usuarios, cum_weights=acumulado_usuarios, k=quantidade_dia)
+            for inicio_sessao, usuario_id in zip(inicios, usuarios_dia):
+                for _ in range(TENTATIVAS_COMPUTADOR):
+                    indice = bisect.bisect(acumulado_computadores, rng.random() * total_computadores)
+                    if livre_em[indice] <= inicio_sessao:
+                        break
+                else:
+                    self.descartadas += 1
+                    continue
+                final_sessao = min(inicio_sessao + self._duracao(), fechamento)
+                livre_em[indice] = final_sessao
+                linhas.append({
+                    "data": dia,
+                    "inicio_de_sessao": inicio_sessao,
+                    "final_de_sessao": final_sessao,
+                    "ativado": False,
+                    "computador_id": computadores[indice],
+                    "usuario_id": usuario_id,
+                    "administrador_id": admin_da_sala[sala_do_computador[indice]],
+                })
+                if len(linhas) >= self.lote:
+                    yield linhas
+                    linhas = []
+        if linhas:
+            yield linhas
+
+    def gerar_sessoes(self, topologia: Dict[str, List[int]], quantidade: int, inicio: date, fim: date) -> int:
+        tabela = Sessao.__table__
+        inicio_geracao = time.perf_counter()
+        total = 0
+        for linhas in self.iterar_sessoes(topologia, quantidade, inicio, fim):
+            # Uma transação por lote: memória constante e progresso visível
+            with self.engine.begin() as conexao:
+                conexao.execute(insert(tabela), linhas)
+            total += len(linhas)
+            decorrido = time.perf_counter() - inicio_geracao
+            print(f"   {total}/{quantidade} sessões ({total / decorrido:,.0f}/s)", end="\r", flush=True)
+        print()
+        if self.descartadas:
+            print(f"   {self.descartadas} sessões descartadas: computadores ocupados no horário sorteado")
+        return total
+
+    def abrir_sessoes_ativas(self, topologia: Dict[str, List[int]], proporcao: float) -> int:
+        """Abre uma sessão (iniciada hoje) em `proporcao` dos computadores
+
+        No máximo uma por computador, respeitando o índice único de sessão ativa.
+        """
+        rng = self.rng
+        computadores = list(zip(topologia["computadores"], topologia["computador_sala"]))
+        escolhidos = rng.sample(computadores, round(len(computadores) * proporcao))
+        admin_da_sala = dict(zip(topologia["salas"], topologia["admins"]))
+        agora = datetime.now().replace(microsecond=0)
+        linhas = [
+            {
+                "data": agora.date(),
+                "inicio_de_sessao": agora - timedelta(minutes=rng.randrange(1, 180)),
+                "final_de_sessao": None,
+                "ativado": True,
+                "computador_id": computador_id,
+                "usuario_id": rng.choice(topologia["usuarios"]),
+                "administrador_id": admin_da_sala[sala_id],
+            }
+            for computador_id, sala_id in escolhidos
+        ]
+        if linhas:
+            with self.engine.begin() as conexao:
+                conexao.execute(insert(Sessao.__table__), linhas)
+        return len(linhas)
+
+
+def contar_sobreposicoes(engine: Engine, computador_ids: List[int]) -> int:
+    """Sessões que começam antes do fim da anterior no mesmo computador (entre os computadores dados)"""
+    if not computador_ids:
+        return 0
+    anterior = func.lag(Sessao.final_de_sessao).over(
+        partition_by=Sessao.computador_id,
+        order_by=(Sessao.inicio_de_sessao, Sessao.sessao_id),
+    )
+    consulta = select(Sessao.inicio_de_sessao, anterior.label("final_anterior")).where(
+        Sessao.computador_id.between(min(computador_ids), max(computador_ids))
+    ).subquery()
+    with engine.connect() as conexao:
+        return conexao.execute(
+            select(func.count()).select_from(consulta).where(consulta.c.final_anterior > consulta.c.inicio_de_sessao)
+        ).scalar()
+
+
+def _notificar(engine: Engine, sala_ids: List[int]) -> None:
+    """Invalida caches/ETags de hierarquia, dashboard e sessões após a carga"""
+    from sqlalchemy.orm import Session
+    from src.services.hierarquia_service import hierarquia_index
+    from src.services.sessao_service import SessaoService
+
+    with Session(bind=engine) as db:
+        hierarquia_index.invalidar(db)
+        SessaoService(db).notificar_alteracao(sala_ids)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera uma base sintética realista para testes de desempenho")
+    parser.add_argument("--url", help="URL do banco (padrão: DATABASE_URL / DB_* do .env)")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do gerador aleatório (padrão: 42)")
+    parser.add_argument("--subsecionais", type=int, default=10)
+    parser.add_argument("--unidades-por-subsecional", type=int, default=3)
+    parser.add_argument("--salas-por-unidade", type=int, default=2)
+    parser.add_argument("--computadores-por-sala", type=int, default=12)
+    parser.add_argument("--advogados", type=int, default=5000)
+    parser.add_argument("--analistas", type=int, default=10)
+    parser.add_argument("--sessoes", type=int, default=100000)
+    parser.add_argument("--ativas", type=float, default=0.0,
+                        help="Proporção dos computadores com uma sessão ativa agora (0 a 1, padrão: 0)")
+    parser.add_argument("--dias", type=int, default=730, help="Período do histórico, em dias (padrão: 730)")
+    parser.add_argument("--data-final", type=date.fromisoformat,
+                        help="Último dia do histórico, AAAA-MM-DD (padrão: ontem). Fixe-o para obter a mesma base em qualquer data")
+    parser.add_argument("--lote", type=int, default=10000, help="Linhas por INSERT em lote (padrão: 10000)")
+    parser.add_argument("--senha", default="senha123", help="Senha dos administradores e analistas gerados")
+    args = parser.parse_args(argv)
+    fim = args.data_final or date.today() - timedelta(days=1)
+    if fim >= date.today():
+        parser.error("--data-final deve ser anterior a hoje (o histórico tem apenas sessões finalizadas)")
+
+    if args.url:
+        from src.database.connection import _criar_engine
+        engine = _criar_engine(args.url)
+    else:
+        from src.database.connection import engine
+
+    Base.metadata.create_all(bind=engine)
+    garantir_indices(engine)
+
+    gerador = GeradorDados(engine, semente=args.semente, lote=args.lote, senha=args.senha)
+    inicio = time.perf_counter()
+    topologia = gerador.gerar_topologia(
+        args.subsecionais,
+        args.unidades_por_subsecional,
+        args.salas_por_unidade,
+        args.computadores_por_sala,
+        args.advogados,
+        args.analistas,
+    )
+    print(
+        f"🏢 {len(topologia['salas'])} salas, {len(topologia['computadores'])} computadores, "
+        f"{len(topologia['usuarios'])} advogados ({time.perf_counter() - inicio:.1f}s)"
+    )
+
+    total = gerador.gerar_sessoes(topologia, args.sessoes, fim - timedelta(days=args.dias - 1), fim)
+    total += gerador.abrir_sessoes_ativas(topologia, args.ativas)
+    sobreposicoes = contar_sobreposicoes(engine, topologia["computadores"])
+    if sobreposicoes:
+        raise SystemExit(f"❌ {sobreposicoes} sessões sobrepostas no mesmo computador")
+    _notificar(engine, topologia["salas"])
+    print(f"✅ {total} sessões geradas em {time.perf_counter() - inicio:.1f}s (semente {args.semente})")
+
+
+if __name__ == "__main__":
+    main()
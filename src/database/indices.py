@@ -0,0 +1,37 @@
+"""
+Criação de índices em tabelas já existentes.
+
+Base.metadata.create_all só cria os índices junto com tabelas novas; esta função
+cria os índices declarados nas entities que ainda não existem no banco.
+
+No PostgreSQL também cria o índice trigram (pg_trgm) usado na busca parcial por IP.
+Ele não é declarado na entity porque depende de CREATE EXTENSION, que pode não ser
+permitido ao usuário do banco: nesse caso apenas a busca por prefixo usa índice.
+"""
+from sqlalchemy import text
+from src.database.base import Base
+
+
+def garantir_indices(bind) -> None:
+    """Cria os índices declarados nas entities que ainda não existem no banco"""
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            try:
+                indice.create(bind=bind, checkfirst=True)
+            except Exception as e:
+                print(f"⚠️ Aviso: Não foi possível criar o índice {indice.name}: {e}")
+    if bind.dialect.name == "postgresql":
+        _garantir_indice_trigrama_ip(bind)
+
+
+def _garantir_indice_trigrama_ip(bind) -> None:
+    """Índice GIN trigram em Computador.ip_da_maquina (ILIKE '%x%')"""
+    try:
+        with bind.begin() as conexao:
+            conexao.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conexao.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_computador_ip_trgm '
+                'ON "Computador" USING gin (ip_da_maquina gin_trgm_ops)'
+            ))
+    except Exception as e:
+        print(f"⚠️ Aviso: Não foi possível criar o índice ix_computador_ip_trgm (pg_trgm): {e}")
@@ -17,6 +17,8 @@ from src.entities.analista_de_ti import Analista_de_ti
 from src.entities.administrador_sala_coworking import Administrador_sala_coworking
 from src.entities.sessao import Sessao
 from src.utils.security import hash_password
+from src.services.hierarquia_service import hierarquia_index
+from src.repositories.computador_repository import ComputadorRepository
 
 
 def garantir_tabelas_existem():
@@ -91,6 +93,7 @@ def popular_subsecionais(db: Session, subsecionais: List[Dict[str, Any]]) -> Lis
             continue
     
     try:
+        hierarquia_index.agendar_invalidacao(db)
         db.commit()
         for obj in objetos:
             db.refresh(obj)
@@ -126,6 +129,7 @@ def popular_unidades(db: Session, unidades: List[Dict[str, Any]]) -> List[Unidad
             continue
     
     try:
+        hierarquia_index.agendar_invalidacao(db)
         db.commit()
         for obj in objetos:
             db.refresh(obj)
@@ -161,6 +165,7 @@ def popular_salas_coworking(db: Session, salas: List[Dict[str, Any]]) -> List[Sa
             continue
     
     try:
+        hierarquia_index.agendar_invalidacao(db)
         db.commit()
         for obj in objetos:
             db.refresh(obj)
@@ -346,6 +351,11 @@ def popular_sessoes(db: Session, sessoes: List[Dict[str, Any]]) -> List[Sessao]:
         db.commit()
         for obj in objetos:
             db.refresh(obj)
+        if objetos:
+            # Import local: src.database importa este módulo, e sessao_service depende de src.database
+            from src.services.sessao_service import SessaoService
+            coworking_ids = ComputadorRepository(db).get_coworking_ids({obj.computador_id for obj in objetos})
+            SessaoService(db).notificar_alteracao(coworking_ids)
         return objetos
     except IntegrityError as e:
         db.rollback()
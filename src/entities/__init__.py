@@ -8,6 +8,7 @@ from src.entities.sessao import Sessao
 from src.entities.unidade import Unidade, HierarquiaEnum
 from src.entities.subsecional import Subsecional
 from src.entities.sessoes_analistas import Sessoes_analistas
+from src.entities.versao_cache import Versao_cache
 
 __all__ = [
     "Cadastro",
@@ -21,5 +22,6 @@ __all__ = [
     "HierarquiaEnum",
     "Subsecional",
     "Sessoes_analistas",
+    "Versao_cache",
 ]
 
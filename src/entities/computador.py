@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from src.database.base import Base
 
 
 class Computador(Base):
     __tablename__ = "Computador"
+    __table_args__ = (
+        # Busca por prefixo de IP (LIKE 'x%'): no PostgreSQL o índice único padrão não
+        # atende LIKE fora da collation C. O índice trigram (busca em qualquer parte do
+        # IP) depende da extensão pg_trgm e é criado em src/database/indices.py
+        Index(
+            "ix_computador_ip_prefixo",
+            "ip_da_maquina",
+            postgresql_ops={"ip_da_maquina": "varchar_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
     computador_id = Column(Integer, primary_key=True, autoincrement=True)
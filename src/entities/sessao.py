@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from src.database.base import Base
 
@@ -20,4 +20,22 @@ class Sessao(Base):
     computador = relationship("Computador", back_populates="sessao")
     usuario = relationship("Usuario_advogado", back_populates="sessao")
     administrador = relationship("Administrador_sala_coworking", back_populates="sessoes")
-    analistas = relationship("Analista_de_ti", secondary="Sessoes_analistas", back_populates="sessoes")
\ No newline at end of file
+    analistas = relationship("Analista_de_ti", secondary="Sessoes_analistas", back_populates="sessoes")
+
+
+    __table_args__ = (
+        # No máximo uma sessão ativa por computador (índice único parcial).
+        # Garante a disponibilidade do computador mesmo com inícios concorrentes.
+        Index(
+            "ux_sessao_computador_ativa",
+            computador_id,
+            unique=True,
+            postgresql_where=(ativado == True) & final_de_sessao.is_(None),
+            sqlite_where=(ativado == True) & final_de_sessao.is_(None),
+        ).ddl_if(dialect=("postgresql", "sqlite")),
+        # MySQL não suporta índices parciais: índice composto para a busca
+        # da sessão ativa (a exclusividade é garantida com lock no Computador)
+        Index("ix_sessao_computador_ativado", computador_id, ativado).ddl_if(dialect="mysql"),
+        # Filtros por período (ano do dashboard, arquivamento mensal)
+        Index("ix_sessao_data", data),
+    )
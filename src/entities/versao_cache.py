@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from src.database.base import Base
+
+
+class Versao_cache(Base):
+    __tablename__ = "Versao_cache"
+
+
+    chave = Column(String(100), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
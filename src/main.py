@@ -1,8 +1,12 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.database.connection import engine
+from src.database.connection import engine, replica_engine, encerrar_pools, LEITURA_PRIMARIO_HEADER
 from src.database.base import Base
+from src.database.indices import garantir_indices
+from src.services.expiracao_service import agendador_expiracao, SESSAO_EXPIRACAO_HABILITADA
+from src.utils.compressao import MiddlewareCompressao, COMPRESSAO_HABILITADA
+from src.utils.leitura_primario import MiddlewareLeituraPrimario
 
 # Importar todos os routers
 from src.routes import (
@@ -20,6 +24,7 @@ from src.routes.auth_router import router as auth_router
 from src.routes.dashboard_router import router as dashboard_router
 from src.routes.relatorio_router import router as relatorio_router
 from src.routes.seed_router import router as seed_router
+from src.routes.ocupacao_router import router as ocupacao_router
 
 # Importar todas as entities para garantir que as tabelas sejam criadas
 from src.entities import (
@@ -33,11 +38,15 @@ from src.entities import (
     Unidade,
     Subsecional,
     Sessoes_analistas,
+    Versao_cache,
 )
 
-app = FastAPI(
-    title="Middleware OAB API",
-    description="""
+# Criação/verificação de tabelas e índices ao subir cada worker (dezenas de consultas
+# ao catálogo do banco). Desative quando o schema já é gerenciado fora da aplicação,
+# para workers subirem mais rápido (ex.: autoscaling)
+CRIAR_TABELAS_NA_INICIALIZACAO = os.getenv("CRIAR_TABELAS_NA_INICIALIZACAO", "true").lower() in ("1", "true", "sim")
+
+DESCRICAO = """
     API REST para gerenciamento de salas de coworking da OAB.
     
     ## Funcionalidades
@@ -56,62 +65,26 @@ app = FastAPI(
     
     Esta documentação é gerada automaticamente pelo Swagger/OpenAPI.
     Você pode testar os endpoints diretamente da interface.
-    """,
-    version="1.0.0",
-    servers=[
-        {
-            "url": "http://localhost:8000",
-            "description": "Servidor de desenvolvimento (localhost)"
-        },
-        {
-            "url": api_url,
-            "description": "Servidor de produção"
-        }
-    ] if (api_url := os.getenv("API_URL")) else [
-        {
-            "url": "http://localhost:8000",
-            "description": "Servidor de desenvolvimento"
-        }
-    ],
-    contact={
-        "name": "Suporte OAB",
-        "email": "suporte@oab.org.br",
-    },
-    license_info={
-        "name": "MIT",
-    },
-)
+    """
+
+ROUTERS = [
+    auth_router,
+    dashboard_router,
+    relatorio_router,
+    cadastro_router,
+    sessao_router,
+    computador_router,
+    sala_coworking_router,
+    unidade_router,
+    subsecional_router,
+    usuario_advogado_router,
+    analista_ti_router,
+    administrador_sala_router,
+    seed_router,
+    ocupacao_router,
+]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Incluir todos os routers
-app.include_router(auth_router, prefix="/api/v1")
-app.include_router(dashboard_router, prefix="/api/v1")
-app.include_router(relatorio_router, prefix="/api/v1")
-app.include_router(cadastro_router, prefix="/api/v1")
-app.include_router(sessao_router, prefix="/api/v1")
-app.include_router(computador_router, prefix="/api/v1")
-app.include_router(sala_coworking_router, prefix="/api/v1")
-app.include_router(unidade_router, prefix="/api/v1")
-app.include_router(subsecional_router, prefix="/api/v1")
-app.include_router(usuario_advogado_router, prefix="/api/v1")
-app.include_router(analista_ti_router, prefix="/api/v1")
-app.include_router(administrador_sala_router, prefix="/api/v1")
-app.include_router(seed_router, prefix="/api/v1")
-
-
-@app.get(
-    "/",
-    summary="Endpoint raiz",
-    description="Endpoint inicial da API. Retorna informações básicas sobre a API.",
-    tags=["Geral"]
-)
 def root():
     """
     Endpoint raiz da API.
@@ -127,12 +100,6 @@ def root():
     }
 
 
-@app.get(
-    "/health",
-    summary="Health Check",
-    description="Verifica o status da API. Útil para monitoramento e balanceadores de carga.",
-    tags=["Geral"]
-)
 def health_check():
     """
     Endpoint de verificação de saúde da API.
@@ -142,26 +109,125 @@ def health_check():
     return {"status": "ok", "mensagem": "API está funcionando corretamente"}
 
 
-@app.on_event("startup")
+def criar_tabelas() -> None:
+    """Cria as tabelas e índices que ainda não existem no banco"""
+    try:
+        # Criar tabelas apenas se a conexão for bem-sucedida
+        Base.metadata.create_all(bind=engine)
+        garantir_indices(engine)
+        print("✅ Tabelas do banco de dados verificadas/criadas com sucesso")
+    except Exception as e:
+        print(f"⚠️ Aviso: Não foi possível criar tabelas automaticamente: {e}")
+        print("💡 Certifique-se de que o banco de dados está acessível e configurado corretamente")
+
+
 async def startup_event():
     """
     Evento executado quando a aplicação inicia.
     Cria as tabelas do banco de dados se não existirem.
     """
-    try:
-        # Criar tabelas apenas se a conexão for bem-sucedida
+    if CRIAR_TABELAS_NA_INICIALIZACAO:
         # Usar run_in_executor para não bloquear o loop de eventos
         import asyncio
         from concurrent.futures import ThreadPoolExecutor
-        
-        def create_tables():
-            Base.metadata.create_all(bind=engine)
-        
+
         loop = asyncio.get_event_loop()
         with ThreadPoolExecutor() as executor:
-            await loop.run_in_executor(executor, create_tables)
-        print("✅ Tabelas do banco de dados verificadas/criadas com sucesso")
-    except Exception as e:
-        print(f"⚠️ Aviso: Não foi possível criar tabelas automaticamente: {e}")
-        print("💡 Certifique-se de que o banco de dados está acessível e configurado corretamente")
+            await loop.run_in_executor(executor, criar_tabelas)
+
+    # Expiração automática de sessões antigas (opcional)
+    if SESSAO_EXPIRACAO_HABILITADA:
+        agendador_expiracao.iniciar()
+
+
+async def shutdown_event():
+    """
+    Evento executado quando a aplicação é encerrada.
+    Interrompe as tarefas em segundo plano e fecha as conexões do pool.
+    """
+    await agendador_expiracao.parar()
+    encerrar_pools()
+
+
+def criar_app() -> FastAPI:
+    """
+    Cria e configura a aplicação (middlewares, routers e eventos).
+
+    Não abre conexões com o banco: o pool é criado sob demanda em cada worker,
+    o que permite pré-carregar a aplicação antes do fork (ver src/servidor.py).
+    """
+    app = FastAPI(
+        title="Middleware OAB API",
+        description=DESCRICAO,
+        version="1.0.0",
+        servers=[
+            {
+                "url": "http://localhost:8000",
+                "description": "Servidor de desenvolvimento (localhost)"
+            },
+            {
+                "url": api_url,
+                "description": "Servidor de produção"
+            }
+        ] if (api_url := os.getenv("API_URL")) else [
+            {
+                "url": "http://localhost:8000",
+                "description": "Servidor de desenvolvimento"
+            }
+        ],
+        contact={
+            "name": "Suporte OAB",
+            "email": "suporte@oab.org.br",
+        },
+        license_info={
+            "name": "MIT",
+        },
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Headers lidos pelo frontend (paginação por cursor e GET condicional)
+        expose_headers=[
+            "X-Proximo-Cursor", "X-Tem-Mais", "X-Total-Count", "X-Total-Estimado", "ETag", LEITURA_PRIMARIO_HEADER
+        ],
+    )
+
+    # Read-your-writes com réplica: leituras do cliente no primário logo após uma escrita dele
+    if replica_engine is not engine:
+        app.add_middleware(MiddlewareLeituraPrimario)
+
+    # Compressão (gzip/br/zstd) das respostas completas acima do tamanho mínimo
+    if COMPRESSAO_HABILITADA:
+        app.add_middleware(MiddlewareCompressao)
+
+    # Incluir todos os routers
+    for router in ROUTERS:
+        app.include_router(router, prefix="/api/v1")
+
+    app.add_api_route(
+        "/",
+        root,
+        methods=["GET"],
+        summary="Endpoint raiz",
+        description="Endpoint inicial da API. Retorna informações básicas sobre a API.",
+        tags=["Geral"]
+    )
+    app.add_api_route(
+        "/health",
+        health_check,
+        methods=["GET"],
+        summary="Health Check",
+        description="Verifica o status da API. Útil para monitoramento e balanceadores de carga.",
+        tags=["Geral"]
+    )
+    app.on_event("startup")(startup_event)
+    app.on_event("shutdown")(shutdown_event)
+    return app
+
 
+# Instância usada por `uvicorn src.main:app` e pelo runner de produção (src/servidor.py)
+app = criar_app()
@@ -1,4 +1,5 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from typing import Generic, TypeVar, Type, Optional, List, NamedTuple, Sequence
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from src.database.base import Base
@@ -6,6 +7,11 @@ from src.database.base import Base
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+class ResultadoLote(NamedTuple):
+    encontrados: list
+    ids_nao_encontrados: List[int]
+
+
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], db: Session):
         self.model = model
@@ -17,6 +23,26 @@ class BaseRepository(Generic[ModelType]):
     def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return self.db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_many(self, ids: Sequence[int], *opcoes) -> ResultadoLote:
+        """Busca vários registros pela chave primária em uma única consulta (IN)
+        
+        Os registros voltam na ordem de `ids` (ids repetidos aparecem uma vez) e os
+        ids sem registro são informados em ids_nao_encontrados. `opcoes` são repassadas
+        a query.options (ex.: joinedload para carregar relacionamentos na mesma consulta).
+        """
+        ids_unicos = list(dict.fromkeys(ids))
+        if not ids_unicos:
+            return ResultadoLote([], [])
+        chave = inspect(self.model).primary_key[0]
+        por_id = {
+            inspect(obj).identity[0]: obj
+            for obj in self.db.query(self.model).options(*opcoes).filter(chave.in_(ids_unicos)).all()
+        }
+        return ResultadoLote(
+            [por_id[id] for id in ids_unicos if id in por_id],
+            [id for id in ids_unicos if id not in por_id],
+        )
+
     def create(self, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
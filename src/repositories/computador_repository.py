@@ -28,9 +28,38 @@ class ComputadorRepository(BaseRepository[Computador]):
             Computador.coworking_id == coworking_id
         ).all()
 
+    def get_coworking_ids(self, computador_ids) -> List[int]:
+        """Retorna as salas (coworking_id) dos computadores informados"""
+        if not computador_ids:
+            return []
+        return [
+            coworking_id
+            for (coworking_id,) in self.db.query(Computador.coworking_id).filter(
+                Computador.computador_id.in_(computador_ids)
+            ).distinct().all()
+        ]
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Computador]:
         return self.db.query(Computador).offset(skip).limit(limit).all()
 
+    def _query_projetada(self):
+        """Consulta apenas as colunas de ComputadorResponse (tuplas, sem identidades ORM)"""
+        return self.db.query(
+            Computador.computador_id,
+            Computador.ip_da_maquina,
+            Computador.numero_de_tombamento,
+            Computador.coworking_id,
+        )
+
+    def get_all_projetado(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        return [linha._asdict() for linha in self._query_projetada().offset(skip).limit(limit).all()]
+
+    def get_by_coworking_projetado(self, coworking_id: int) -> List[dict]:
+        return [
+            linha._asdict()
+            for linha in self._query_projetada().filter(Computador.coworking_id == coworking_id).all()
+        ]
+
     def create(self, obj_in: dict) -> Computador:
         return super().create(obj_in)
 
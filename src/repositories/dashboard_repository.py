@@ -1,7 +1,7 @@
-from typing import Optional, List, Dict, Tuple
-from datetime import datetime
+from typing import Any, Optional, List, Dict, Tuple
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, desc
+from sqlalchemy import func, extract, desc, and_, or_
 from src.entities.sessao import Sessao
 from src.entities.computador import Computador
 from src.entities.sala_coworking import Sala_coworking
@@ -11,14 +11,15 @@ class DashboardRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _filtro_ano(ano: int):
+        """Sessões do ano como intervalo de datas (usa o índice ix_sessao_data, ao contrário de EXTRACT)"""
+        return and_(Sessao.data >= date(ano, 1, 1), Sessao.data < date(ano + 1, 1, 1))
+
     def validar_hierarquia(self, subsecional_id: int, unidade_id: int, coworking_id: int) -> bool:
         """Valida se a hierarquia subsecional -> unidade -> coworking está correta"""
-        sala = self.db.query(Sala_coworking).filter(
-            Sala_coworking.coworking_id == coworking_id,
-            Sala_coworking.unidade_id == unidade_id,
-            Sala_coworking.subsecional_id == subsecional_id
-        ).first()
-        return sala is not None
+        from src.services.hierarquia_service import hierarquia_index
+        return hierarquia_index.validar_hierarquia(self.db, subsecional_id, unidade_id, coworking_id)
 
     def contar_sessoes_ativas(self, coworking_id: int, ano: Optional[int] = None) -> int:
         """Conta o número de sessões ativas na sala coworking
@@ -70,7 +71,7 @@ class DashboardRepository:
         )
         
         if ano is not None:
-            query = query.filter(extract('year', Sessao.data) == ano)
+            query = query.filter(self._filtro_ano(ano))
         
         return query.count()
 
@@ -86,7 +87,7 @@ class DashboardRepository:
         )
         
         if ano is not None:
-            query = query.filter(extract('year', Sessao.data) == ano)
+            query = query.filter(self._filtro_ano(ano))
         
         resultado = query.group_by(
             func.date_trunc('hour', Sessao.inicio_de_sessao)
@@ -98,6 +99,75 @@ class DashboardRepository:
             return (resultado.hora, resultado.quantidade)
         return None
 
+    def _dia_da_semana(self, coluna) -> Tuple[Any, int]:
+        """Expressão do dia da semana de `coluna` no dialeto do banco e o valor de domingo"""
+        if self.db.get_bind().dialect.name == "mysql":
+            # MySQL não suporta EXTRACT(DOW); DAYOFWEEK vai de 1 (domingo) a 7.
+            # O ajuste para 0 é feito no Python: "DAYOFWEEK(x) - %s" no SELECT e no GROUP BY
+            # não seria reconhecido como a mesma expressão (ONLY_FULL_GROUP_BY)
+            return func.dayofweek(coluna), 1
+        # PostgreSQL: EXTRACT(DOW); SQLite: strftime('%w') (gerado pelo SQLAlchemy)
+        return extract('dow', coluna), 0
+
+    def contar_sessoes_por_dia_semana_e_hora(self, coworking_id: int, ano: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """Sessões iniciadas por (dia da semana, hora), em uma única consulta agrupada
+        
+        Retorna trincas (dia_semana, hora, quantidade), com dia_semana de 0 (domingo)
+        a 6 (sábado). Apenas as combinações com sessões aparecem.
+        """
+        dia_semana, domingo = self._dia_da_semana(Sessao.inicio_de_sessao)
+        hora = extract('hour', Sessao.inicio_de_sessao)
+        query = self.db.query(
+            dia_semana.label('dia_semana'),
+            hora.label('hora'),
+            func.count(Sessao.sessao_id).label('quantidade')
+        ).join(
+            Computador, Sessao.computador_id == Computador.computador_id
+        ).filter(
+            Computador.coworking_id == coworking_id
+        )
+        
+        if ano is not None:
+            query = query.filter(self._filtro_ano(ano))
+        
+        resultados = query.group_by(dia_semana, hora).all()
+        return [(int(r.dia_semana) - domingo, int(r.hora), r.quantidade) for r in resultados]
+
+    def contar_computadores(self, coworking_id: int) -> int:
+        """Número de computadores da sala coworking"""
+        return self.db.query(func.count(Computador.computador_id)).filter(
+            Computador.coworking_id == coworking_id
+        ).scalar()
+
+    def obter_intervalos_sessoes(
+        self, coworking_id: int, inicio: datetime, fim: datetime, duracao_maxima: timedelta
+    ) -> List[Tuple[datetime, Optional[datetime]]]:
+        """Pares (inicio_de_sessao, final_de_sessao) das sessões da sala que tocam [inicio, fim)
+        
+        Sessões ativas vêm com final_de_sessao None, independente da data de início.
+        Sessões encerradas sem final_de_sessao (desativadas sem horário de término)
+        são descartadas. As encerradas são filtradas pela data (índice ix_sessao_data),
+        recuando `duracao_maxima` para incluir as que começaram antes do período e
+        ainda estavam abertas no início dele.
+        """
+        return self.db.query(
+            Sessao.inicio_de_sessao,
+            Sessao.final_de_sessao
+        ).join(
+            Computador, Sessao.computador_id == Computador.computador_id
+        ).filter(
+            Computador.coworking_id == coworking_id,
+            Sessao.inicio_de_sessao < fim,
+            or_(
+                and_(
+                    Sessao.data >= (inicio - duracao_maxima).date(),
+                    Sessao.data <= fim.date(),
+                    Sessao.final_de_sessao > inicio
+                ),
+                and_(Sessao.final_de_sessao.is_(None), Sessao.ativado == True)
+            )
+        ).all()
+
     def obter_coworking_mais_utilizado(self, subsecional_id: int, unidade_id: int, ano: Optional[int] = None) -> Optional[Dict]:
         """Obtém a sala coworking mais utilizada na unidade/subsecional"""
         query = self.db.query(
@@ -114,7 +184,7 @@ class DashboardRepository:
         )
         
         if ano is not None:
-            query = query.filter(extract('year', Sessao.data) == ano)
+            query = query.filter(self._filtro_ano(ano))
         
         resultado = query.group_by(
             Sala_coworking.coworking_id,
@@ -131,6 +201,25 @@ class DashboardRepository:
             }
         return None
 
+    def contar_sessoes_por_sala(self, subsecional_id: int, unidade_id: int, ano: Optional[int] = None) -> Dict[int, int]:
+        """Total de sessões de cada sala coworking da unidade/subsecional"""
+        query = self.db.query(
+            Computador.coworking_id,
+            func.count(Sessao.sessao_id)
+        ).join(
+            Sessao, Computador.computador_id == Sessao.computador_id
+        ).join(
+            Sala_coworking, Sala_coworking.coworking_id == Computador.coworking_id
+        ).filter(
+            Sala_coworking.subsecional_id == subsecional_id,
+            Sala_coworking.unidade_id == unidade_id
+        )
+        
+        if ano is not None:
+            query = query.filter(self._filtro_ano(ano))
+        
+        return dict(query.group_by(Computador.coworking_id).all())
+
     def obter_frequencia_mensal(self, coworking_id: int, ano: Optional[int] = None) -> List[Dict]:
         """Obtém a frequência de uso de computadores por mês"""
         query = self.db.query(
@@ -144,7 +233,7 @@ class DashboardRepository:
         )
         
         if ano is not None:
-            query = query.filter(extract('year', Sessao.data) == ano)
+            query = query.filter(self._filtro_ano(ano))
         
         resultados = query.group_by(
             extract('year', Sessao.data),
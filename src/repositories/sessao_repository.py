@@ -1,23 +1,72 @@
-from typing import Optional, List
+import json
+from typing import Dict, Iterator, Optional, List
 from datetime import date, datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Session, joinedload, aliased
+from sqlalchemy import func, and_, or_, select, update, delete, extract, bindparam
 from src.entities.sessao import Sessao
 from src.entities.analista_de_ti import Analista_de_ti
 from src.entities.computador import Computador
 from src.entities.sala_coworking import Sala_coworking
 from src.entities.subsecional import Subsecional
 from src.entities.unidade import Unidade
-from src.entities.usuario_advogado import Usuario_advogado
 from src.entities.cadastro import Cadastro
+from src.entities.sessoes_analistas import Sessoes_analistas
 from src.repositories.base_repository import BaseRepository
-from src.schemas.filtro_sessao import FiltroSessao, OrdenacaoData
+from src.schemas.filtro_sessao import FiltroSessao, OrdenacaoData, ModoBuscaIp
+
+
+# Subseccional alcançada pela unidade da sala e diretamente pela sala
+_SubsecionalDaUnidade = aliased(Subsecional)
+_SubsecionalDaSala = aliased(Subsecional)
 
 
 class SessaoRepository(BaseRepository[Sessao]):
     def __init__(self, db: Session):
         super().__init__(Sessao, db)
 
+    def _query_projetada(self):
+        """Consulta apenas as colunas de SessaoResponse, em um único join plano
+        
+        Evita hidratar o grafo Sessao -> Computador -> Sala -> Unidade -> Subsecional:
+        cada linha é uma tupla de colunas, sem identidades ORM. A subseccional vem da
+        unidade da sala e, na falta dela, diretamente da sala.
+        """
+        return self.db.query(
+            Sessao.sessao_id,
+            Sessao.data,
+            Sessao.inicio_de_sessao,
+            Sessao.final_de_sessao,
+            Sessao.ativado,
+            Sessao.computador_id,
+            Sessao.usuario_id,
+            Sessao.administrador_id,
+            Sala_coworking.coworking_id,
+            Sala_coworking.nome_da_sala,
+            Unidade.unidade_id,
+            Unidade.nome.label("unidade_nome"),
+            func.coalesce(
+                _SubsecionalDaUnidade.subsecional_id, _SubsecionalDaSala.subsecional_id
+            ).label("subsecional_id"),
+            func.coalesce(_SubsecionalDaUnidade.nome, _SubsecionalDaSala.nome).label("subsecional_nome"),
+        ).select_from(Sessao).outerjoin(
+            Computador, Sessao.computador_id == Computador.computador_id
+        ).outerjoin(
+            Sala_coworking, Computador.coworking_id == Sala_coworking.coworking_id
+        ).outerjoin(
+            Unidade, Sala_coworking.unidade_id == Unidade.unidade_id
+        ).outerjoin(
+            _SubsecionalDaUnidade, Unidade.subsecional_id == _SubsecionalDaUnidade.subsecional_id
+        ).outerjoin(
+            _SubsecionalDaSala, Sala_coworking.subsecional_id == _SubsecionalDaSala.subsecional_id
+        )
+
+    @staticmethod
+    def _paginar_por_cursor(query, cursor: Optional[int], limite: int):
+        """Paginação por cursor (keyset) em sessao_id: estável e sem OFFSET"""
+        if cursor is not None:
+            query = query.filter(Sessao.sessao_id > cursor)
+        return query.order_by(Sessao.sessao_id.asc()).limit(limite)
+
     def get_by_id(self, sessao_id: int) -> Optional[Sessao]:
         return self.db.query(Sessao).options(
             joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.subsecional),
@@ -30,17 +79,34 @@ class SessaoRepository(BaseRepository[Sessao]):
             joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional)
         ).offset(skip).limit(limit).all()
 
-    def get_by_usuario(self, usuario_id: int) -> List[Sessao]:
-        return self.db.query(Sessao).options(
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.subsecional),
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional)
-        ).filter(Sessao.usuario_id == usuario_id).all()
+    def get_by_usuario(self, usuario_id: int, cursor: Optional[int] = None, limite: int = 100) -> List[dict]:
+        """Sessões do usuário com sessao_id > cursor (linhas projetadas, ver _query_projetada)"""
+        query = self._query_projetada().filter(Sessao.usuario_id == usuario_id)
+        return [linha._asdict() for linha in self._paginar_por_cursor(query, cursor, limite).all()]
 
-    def get_by_computador(self, computador_id: int) -> Optional[Sessao]:
-        return self.db.query(Sessao).filter(Sessao.computador_id == computador_id).first()
+    def get_ativa_by_computador(self, computador_id: int, bloquear: bool = False) -> Optional[Sessao]:
+        """Retorna a sessão ativa do computador (se houver)
+        
+        Usa o índice ux_sessao_computador_ativa (PostgreSQL/SQLite) ou
+        ix_sessao_computador_ativado (MySQL).
+        
+        Se bloquear=True, trava a linha do Computador (SELECT ... FOR UPDATE) até o
+        commit, serializando inícios de sessão concorrentes na mesma máquina.
+        """
+        if bloquear:
+            self.db.query(Computador.computador_id).filter(
+                Computador.computador_id == computador_id
+            ).with_for_update().first()
+        return self.db.query(Sessao).filter(
+            Sessao.computador_id == computador_id,
+            Sessao.ativado == True,
+            Sessao.final_de_sessao.is_(None)
+        ).first()
 
-    def get_by_administrador(self, administrador_id: int) -> List[Sessao]:
-        return self.db.query(Sessao).filter(Sessao.administrador_id == administrador_id).all()
+    def get_by_administrador(self, administrador_id: int, cursor: Optional[int] = None, limite: int = 100) -> List[Sessao]:
+        """Sessões do administrador com sessao_id > cursor (no máximo `limite`)"""
+        query = self.db.query(Sessao).filter(Sessao.administrador_id == administrador_id)
+        return self._paginar_por_cursor(query, cursor, limite).all()
 
     def get_by_administrador_paginado(self, administrador_id: int, skip: int = 0, limit: int = 100) -> List[Sessao]:
         return self.db.query(Sessao).options(
@@ -48,39 +114,68 @@ class SessaoRepository(BaseRepository[Sessao]):
             joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional)
         ).filter(Sessao.administrador_id == administrador_id).offset(skip).limit(limit).all()
 
-    def get_ativas(self) -> List[Sessao]:
-        """Retorna todas as sessões ativas
+    def get_ativas(self, cursor: Optional[int] = None, limite: int = 100) -> List[dict]:
+        """Retorna as sessões ativas com sessao_id > cursor (no máximo `limite`)
         Uma sessão é considerada ativa quando:
         - ativado == True
         - final_de_sessao IS NULL (não foi finalizada)
         """
-        return self.db.query(Sessao).options(
+        query = self._query_projetada().filter(
+            Sessao.ativado == True,
+            Sessao.final_de_sessao.is_(None)
+        )
+        return [linha._asdict() for linha in self._paginar_por_cursor(query, cursor, limite).all()]
+
+    def get_ativas_por_coworking(self, coworking_id: int) -> List[Sessao]:
+        """Retorna as sessões ativas dos computadores de uma sala coworking"""
+        return self.db.query(Sessao).join(
+            Computador, Sessao.computador_id == Computador.computador_id
+        ).options(
             joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.subsecional),
             joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional)
         ).filter(
+            Computador.coworking_id == coworking_id,
             Sessao.ativado == True,
             Sessao.final_de_sessao.is_(None)
         ).all()
 
-    def get_por_data(self, data: date) -> List[Sessao]:
-        return self.db.query(Sessao).options(
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.subsecional),
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional)
-        ).filter(Sessao.data == data).all()
+    def get_por_data(self, data: date, cursor: Optional[int] = None, limite: int = 100) -> List[dict]:
+        """Sessões da data com sessao_id > cursor (linhas projetadas, ver _query_projetada)"""
+        query = self._query_projetada().filter(Sessao.data == data)
+        return [linha._asdict() for linha in self._paginar_por_cursor(query, cursor, limite).all()]
 
-    def filtrar_sessoes(self, filtros: FiltroSessao) -> List[Sessao]:
-        """Método robusto para filtrar sessões com múltiplos critérios"""
-        # Inicializar query base
-        query = self.db.query(Sessao)
+    def filtrar_sessoes(self, filtros: FiltroSessao, com_total: bool = False) -> List[dict]:
+        """Método robusto para filtrar sessões com múltiplos critérios
         
-        # Verificar se precisa fazer join com Computador (para filtro de IP)
-        precisa_join = filtros.ip_computador is not None and filtros.ip_computador.strip() != ""
+        Retorna linhas projetadas (ver _query_projetada), que já incluem o join com Computador.
+        Se com_total=True, cada linha traz também "total": a contagem sem paginação,
+        calculada na mesma consulta com COUNT(*) OVER().
+        """
+        query = self._query_filtrada(filtros)
+        if com_total:
+            query = query.add_columns(func.count().over().label("total"))
         
-        # Fazer join com Computador se necessário
-        if precisa_join:
-            query = query.join(Computador, Sessao.computador_id == Computador.computador_id)
+        # Paginação (offset e limit devem ser aplicados por último)
+        query = query.offset(filtros.skip).limit(filtros.limit)
+        
+        return [linha._asdict() for linha in query.all()]
+
+    def iterar_sessoes_filtradas(self, filtros: FiltroSessao, tamanho_lote: int = 1000) -> Iterator[dict]:
+        """Percorre todas as sessões dos filtros (sem paginação) com cursor no servidor
         
-        # Aplicar filtros
+        yield_per ativa stream_results: o driver busca `tamanho_lote` linhas por vez
+        (cursor nomeado no PostgreSQL, SSCursor no MySQL), mantendo a memória constante.
+        """
+        query = self._query_filtrada(filtros).yield_per(tamanho_lote)
+        for linha in query:
+            yield linha._asdict()
+
+    def _condicoes_filtro(self, filtros: FiltroSessao) -> list:
+        """Condições WHERE de FiltroSessao, compartilhadas por listagem, exportação e contagem
+        
+        O filtro de IP referencia Computador: a consulta precisa incluir o join
+        (ver _precisa_join_computador).
+        """
         filtros_aplicados = []
         
         # Filtro por administrador
@@ -91,13 +186,9 @@ class SessaoRepository(BaseRepository[Sessao]):
         if filtros.datetime_inicio is not None:
             filtros_aplicados.append(Sessao.inicio_de_sessao >= filtros.datetime_inicio)
         
-        # Filtro por IP do computador usando LIKE do SQL (busca parcial)
-        # Aplicar diretamente na query para garantir que funcione
-        if precisa_join:
-            ip_busca = filtros.ip_computador.strip()
-            # Usar ilike (case-insensitive LIKE) com % no início e fim para busca parcial
-            # Aplicar diretamente na query
-            query = query.filter(Computador.ip_da_maquina.ilike(f"%{ip_busca}%"))
+        # Filtro por IP do computador (busca parcial ou por prefixo)
+        if self._precisa_join_computador(filtros):
+            filtros_aplicados.append(self._filtro_ip(filtros))
         
         # Filtro por sessões ativas
         if filtros.apenas_ativas is not None:
@@ -118,11 +209,22 @@ class SessaoRepository(BaseRepository[Sessao]):
                     )
                 )
         
-        # Aplicar todos os outros filtros
+        return filtros_aplicados
+
+    @staticmethod
+    def _precisa_join_computador(filtros: FiltroSessao) -> bool:
+        return filtros.ip_computador is not None and filtros.ip_computador.strip() != ""
+
+    def _query_filtrada(self, filtros: FiltroSessao):
+        """Consulta projetada com os filtros e a ordenação de FiltroSessao (sem paginação)"""
+        query = self._query_projetada()
+        
+        filtros_aplicados = self._condicoes_filtro(filtros)
         if filtros_aplicados:
             query = query.filter(and_(*filtros_aplicados))
         
-        # Ordenação (ANTES do distinct para garantir ordem correta)
+        # Ordenação
+        # (sem DISTINCT: os joins são muitos-para-um, cada sessão aparece uma única vez)
         if filtros.ordenar_por_data == OrdenacaoData.MAIS_RECENTE_PRIMEIRO:
             # Mais recente primeiro (DESC)
             query = query.order_by(Sessao.inicio_de_sessao.desc())
@@ -130,78 +232,130 @@ class SessaoRepository(BaseRepository[Sessao]):
             # Mais antiga primeiro (ASC)
             query = query.order_by(Sessao.inicio_de_sessao.asc())
         
-        # Usar distinct() se fizemos join para evitar duplicatas
-        # IMPORTANTE: distinct() deve ser aplicado DEPOIS da ordenação e ANTES da paginação
-        if precisa_join:
-            query = query.distinct()
+        return query
+
+    @staticmethod
+    def _filtro_ip(filtros: FiltroSessao):
+        """Condição de busca por IP do computador
         
-        # Paginação (offset e limit devem ser aplicados por último, após distinct)
-        query = query.offset(filtros.skip).limit(filtros.limit)
+        - prefixo: LIKE 'x%' — usa um índice B-tree no PostgreSQL (ix_computador_ip_prefixo,
+          com varchar_pattern_ops) e no MySQL (índice único de ip_da_maquina); no SQLite,
+          o LIKE com ESCAPE não diferencia maiúsculas e não usa o índice
+        - contem: ILIKE '%x%' — no PostgreSQL usa o índice trigram ix_computador_ip_trgm
+          (pg_trgm); nos demais bancos percorre a tabela Computador
         
-        # Carregar relacionamentos necessários com joinedload (para evitar N+1 queries)
-        query = query.options(
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.subsecional),
-            joinedload(Sessao.computador).joinedload(Computador.sala).joinedload(Sala_coworking.unidade).joinedload(Unidade.subsecional),
-            joinedload(Sessao.usuario).joinedload(Usuario_advogado.cadastro)
-        )
-        
-        return query.all()
+        Curingas (% e _) digitados pelo usuário são escapados.
+        """
+        ip_busca = filtros.ip_computador.strip()
+        escapado = ip_busca.replace("/", "//").replace("%", "/%").replace("_", "/_")
+        if filtros.busca_ip == ModoBuscaIp.PREFIXO:
+            # Padrão montado aqui (e não com ||) para o planejador enxergar um prefixo constante
+            return Computador.ip_da_maquina.like(f"{escapado}%", escape="/")
+        return Computador.ip_da_maquina.ilike(f"%{escapado}%", escape="/")
+
+    def _query_sessao_filtrada(self, filtros: FiltroSessao, *colunas):
+        """Consulta de `colunas` sobre Sessao com os filtros (join com Computador só se necessário)"""
+        query = self.db.query(*colunas).select_from(Sessao)
+        if self._precisa_join_computador(filtros):
+            query = query.join(Computador, Sessao.computador_id == Computador.computador_id)
+        filtros_aplicados = self._condicoes_filtro(filtros)
+        if filtros_aplicados:
+            query = query.filter(and_(*filtros_aplicados))
+        return query
     
     def contar_sessoes_filtradas(self, filtros: FiltroSessao) -> int:
         """Conta o total de sessões que correspondem aos filtros (sem paginação)"""
-        # Inicializar query base
-        query = self.db.query(Sessao)
-        
-        # Verificar se precisa fazer join com Computador (para filtro de IP)
-        precisa_join = filtros.ip_computador is not None and filtros.ip_computador.strip() != ""
-        
-        # Fazer join com Computador se necessário
-        if precisa_join:
-            query = query.join(Computador, Sessao.computador_id == Computador.computador_id)
-        
-        # Aplicar filtros
-        filtros_aplicados = []
-        
-        # Filtro por administrador
-        if filtros.administrador_id is not None:
-            filtros_aplicados.append(Sessao.administrador_id == filtros.administrador_id)
-        
-        # Filtro por datetime mínimo de início (>= datetime_inicio)
-        if filtros.datetime_inicio is not None:
-            filtros_aplicados.append(Sessao.inicio_de_sessao >= filtros.datetime_inicio)
-        
-        # Filtro por IP do computador
-        if precisa_join:
-            ip_busca = filtros.ip_computador.strip()
-            query = query.filter(Computador.ip_da_maquina.ilike(f"%{ip_busca}%"))
+        return self._query_sessao_filtrada(filtros, func.count(Sessao.sessao_id)).scalar() or 0
+
+    def estimar_sessoes_filtradas(self, filtros: FiltroSessao) -> int:
+        """Estimativa do total de sessões dos filtros, sem percorrê-las
         
-        # Filtro por sessões ativas
-        if filtros.apenas_ativas is not None:
-            if filtros.apenas_ativas:
-                filtros_aplicados.append(
-                    and_(
-                        Sessao.ativado == True,
-                        Sessao.final_de_sessao.is_(None)
-                    )
-                )
-            else:
-                filtros_aplicados.append(
-                    or_(
-                        Sessao.ativado == False,
-                        Sessao.final_de_sessao.isnot(None)
-                    )
+        No PostgreSQL usa a estimativa de linhas do planejador (EXPLAIN), calculada a
+        partir das estatísticas da tabela: custo constante, mas o valor é aproximado.
+        Nos demais bancos recorre à contagem exata.
+        """
+        conexao = self.db.connection()
+        if conexao.dialect.name != "postgresql":
+            return self.contar_sessoes_filtradas(filtros)
+        query = self._query_sessao_filtrada(filtros, Sessao.sessao_id)
+        compilado = query.statement.compile(
+            dialect=conexao.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        plano = conexao.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compilado}", compilado.params
+        ).scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        return int(plano[0]["Plan"]["Plan Rows"])
+
+    def get_meses_arquivaveis(self, limite: date) -> List[tuple]:
+        """Meses (ano, mes) com sessões finalizadas e data anterior a `limite`"""
+        ano = extract("year", Sessao.data)
+        mes = extract("month", Sessao.data)
+        return [
+            (int(a), int(m))
+            for a, m in self.db.query(ano, mes).filter(
+                Sessao.data < limite,
+                Sessao.final_de_sessao.isnot(None)
+            ).group_by(ano, mes).order_by(ano, mes).all()
+        ]
+
+    def iterar_finalizadas_no_periodo(self, inicio: date, fim: date, tamanho_lote: int = 5000) -> Iterator[dict]:
+        """Sessões finalizadas com inicio <= data < fim, com o coworking_id do computador"""
+        query = self.db.query(
+            Sessao.sessao_id,
+            Sessao.data,
+            Sessao.inicio_de_sessao,
+            Sessao.final_de_sessao,
+            Sessao.ativado,
+            Sessao.computador_id,
+            Sessao.usuario_id,
+            Sessao.administrador_id,
+            Computador.coworking_id,
+        ).outerjoin(
+            Computador, Sessao.computador_id == Computador.computador_id
+        ).filter(
+            Sessao.data >= inicio,
+            Sessao.data < fim,
+            Sessao.final_de_sessao.isnot(None)
+        ).order_by(Sessao.sessao_id).yield_per(tamanho_lote)
+        for linha in query:
+            yield linha._asdict()
+
+    def get_analistas_finalizadas_no_periodo(self, inicio: date, fim: date) -> Dict[int, List[int]]:
+        """Vínculos com analistas (sessao_id -> analista_ids) das sessões de iterar_finalizadas_no_periodo"""
+        query = self.db.query(
+            Sessoes_analistas.c.sessao_id,
+            Sessoes_analistas.c.analista_id
+        ).join(
+            Sessao, Sessao.sessao_id == Sessoes_analistas.c.sessao_id
+        ).filter(
+            Sessao.data >= inicio,
+            Sessao.data < fim,
+            Sessao.final_de_sessao.isnot(None)
+        ).order_by(Sessoes_analistas.c.sessao_id, Sessoes_analistas.c.analista_id)
+        analistas: Dict[int, List[int]] = {}
+        for sessao_id, analista_id in query:
+            analistas.setdefault(sessao_id, []).append(analista_id)
+        return analistas
+
+    def excluir_em_lote(self, sessao_ids: List[int], tamanho_lote: int = 1000) -> int:
+        """Exclui as sessões (e seus vínculos com analistas) em uma única transação"""
+        excluidas = 0
+        try:
+            for i in range(0, len(sessao_ids), tamanho_lote):
+                ids = sessao_ids[i:i + tamanho_lote]
+                self.db.execute(delete(Sessoes_analistas).where(Sessoes_analistas.c.sessao_id.in_(ids)))
+                resultado = self.db.execute(
+                    delete(Sessao).where(Sessao.sessao_id.in_(ids)),
+                    execution_options={"synchronize_session": False}
                 )
-        
-        # Aplicar todos os outros filtros
-        if filtros_aplicados:
-            query = query.filter(and_(*filtros_aplicados))
-        
-        # Usar distinct() se fizemos join para contar corretamente
-        if precisa_join:
-            query = query.distinct()
-        
-        # Contar total (sem paginação)
-        return query.count()
+                excluidas += resultado.rowcount
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return excluidas
 
     def create(self, obj_in: dict, analista_ids: Optional[List[int]] = None) -> Sessao:
         db_obj = Sessao(**obj_in)
@@ -243,6 +397,158 @@ class SessaoRepository(BaseRepository[Sessao]):
         self.db.refresh(sessao)
         return sessao
 
+    def alterar_em_lote(
+        self,
+        valores: dict,
+        condicoes: list,
+        sessao_ids: Optional[List[int]] = None,
+        coworking_id: Optional[int] = None
+    ) -> List[dict]:
+        """Aplica um UPDATE único às sessões selecionadas e retorna as linhas afetadas
+        
+        Usa UPDATE ... RETURNING quando o banco suporta (PostgreSQL, SQLite, MariaDB).
+        No MySQL, seleciona as linhas com FOR UPDATE e atualiza por ID.
+        """
+        if sessao_ids is not None:
+            condicoes = condicoes + [Sessao.sessao_id.in_(sessao_ids)]
+        if coworking_id is not None:
+            condicoes = condicoes + [Sessao.computador_id.in_(
+                select(Computador.computador_id).where(Computador.coworking_id == coworking_id)
+            )]
+        
+        colunas = [
+            Sessao.sessao_id,
+            Sessao.data,
+            Sessao.inicio_de_sessao,
+            Sessao.final_de_sessao,
+            Sessao.ativado,
+            Sessao.computador_id,
+            Sessao.usuario_id,
+            Sessao.administrador_id,
+        ]
+        
+        try:
+            if self.db.get_bind().dialect.update_returning:
+                resultado = self.db.execute(
+                    update(Sessao).where(*condicoes).values(**valores).returning(*colunas),
+                    execution_options={"synchronize_session": False}
+                )
+                linhas = [dict(r._mapping) for r in resultado]
+            else:
+                linhas = [
+                    dict(r._mapping)
+                    for r in self.db.execute(select(*colunas).where(*condicoes).with_for_update())
+                ]
+                if linhas:
+                    self.db.execute(
+                        update(Sessao).where(
+                            Sessao.sessao_id.in_([l["sessao_id"] for l in linhas])
+                        ).values(**valores),
+                        execution_options={"synchronize_session": False}
+                    )
+                    for linha in linhas:
+                        linha.update(valores)
+            self.db.commit()
+            return linhas
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def get_coworking_ids(
+        self,
+        sessao_ids: Optional[List[int]] = None,
+        usuario_id: Optional[int] = None
+    ) -> List[Optional[int]]:
+        """Salas (coworking_id do computador) das sessões informadas ou do usuário; None para sessões sem sala"""
+        query = self.db.query(Computador.coworking_id).select_from(Sessao).outerjoin(
+            Computador, Sessao.computador_id == Computador.computador_id
+        )
+        if sessao_ids is not None:
+            query = query.filter(Sessao.sessao_id.in_(sessao_ids))
+        if usuario_id is not None:
+            query = query.filter(Sessao.usuario_id == usuario_id)
+        return [coworking_id for (coworking_id,) in query.distinct().all()]
+
+    def get_ativas_iniciadas_antes(self, limite: datetime, quantidade: int) -> List[tuple]:
+        """Retorna até `quantidade` pares (sessao_id, inicio_de_sessao) de sessões abertas iniciadas antes de `limite`"""
+        return [
+            (sessao_id, inicio_de_sessao)
+            for sessao_id, inicio_de_sessao in self.db.query(Sessao.sessao_id, Sessao.inicio_de_sessao).filter(
+                Sessao.ativado == True,
+                Sessao.final_de_sessao.is_(None),
+                Sessao.inicio_de_sessao < limite
+            ).order_by(Sessao.sessao_id).limit(quantidade).all()
+        ]
+
+    def finalizar_em_lote(
+        self,
+        final_de_sessao: datetime,
+        sessao_ids: Optional[List[int]] = None,
+        coworking_id: Optional[int] = None
+    ) -> List[dict]:
+        """Finaliza em um único UPDATE as sessões ainda não finalizadas"""
+        return self.alterar_em_lote(
+            {"final_de_sessao": final_de_sessao, "ativado": False},
+            [Sessao.final_de_sessao.is_(None)],
+            sessao_ids=sessao_ids,
+            coworking_id=coworking_id
+        )
+
+    def finalizar_em_lote_com_horarios(self, finais: Dict[int, datetime]) -> List[dict]:
+        """Finaliza as sessões ainda não finalizadas, cada uma com o próprio horário (sessao_id -> final)
+        
+        As linhas são bloqueadas (FOR UPDATE) e atualizadas por ID em um único executemany.
+        """
+        colunas = [
+            Sessao.sessao_id,
+            Sessao.data,
+            Sessao.inicio_de_sessao,
+            Sessao.final_de_sessao,
+            Sessao.ativado,
+            Sessao.computador_id,
+            Sessao.usuario_id,
+            Sessao.administrador_id,
+        ]
+        tabela = Sessao.__table__
+        try:
+            linhas = [
+                dict(r._mapping)
+                for r in self.db.execute(
+                    select(*colunas).where(
+                        Sessao.sessao_id.in_(list(finais)),
+                        Sessao.final_de_sessao.is_(None)
+                    ).with_for_update()
+                )
+            ]
+            if linhas:
+                for linha in linhas:
+                    linha.update(final_de_sessao=finais[linha["sessao_id"]], ativado=False)
+                self.db.execute(
+                    update(tabela).where(
+                        tabela.c.sessao_id == bindparam("id_sessao"),
+                        tabela.c.final_de_sessao.is_(None)
+                    ).values(final_de_sessao=bindparam("final"), ativado=False),
+                    [{"id_sessao": l["sessao_id"], "final": l["final_de_sessao"]} for l in linhas]
+                )
+            self.db.commit()
+            return linhas
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def desativar_em_lote(
+        self,
+        sessao_ids: Optional[List[int]] = None,
+        coworking_id: Optional[int] = None
+    ) -> List[dict]:
+        """Desativa em um único UPDATE as sessões ainda ativadas"""
+        return self.alterar_em_lote(
+            {"ativado": False},
+            [Sessao.ativado == True],
+            sessao_ids=sessao_ids,
+            coworking_id=coworking_id
+        )
+
     def delete(self, db_obj: Sessao) -> bool:
         return super().delete(db_obj)
 
@@ -1,7 +1,7 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from sqlalchemy.orm import Session, joinedload
 from src.entities.usuario_advogado import Usuario_advogado
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, ResultadoLote
 
 
 class UsuarioAdvogadoRepository(BaseRepository[Usuario_advogado]):
@@ -22,6 +22,10 @@ class UsuarioAdvogadoRepository(BaseRepository[Usuario_advogado]):
             Usuario_advogado.registro_oab == registro_oab
         ).first()
 
+    def get_many(self, ids: Sequence[int], *opcoes) -> ResultadoLote:
+        """Busca em lote com o cadastro carregado na mesma consulta (como get_by_id)"""
+        return super().get_many(ids, joinedload(Usuario_advogado.cadastro), *opcoes)
+
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Usuario_advogado]:
         return self.db.query(Usuario_advogado).offset(skip).limit(limit).all()
 
@@ -0,0 +1,75 @@
+from typing import Dict, List
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from src.entities.versao_cache import Versao_cache
+from src.repositories.base_repository import BaseRepository
+
+# Chave de Session.info com os incrementos agendados para o próximo commit
+_PENDENTES = "versoes_pendentes"
+
+
+class VersaoRepository(BaseRepository[Versao_cache]):
+    """Contadores de versão compartilhados entre workers (invalidação de caches)"""
+
+    def __init__(self, db: Session):
+        super().__init__(Versao_cache, db)
+
+    def obter(self, chave: str) -> int:
+        versao = self.db.query(Versao_cache.versao).filter(
+            Versao_cache.chave == chave
+        ).scalar()
+        return versao or 0
+
+    def obter_varias(self, chaves: List[str]) -> Dict[str, int]:
+        versoes = dict(
+            self.db.query(Versao_cache.chave, Versao_cache.versao).filter(
+                Versao_cache.chave.in_(chaves)
+            ).all()
+        )
+        return {chave: versoes.get(chave, 0) for chave in chaves}
+
+    def obter_por_prefixo(self, prefixo: str) -> Dict[str, int]:
+        """Versões de todas as chaves que começam com `prefixo` (sem curingas)"""
+        return dict(
+            self.db.query(Versao_cache.chave, Versao_cache.versao).filter(
+                Versao_cache.chave.startswith(prefixo, autoescape=True)
+            ).all()
+        )
+
+    def agendar_incremento(self, *chaves: str) -> None:
+        """
+        Incrementa as versões no commit da transação corrente, junto com a escrita
+        que as motivou (descartado em caso de rollback).
+        """
+        self.db.info.setdefault(_PENDENTES, set()).update(chaves)
+
+    def incrementar(self, chave: str) -> None:
+        """Incrementa a versão da chave (criando-a se necessário) e faz commit"""
+        self.agendar_incremento(chave)
+        self.db.commit()
+
+
+def _incrementar_na_transacao(db: Session, chave: str) -> None:
+    incremento = update(Versao_cache).where(Versao_cache.chave == chave).values(versao=Versao_cache.versao + 1)
+    if db.execute(incremento, execution_options={"synchronize_session": False}).rowcount:
+        return
+    try:
+        # Savepoint: se outro worker criar a chave ao mesmo tempo, só a inserção é desfeita
+        with db.begin_nested():
+            db.add(Versao_cache(chave=chave, versao=1))
+    except IntegrityError:
+        db.execute(incremento, execution_options={"synchronize_session": False})
+
+
+@event.listens_for(Session, "before_commit")
+def _aplicar_incrementos(db: Session) -> None:
+    pendentes = db.info.pop(_PENDENTES, None)
+    # Ordem fixa: transações concorrentes bloqueiam as linhas na mesma sequência (sem deadlock)
+    for chave in sorted(pendentes or ()):
+        _incrementar_na_transacao(db, chave)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_incrementos(db: Session) -> None:
+    db.info.pop(_PENDENTES, None)
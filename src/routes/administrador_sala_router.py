@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.administrador_sala import (
     AdministradorSalaCreate,
@@ -54,7 +54,7 @@ def listar_administradores(
     skip: int = 0,
     limit: int = 100,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos os administradores de sala com paginação.
@@ -75,7 +75,7 @@ def listar_administradores(
 def obter_administrador(
     admin_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de um administrador de sala específico.
@@ -116,7 +116,7 @@ def atualizar_administrador(
 def obter_vinculacao_completa(
     admin_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os IDs e nomes das entidades vinculadas ao administrador de sala.
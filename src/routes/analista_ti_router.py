@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.analista_de_ti import AnalistaTCreate, AnalistaTUpdate, AnalistaTResponse
 from src.schemas.comum import MensagemResponse
@@ -47,7 +47,7 @@ def listar_analistas(
     skip: int = 0,
     limit: int = 100,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos os analistas de TI com paginação.
@@ -68,7 +68,7 @@ def listar_analistas(
 def obter_analista(
     analista_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de um analista de TI específico.
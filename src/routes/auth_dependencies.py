@@ -31,7 +31,16 @@ async def get_current_user(
     
     Verifica o token JWT e retorna as informações do usuário.
     """
-    token = credentials.credentials
+    return autenticar_token(credentials.credentials, db)
+
+
+def autenticar_token(token: str, db: Session) -> AuthUser:
+    """
+    Valida um token JWT e retorna o usuário autenticado.
+    
+    Usado pelo get_current_user e por canais que não recebem o header
+    Authorization (ex.: WebSocket, onde o token vem na query string).
+    """
     payload = verify_token(token)
     
     if payload is None:
@@ -1,11 +1,12 @@
 from typing import List
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db, get_ids_lote, LOTE_MAX_IDS
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.computador import ComputadorCreate, ComputadorUpdate, ComputadorResponse
-from src.schemas.comum import MensagemResponse
+from src.schemas.comum import MensagemResponse, LoteResponse
 from src.services.computador_service import ComputadorService
+from src.utils.serializacao import resposta_negociada, DESCRICAO_MSGPACK
 
 router = APIRouter(
     prefix="/computadores",
@@ -42,13 +43,14 @@ def criar_computador(
     "",
     response_model=List[ComputadorResponse],
     summary="Listar computadores",
-    description="Retorna uma lista paginada de todos os computadores cadastrados no sistema.",
+    description="Retorna uma lista paginada de todos os computadores cadastrados no sistema." + DESCRICAO_MSGPACK,
 )
 def listar_computadores(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos os computadores com paginação.
@@ -57,7 +59,28 @@ def listar_computadores(
     - **limit**: Número máximo de registros a retornar (padrão: 100)
     """
     service = ComputadorService(db)
-    return service.listar_computadores(skip=skip, limit=limit)
+    return resposta_negociada(request, service.listar_computadores(skip=skip, limit=limit))
+
+
+@router.get(
+    "/lote",
+    response_model=LoteResponse[ComputadorResponse],
+    summary="Obter computadores por IDs (lote)",
+    description=f"Retorna os computadores dos IDs informados em uma única consulta, na ordem dos IDs. "
+                f"Os IDs sem registro são listados em `ids_nao_encontrados`. Máximo de {LOTE_MAX_IDS} IDs por requisição.",
+)
+def obter_computadores_lote(
+    ids: List[int] = Depends(get_ids_lote),
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna vários registros de uma vez (substitui chamadas repetidas a `GET /computadores/{id}`).
+
+    - **ids**: IDs separados por vírgula (ex.: `?ids=3,1,2`)
+    """
+    service = ComputadorService(db)
+    return service.obter_computadores(ids)
 
 
 @router.get(
@@ -69,7 +92,7 @@ def listar_computadores(
 def obter_computador(
     computador_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de um computador específico.
@@ -84,12 +107,13 @@ def obter_computador(
     "/coworking/{coworking_id}",
     response_model=List[ComputadorResponse],
     summary="Listar computadores por sala",
-    description="Retorna todos os computadores de uma sala de coworking específica.",
+    description="Retorna todos os computadores de uma sala de coworking específica." + DESCRICAO_MSGPACK,
 )
 def listar_computadores_por_coworking(
+    request: Request,
     coworking_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos os computadores de uma sala de coworking.
@@ -97,7 +121,7 @@ def listar_computadores_por_coworking(
     - **coworking_id**: ID da sala de coworking
     """
     service = ComputadorService(db)
-    return service.listar_computadores_por_coworking(coworking_id)
+    return resposta_negociada(request, service.listar_computadores_por_coworking(coworking_id))
 
 
 @router.put(
@@ -1,10 +1,14 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, Query
+from datetime import date
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_read_db
 from src.routes.auth_dependencies import require_any_user, AuthUser
-from src.schemas.dashboard import DashboardFiltros, DashboardResponse
+from src.schemas.dashboard import DashboardFiltros, DashboardResponse, CacheMetricasResponse, MapaCalorResponse, OcupacaoResponse
 from src.services.dashboard_service import DashboardService
+from src.services.dashboard_cache import dashboard_cache
+from src.utils.etag import resposta_condicional
+from src.utils.serializacao import resposta_negociada
 
 router = APIRouter(
     prefix="/dashboard",
@@ -43,15 +47,21 @@ router = APIRouter(
     - A unidade deve pertencer à subseccional informada
     - A sala coworking deve pertencer à unidade e subseccional informadas
     - O filtro de ano é opcional e filtra todos os dados por ano
+    - `incluir_arquivo=true` soma as sessões já arquivadas em Parquet (ver SESSAO_ARQUIVO_DIR)
+    
+    **MessagePack:** com `Accept: application/msgpack`, os mesmos dados são enviados em MessagePack
     """,
 )
 def obter_dashboard(
+    request: Request,
+    response: Response,
     subsecional_id: int = Query(..., description="ID da subseccional (obrigatório)"),
     unidade_id: int = Query(..., description="ID da unidade (obrigatório)"),
     coworking_id: int = Query(..., description="ID da sala coworking (obrigatório)"),
     ano: Optional[int] = Query(None, description="Ano para filtrar os dados (opcional). Ex: 2025. Se não informado, retorna dados de todos os anos"),
+    incluir_arquivo: bool = Query(False, description="Incluir sessões antigas já arquivadas (Parquet). Requer pyarrow no servidor"),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os dados do dashboard com base nos filtros hierárquicos.
@@ -67,9 +77,137 @@ def obter_dashboard(
         subsecional_id=subsecional_id,
         unidade_id=unidade_id,
         coworking_id=coworking_id,
-        ano=ano
+        ano=ano,
+        incluir_arquivo=incluir_arquivo
+    )
+    
+    service = DashboardService(db)
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(filtros))
+    if nao_modificado:
+        return nao_modificado
+    return resposta_negociada(request, service.obter_dados_dashboard(filtros), headers=response.headers)
+
+
+@router.get(
+    "/mapa-calor",
+    response_model=MapaCalorResponse,
+    summary="Mapa de calor de uso (dia da semana x hora)",
+    description="""
+    Retorna uma matriz 7x24 com o número de sessões iniciadas na sala coworking por dia da
+    semana (linhas, de segunda a domingo) e hora (colunas, 0 a 23), para planejar a escala
+    de atendimento. Inclui os totais por dia e por hora e a combinação de pico.
+    
+    **Filtros:** os mesmos de `GET /dashboard` (subsecional_id, unidade_id e coworking_id
+    obrigatórios e relacionados; `ano` e `incluir_arquivo` opcionais).
+    
+    O resultado fica em cache por sala e ano e é invalidado quando sessões da unidade são
+    criadas ou finalizadas. Suporta ETag (`If-None-Match`) e `Accept: application/msgpack`.
+    """,
+)
+def obter_mapa_calor(
+    request: Request,
+    response: Response,
+    subsecional_id: int = Query(..., description="ID da subseccional (obrigatório)"),
+    unidade_id: int = Query(..., description="ID da unidade (obrigatório)"),
+    coworking_id: int = Query(..., description="ID da sala coworking (obrigatório)"),
+    ano: Optional[int] = Query(None, description="Ano para filtrar os dados (opcional). Ex: 2025"),
+    incluir_arquivo: bool = Query(False, description="Incluir sessões antigas já arquivadas (Parquet). Requer pyarrow no servidor"),
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna o mapa de calor (dia da semana x hora) das sessões da sala coworking.
+    
+    - **subsecional_id**, **unidade_id**, **coworking_id**: filtros hierárquicos (obrigatórios)
+    - **ano**: Ano para filtrar os dados (opcional)
+    """
+    filtros = DashboardFiltros(
+        subsecional_id=subsecional_id,
+        unidade_id=unidade_id,
+        coworking_id=coworking_id,
+        ano=ano,
+        incluir_arquivo=incluir_arquivo
     )
     
     service = DashboardService(db)
-    return service.obter_dados_dashboard(filtros)
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(filtros, "mapa-calor"))
+    if nao_modificado:
+        return nao_modificado
+    return resposta_negociada(request, service.obter_mapa_calor(filtros), headers=response.headers)
+
 
+@router.get(
+    "/ocupacao",
+    response_model=OcupacaoResponse,
+    summary="Ocupação da sala ao longo do tempo",
+    description="""
+    Retorna a série de ocupação da sala coworking: para cada intervalo de `intervalo_minutos`,
+    a média (ponderada pelo tempo) e o máximo de sessões simultâneas e o percentual dos
+    computadores da sala em uso. Ao contrário do pico de acesso, que conta sessões
+    iniciadas, aqui cada sessão ocupa a máquina de `inicio_de_sessao` a `final_de_sessao`
+    (sessões ativas contam até o momento atual).
+    
+    **Filtros:** subsecional_id, unidade_id e coworking_id obrigatórios e relacionados, como
+    em `GET /dashboard`.
+    
+    **Período:** `data_inicio`/`data_fim` (inclusivas); sem datas, o `ano` inteiro ou, sem
+    ano, os últimos 7 dias. O período termina no máximo no minuto atual e pode ter até
+    OCUPACAO_MAX_INTERVALOS intervalos (padrão: 10000). Sessões arquivadas em Parquet não
+    entram: o arquivo guarda apenas inícios de sessão agregados por hora.
+    
+    O resultado fica em cache por sala, período e intervalo. Suporta ETag (`If-None-Match`)
+    e `Accept: application/msgpack`.
+    """,
+)
+def obter_ocupacao(
+    request: Request,
+    response: Response,
+    subsecional_id: int = Query(..., description="ID da subseccional (obrigatório)"),
+    unidade_id: int = Query(..., description="ID da unidade (obrigatório)"),
+    coworking_id: int = Query(..., description="ID da sala coworking (obrigatório)"),
+    ano: Optional[int] = Query(None, description="Ano analisado, quando as datas não são informadas. Ex: 2025"),
+    data_inicio: Optional[date] = Query(None, description="Primeiro dia do período (YYYY-MM-DD)"),
+    data_fim: Optional[date] = Query(None, description="Último dia do período, inclusivo (YYYY-MM-DD)"),
+    intervalo_minutos: int = Query(60, ge=5, le=1440, description="Duração de cada intervalo da série, em minutos"),
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna a ocupação (sessões simultâneas e % de computadores em uso) da sala coworking.
+    
+    - **subsecional_id**, **unidade_id**, **coworking_id**: filtros hierárquicos (obrigatórios)
+    - **data_inicio**, **data_fim** ou **ano**: período analisado (opcional)
+    - **intervalo_minutos**: resolução da série (padrão: 60)
+    """
+    # Com datas explícitas o ano é ignorado: não pode decidir o TTL nem a geração do cache
+    filtros = DashboardFiltros(
+        subsecional_id=subsecional_id,
+        unidade_id=unidade_id,
+        coworking_id=coworking_id,
+        ano=ano if data_inicio is None and data_fim is None else None
+    )
+    
+    service = DashboardService(db)
+    inicio, fim = service.periodo_ocupacao(ano, data_inicio, data_fim, intervalo_minutos)
+    etag = service.obter_etag(filtros, "ocupacao", inicio, fim, intervalo_minutos)
+    nao_modificado = resposta_condicional(request, response, etag)
+    if nao_modificado:
+        return nao_modificado
+    return resposta_negociada(
+        request, service.obter_ocupacao(filtros, inicio, fim, intervalo_minutos), headers=response.headers
+    )
+
+
+@router.get(
+    "/cache/metricas",
+    response_model=CacheMetricasResponse,
+    summary="Métricas do cache do dashboard",
+    description="Retorna acertos, erros e invalidações do cache de respostas do dashboard (neste worker).",
+)
+def obter_metricas_cache(
+    current_user: AuthUser = Depends(require_any_user)
+):
+    """
+    Retorna as métricas do cache do dashboard.
+    """
+    return dashboard_cache.obter_metricas()
@@ -1,5 +1,15 @@
+import os
+from typing import List, Optional
+from fastapi import HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from src.database.connection import SessionLocal
+from src.database.connection import (
+    SessionLocal, ReadSessionLocal, leitura_deve_usar_primario,
+    LEITURA_PRIMARIO_COOKIE, LEITURA_PRIMARIO_HEADER,
+)
+
+
+# Máximo de ids por requisição nas buscas em lote (GET .../lote?ids=1,2,3)
+LOTE_MAX_IDS = int(os.getenv("LOTE_MAX_IDS", "100"))
 
 
 def get_db():
@@ -15,3 +25,59 @@ def get_db():
     finally:
         db.close()
 
+
+def abrir_sessao_leitura(request: Optional[Request] = None):
+    """Abre uma sessão de leitura, já fixada no primário se o cliente escreveu há pouco"""
+    db = ReadSessionLocal()
+    ate = None
+    if request is not None:
+        ate = request.headers.get(LEITURA_PRIMARIO_HEADER) or request.cookies.get(LEITURA_PRIMARIO_COOKIE)
+    if leitura_deve_usar_primario(ate):
+        db.usar_primario()
+    return db
+
+
+def get_read_db(request: Request):
+    """
+    Dependência para obter uma sessão de leitura do banco de dados.
+    
+    Usada por endpoints GET e consultas agregadas (dashboard, relatórios).
+    As consultas vão para a réplica de leitura (DATABASE_REPLICA_URL) quando
+    configurada. Logo após uma escrita de sessão (criar/finalizar), as leituras
+    do mesmo cliente (cookie ou header devolvido na resposta da escrita) voltam
+    ao primário durante REPLICA_JANELA_LEITURA_PRIMARIO segundos.
+    """
+    db = abrir_sessao_leitura(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_ids_lote(
+    ids: str = Query(..., description=f"IDs separados por vírgula (ex.: 1,2,3; máx: {LOTE_MAX_IDS})")
+) -> List[int]:
+    """
+    Dependência que converte o parâmetro `ids` das buscas em lote em uma lista de inteiros.
+    
+    Mantém a ordem informada e descarta repetições; levanta 400 se algum valor não
+    for inteiro ou se a quantidade exceder LOTE_MAX_IDS.
+    """
+    try:
+        lista = list(dict.fromkeys(int(valor) for valor in ids.split(",") if valor.strip()))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O parâmetro ids deve conter apenas números inteiros separados por vírgula"
+        )
+    if not lista:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe ao menos um id"
+        )
+    if len(lista) > LOTE_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {LOTE_MAX_IDS} ids por requisição"
+        )
+    return lista
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from src.database.connection import SessionLocal
+from src.routes.auth_dependencies import require_any_user, autenticar_token, AuthUser
+from src.services.ocupacao_service import ocupacao_hub
+
+router = APIRouter(
+    prefix="/ocupacao",
+    tags=["Ocupação em tempo real"],
+    responses={404: {"description": "Não encontrado"}},
+)
+
+# Intervalo (segundos) entre mensagens de keep-alive (SSE) / ping (WebSocket)
+INTERVALO_KEEPALIVE = 15
+
+MENSAGEM_FEED_INDISPONIVEL = (
+    "O feed de ocupação em tempo real requer PostgreSQL quando a API roda com mais de um "
+    "worker (os eventos de outros workers não chegariam). Use GET /sessoes/ativas."
+)
+
+
+def _carregar_snapshot(coworking_id: int) -> list:
+    # Primário: o snapshot não pode estar atrás dos deltas já aplicados ao mapa
+    db = SessionLocal()
+    try:
+        return ocupacao_hub.carregar_snapshot(db, coworking_id)
+    finally:
+        db.close()
+
+
+def _autenticar(token: str) -> AuthUser:
+    db = SessionLocal()
+    try:
+        return autenticar_token(token, db)
+    finally:
+        db.close()
+
+
+async def _evento_snapshot(coworking_id: int) -> str:
+    # Mapa em memória do worker; o banco só é consultado se a sala ainda não foi carregada
+    sessoes = ocupacao_hub.snapshot(coworking_id)
+    if sessoes is None:
+        sessoes = await run_in_threadpool(_carregar_snapshot, coworking_id)
+    return json.dumps({"tipo": "snapshot", "coworking_id": coworking_id, "sessoes": sessoes}, ensure_ascii=False)
+
+
+@router.websocket("/{coworking_id}/ws")
+async def ocupacao_websocket(
+    websocket: WebSocket,
+    coworking_id: int,
+    token: str = Query(..., description="Token JWT (o header Authorization não está disponível em WebSockets)"),
+):
+    """
+    Canal WebSocket com a ocupação dos computadores de uma sala coworking.
+
+    Ao conectar, o cliente recebe um evento `snapshot` com todas as sessões ativas
+    da sala. Em seguida recebe eventos delta:
+    - `inicio`: uma sessão foi iniciada em um computador
+    - `fim`: uma sessão foi finalizada/desativada
+    - `snapshot`: reenviado quando o cliente fica para trás e precisa ressincronizar
+    - `ping`: enviado após INTERVALO_KEEPALIVE segundos sem eventos (pode ser ignorado)
+
+    Mensagens enviadas pelo cliente são ignoradas.
+    """
+    try:
+        await run_in_threadpool(_autenticar, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not ocupacao_hub.feed_disponivel():
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Feed indisponível com vários workers")
+        return
+
+    await websocket.accept()
+    assinante = await ocupacao_hub.inscrever_async(coworking_id)
+    ping = json.dumps({"tipo": "ping", "coworking_id": coworking_id})
+    # A leitura do socket corre junto com a fila: a desconexão é percebida mesmo
+    # em uma sala sem eventos, e o ping detecta conexões que caíram sem aviso
+    recebimento = asyncio.ensure_future(websocket.receive())
+    proximo = asyncio.ensure_future(assinante.fila.get())
+    try:
+        await websocket.send_text(await _evento_snapshot(coworking_id))
+        while True:
+            prontos, _ = await asyncio.wait(
+                {recebimento, proximo}, timeout=INTERVALO_KEEPALIVE, return_when=asyncio.FIRST_COMPLETED
+            )
+            if recebimento in prontos:
+                if recebimento.result()["type"] == "websocket.disconnect":
+                    break
+                recebimento = asyncio.ensure_future(websocket.receive())
+            if proximo in prontos:
+                mensagem = proximo.result()
+                proximo = asyncio.ensure_future(assinante.fila.get())
+                if assinante.atrasado:
+                    assinante.atrasado = False
+                    mensagem = await _evento_snapshot(coworking_id)
+                await websocket.send_text(mensagem)
+            elif not prontos:
+                await websocket.send_text(ping)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        recebimento.cancel()
+        proximo.cancel()
+        ocupacao_hub.cancelar(assinante)
+
+
+@router.get(
+    "/{coworking_id}/eventos",
+    summary="Feed de ocupação (Server-Sent Events)",
+    description="""
+    Stream SSE (text/event-stream) com a ocupação dos computadores de uma sala coworking.
+
+    Substitui o polling de GET /sessoes/ativas. O primeiro evento é um `snapshot`
+    com as sessões ativas; os seguintes são deltas `inicio`/`fim`.
+    """,
+)
+async def ocupacao_sse(
+    coworking_id: int,
+    request: Request,
+    current_user: AuthUser = Depends(require_any_user),
+):
+    """
+    Feed SSE de ocupação da sala.
+
+    - **coworking_id**: ID da sala coworking
+    """
+    if not ocupacao_hub.feed_disponivel():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=MENSAGEM_FEED_INDISPONIVEL)
+    assinante = await ocupacao_hub.inscrever_async(coworking_id)
+
+    async def gerar_eventos():
+        try:
+            yield f"data: {await _evento_snapshot(coworking_id)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    mensagem = await asyncio.wait_for(assinante.fila.get(), timeout=INTERVALO_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if assinante.atrasado:
+                    assinante.atrasado = False
+                    mensagem = await _evento_snapshot(coworking_id)
+                yield f"data: {mensagem}\n\n"
+        finally:
+            ocupacao_hub.cancelar(assinante)
+
+    return StreamingResponse(
+        gerar_eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
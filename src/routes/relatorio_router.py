@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_read_db
 from src.routes.auth_dependencies import require_analista, AuthUser
 from src.schemas.relatorio import RelatorioRequest, RelatorioResponse
 from src.services.relatorio_service import RelatorioService
@@ -40,7 +40,7 @@ router = APIRouter(
 def gerar_relatorio(
     request: RelatorioRequest,
     current_user: AuthUser = Depends(require_analista),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Gera um relatório completo em Markdown sobre o uso de uma sala de coworking.
@@ -1,10 +1,10 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db, get_ids_lote, LOTE_MAX_IDS
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.sala_coworking import SalaCoworkingCreate, SalaCoworkingUpdate, SalaCoworkingResponse
-from src.schemas.comum import MensagemResponse
+from src.schemas.comum import MensagemResponse, LoteResponse
 from src.services.sala_coworking_service import SalaCoworkingService
 
 router = APIRouter(
@@ -51,7 +51,7 @@ def listar_salas(
     subsecional_id: Optional[int] = Query(None, description="Filtrar por subseccional (opcional)"),
     unidade_id: Optional[int] = Query(None, description="Filtrar por unidade (opcional)"),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as salas de coworking com paginação e filtros opcionais.
@@ -80,6 +80,27 @@ def listar_salas(
     return service.listar_salas(skip=skip, limit=limit)
 
 
+@router.get(
+    "/lote",
+    response_model=LoteResponse[SalaCoworkingResponse],
+    summary="Obter salas de coworking por IDs (lote)",
+    description=f"Retorna as salas de coworking dos IDs informados em uma única consulta, na ordem dos IDs. "
+                f"Os IDs sem registro são listados em `ids_nao_encontrados`. Máximo de {LOTE_MAX_IDS} IDs por requisição.",
+)
+def obter_salas_lote(
+    ids: List[int] = Depends(get_ids_lote),
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna vários registros de uma vez (substitui chamadas repetidas a `GET /salas-coworking/{id}`).
+
+    - **ids**: IDs separados por vírgula (ex.: `?ids=3,1,2`)
+    """
+    service = SalaCoworkingService(db)
+    return service.obter_salas(ids)
+
+
 @router.get(
     "/{coworking_id}",
     response_model=SalaCoworkingResponse,
@@ -89,7 +110,7 @@ def listar_salas(
 def obter_sala(
     coworking_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de uma sala de coworking específica.
@@ -109,7 +130,7 @@ def obter_sala(
 def listar_salas_por_subsecional(
     subsecional_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as salas de coworking de uma subsecional.
@@ -129,7 +150,7 @@ def listar_salas_por_subsecional(
 def listar_salas_por_unidade(
     unidade_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as salas de coworking de uma unidade.
@@ -1,13 +1,17 @@
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db, abrir_sessao_leitura
 from src.routes.auth_dependencies import require_any_user, AuthUser
-from src.schemas.sessao import SessaoCreate, SessaoUpdate, SessaoResponse
+from src.schemas.sessao import SessaoCreate, SessaoUpdate, SessaoResponse, SessaoLoteRequest, SessaoLoteResponse, ExpiracaoMetricasResponse
 from src.schemas.comum import MensagemResponse
-from src.schemas.filtro_sessao import FiltroSessao, OrdenacaoData
-from src.services.sessao_service import SessaoService
+from src.schemas.filtro_sessao import FiltroSessao, OrdenacaoData, FormatoExportacao, ModoBuscaIp, ModoContagem
+from src.services.sessao_service import SessaoService, PaginaSessoes, SESSOES_PAGINA_PADRAO, SESSOES_PAGINA_MAXIMA, COLUNAS_EXPORTACAO
+from src.services.expiracao_service import agendador_expiracao
+from src.utils.etag import resposta_condicional
+from src.utils.serializacao import resposta_negociada, DESCRICAO_MSGPACK, gerar_ndjson, gerar_csv
 
 router = APIRouter(
     prefix="/sessoes",
@@ -15,13 +19,55 @@ router = APIRouter(
     responses={404: {"description": "Não encontrado"}},
 )
 
+DESCRICAO_PAGINACAO = f"""
+
+    **Paginação por cursor:** no máximo `limit` sessões por página (máx: {SESSOES_PAGINA_MAXIMA}),
+    ordenadas por `sessao_id`. Se houver mais resultados, o header `X-Proximo-Cursor` traz o
+    valor a ser enviado em `cursor` para obter a próxima página.
+
+    **Streaming:** com `stream=true`, todas as sessões (a partir de `cursor`) são enviadas
+    como NDJSON (`application/x-ndjson`, uma sessão por linha), sem carregar tudo em memória.
+    """ + DESCRICAO_MSGPACK
+
+
+def _cursor_query():
+    return Query(None, ge=0, description="Cursor retornado no header X-Proximo-Cursor da página anterior")
+
+
+def _limit_query():
+    return Query(SESSOES_PAGINA_PADRAO, ge=1, le=SESSOES_PAGINA_MAXIMA, description=f"Tamanho da página (máx: {SESSOES_PAGINA_MAXIMA})")
+
+
+def _stream_query():
+    return Query(False, description="Enviar todas as sessões como NDJSON em streaming")
+
+
+def _resposta_pagina(request: Request, pagina: PaginaSessoes, response: Response) -> Response:
+    if pagina.proximo_cursor is not None:
+        response.headers["X-Proximo-Cursor"] = str(pagina.proximo_cursor)
+    return resposta_negociada(request, pagina.sessoes, headers=response.headers)
+
+
+def _resposta_streaming(
+    request: Request, iterar: Callable[[SessaoService], Iterator[dict]], response: Response
+) -> StreamingResponse:
+    """Streaming NDJSON com uma sessão de banco própria (a da requisição fecha antes do fim do envio)"""
+    def gerar():
+        db = abrir_sessao_leitura(request)
+        try:
+            yield from gerar_ndjson(iterar(SessaoService(db)))
+        finally:
+            db.close()
+
+    return StreamingResponse(gerar(), media_type="application/x-ndjson", headers=response.headers)
+
 
 @router.post(
     "",
     response_model=SessaoResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Criar nova sessão",
-    description="Cria uma nova sessão de uso de computador. O computador deve estar disponível.",
+    description="Cria uma nova sessão de uso de computador. O computador deve estar disponível (409 se já houver sessão ativa nele).",
     response_description="Sessão criada com sucesso",
 )
 def criar_sessao(
@@ -59,21 +105,30 @@ def criar_sessao(
     - Por IP do computador (busca parcial - não precisa do IP completo)
     - Status (ativas/inativas)
     - Ordenação por data (mais recente ou mais antiga primeiro)
-    """,
+    
+    **Total de registros (parâmetro `contagem`, informado em headers):**
+    - `nenhum` (padrão): sem contagem; `X-Tem-Mais` indica se há próxima página
+    - `exato`: `X-Total-Count` calculado na mesma consulta da página
+    - `estimado`: `X-Total-Estimado` com a estimativa do banco (PostgreSQL), sem percorrer as linhas
+    """ + DESCRICAO_MSGPACK,
 )
 def listar_sessoes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros a pular (paginação)"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros (padrão: 100, máx: 1000)"),
     administrador_id: Optional[int] = Query(None, description="Filtrar por ID do administrador"),
     datetime_inicio: Optional[datetime] = Query(None, description="DateTime mínimo para filtrar sessões por início. Retorna sessões com inicio_de_sessao >= datetime_inicio. Ex: 2025-11-22T08:00:00"),
     ip_computador: Optional[str] = Query(None, description="Buscar por IP do computador - busca parcial (não precisa preencher o IP completo). Ex: '192.168' encontra '192.168.1.100', '192.168.0.50', etc."),
+    busca_ip: ModoBuscaIp = Query(ModoBuscaIp.CONTEM, description="'contem': IP contém o texto | 'prefixo': IP começa com o texto (mais rápido)"),
     apenas_ativas: Optional[bool] = Query(None, description="True: apenas sessões ativas | False: apenas sessões inativas | None: todas"),
     ordenar_por_data: OrdenacaoData = Query(
         OrdenacaoData.MAIS_RECENTE_PRIMEIRO,
         description="Ordenação por data: 'mais_recente' (DESC) ou 'mais_antiga' (ASC)"
     ),
+    contagem: ModoContagem = Query(ModoContagem.NENHUM, description="Total de registros: 'nenhum', 'exato' ou 'estimado'"),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista sessões com sistema robusto de filtros e ordenação.
@@ -108,6 +163,9 @@ def listar_sessoes(
        
        GET /sessoes?ip_computador=100
        # Encontra qualquer IP que contenha "100": 192.168.1.100, 10.0.0.100, etc.
+       
+       GET /sessoes?ip_computador=192.168.1&busca_ip=prefixo
+       # Apenas IPs que começam com "192.168.1" (usa índice; recomendado para tabelas grandes)
     
     3. Filtrar apenas sessões inativas:
        GET /sessoes?apenas_ativas=false
@@ -121,29 +179,138 @@ def listar_sessoes(
         administrador_id=administrador_id,
         datetime_inicio=datetime_inicio,
         ip_computador=ip_computador,
+        busca_ip=busca_ip,
         apenas_ativas=apenas_ativas,
         ordenar_por_data=ordenar_por_data
     )
     
     service = SessaoService(db)
-    return service.listar_sessoes(filtros)
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(str(request.url.path) + "?" + request.url.query))
+    if nao_modificado:
+        return nao_modificado
+    listagem = service.listar_sessoes(filtros, contagem)
+    response.headers["X-Tem-Mais"] = "true" if listagem.tem_mais else "false"
+    if listagem.total is not None:
+        response.headers["X-Total-Count"] = str(listagem.total)
+    if listagem.total_estimado is not None:
+        response.headers["X-Total-Estimado"] = str(listagem.total_estimado)
+    return resposta_negociada(request, listagem.sessoes, headers=response.headers)
+
+
+@router.get(
+    "/exportar",
+    summary="Exportar sessões filtradas (CSV/NDJSON)",
+    description="""
+    Exporta todas as sessões que correspondem aos filtros (os mesmos de GET /sessoes, sem paginação).
+    
+    As linhas são lidas do banco com cursor no servidor e enviadas em streaming:
+    o primeiro byte chega imediatamente e a memória não cresce com o volume exportado.
+    
+    **Formatos:**
+    - `csv`: colunas planas (sessão, sala, unidade e subseccional)
+    - `ndjson`: uma sessão por linha, no mesmo formato de GET /sessoes
+    """,
+    response_class=StreamingResponse,
+)
+def exportar_sessoes(
+    request: Request,
+    formato: FormatoExportacao = Query(FormatoExportacao.CSV, description="Formato: 'csv' ou 'ndjson'"),
+    administrador_id: Optional[int] = Query(None, description="Filtrar por ID do administrador"),
+    datetime_inicio: Optional[datetime] = Query(None, description="DateTime mínimo de início (>= datetime_inicio). Ex: 2025-11-22T08:00:00"),
+    ip_computador: Optional[str] = Query(None, description="Buscar por IP do computador - busca parcial"),
+    busca_ip: ModoBuscaIp = Query(ModoBuscaIp.CONTEM, description="'contem': IP contém o texto | 'prefixo': IP começa com o texto (mais rápido)"),
+    apenas_ativas: Optional[bool] = Query(None, description="True: apenas sessões ativas | False: apenas sessões inativas | None: todas"),
+    ordenar_por_data: OrdenacaoData = Query(
+        OrdenacaoData.MAIS_RECENTE_PRIMEIRO,
+        description="Ordenação por data: 'mais_recente' (DESC) ou 'mais_antiga' (ASC)"
+    ),
+    current_user: AuthUser = Depends(require_any_user)
+):
+    """
+    Exporta as sessões filtradas em CSV ou NDJSON (streaming).
+
+    - **formato**: `csv` (padrão) ou `ndjson`
+    - Demais parâmetros: mesmos filtros de GET /sessoes
+    """
+    filtros = FiltroSessao(
+        administrador_id=administrador_id,
+        datetime_inicio=datetime_inicio,
+        ip_computador=ip_computador,
+        busca_ip=busca_ip,
+        apenas_ativas=apenas_ativas,
+        ordenar_por_data=ordenar_por_data
+    )
+
+    def gerar():
+        # Sessão própria: precisa continuar aberta até o fim do streaming
+        db = abrir_sessao_leitura(request)
+        try:
+            linhas = SessaoService(db).exportar_sessoes(filtros)
+            if formato == FormatoExportacao.CSV:
+                yield from gerar_csv(linhas, COLUNAS_EXPORTACAO)
+            else:
+                yield from gerar_ndjson(SessaoService._linha_to_dict(linha) for linha in linhas)
+        finally:
+            db.close()
+
+    if formato == FormatoExportacao.CSV:
+        media_type = "text/csv; charset=utf-8"
+    else:
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        gerar(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sessoes.{formato.value}"'},
+    )
 
 
 @router.get(
     "/ativas",
     response_model=List[SessaoResponse],
     summary="Listar sessões ativas",
-    description="Retorna todas as sessões que estão atualmente ativas (não finalizadas).",
+    description="Retorna as sessões que estão atualmente ativas (não finalizadas)." + DESCRICAO_PAGINACAO,
 )
 def listar_sessoes_ativas(
+    request: Request,
+    response: Response,
+    cursor: Optional[int] = _cursor_query(),
+    limit: int = _limit_query(),
+    stream: bool = _stream_query(),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as sessões que estão atualmente ativas.
+
+    - **cursor**: cursor da página anterior (header X-Proximo-Cursor)
+    - **limit**: tamanho da página
+    - **stream**: enviar todas as sessões como NDJSON
     """
     service = SessaoService(db)
-    return service.listar_sessoes_ativas()
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(str(request.url.path) + "?" + request.url.query))
+    if nao_modificado:
+        return nao_modificado
+    if stream:
+        return _resposta_streaming(request, lambda servico: servico.iterar_sessoes_ativas(cursor), response)
+    return _resposta_pagina(request, service.listar_sessoes_ativas(cursor, limit), response)
+
+
+@router.get(
+    "/expiracao/metricas",
+    response_model=ExpiracaoMetricasResponse,
+    summary="Métricas da expiração automática de sessões",
+    description="Retorna as métricas do agendador que finaliza sessões esquecidas como ativas (neste worker).",
+)
+def obter_metricas_expiracao(
+    current_user: AuthUser = Depends(require_any_user)
+):
+    """
+    Retorna as métricas da expiração automática de sessões.
+    
+    - **lider**: indica se este worker detém o lock de execução
+    - **sessoes_expiradas_total**: total de sessões expiradas por este worker
+    """
+    return agendador_expiracao.obter_metricas()
 
 
 @router.get(
@@ -155,7 +322,7 @@ def listar_sessoes_ativas(
 def obter_sessao(
     sessao_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de uma sessão específica.
@@ -170,47 +337,73 @@ def obter_sessao(
     "/usuario/{usuario_id}",
     response_model=List[SessaoResponse],
     summary="Listar sessões por usuário",
-    description="Retorna todas as sessões de um usuário advogado específico.",
+    description="Retorna as sessões de um usuário advogado específico." + DESCRICAO_PAGINACAO,
 )
 def listar_sessoes_por_usuario(
+    request: Request,
+    response: Response,
     usuario_id: int,
+    cursor: Optional[int] = _cursor_query(),
+    limit: int = _limit_query(),
+    stream: bool = _stream_query(),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as sessões de um usuário advogado.
 
     - **usuario_id**: ID do usuário advogado
+    - **cursor**: cursor da página anterior (header X-Proximo-Cursor)
+    - **limit**: tamanho da página
+    - **stream**: enviar todas as sessões como NDJSON
     """
     service = SessaoService(db)
-    return service.listar_sessoes_por_usuario(usuario_id)
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(str(request.url.path) + "?" + request.url.query))
+    if nao_modificado:
+        return nao_modificado
+    if stream:
+        return _resposta_streaming(request, lambda servico: servico.iterar_sessoes_por_usuario(usuario_id, cursor), response)
+    return _resposta_pagina(request, service.listar_sessoes_por_usuario(usuario_id, cursor, limit), response)
 
 
 @router.get(
     "/data/{data}",
     response_model=List[SessaoResponse],
     summary="Listar sessões por data",
-    description="Retorna todas as sessões de uma data específica (formato: YYYY-MM-DD).",
+    description="Retorna as sessões de uma data específica (formato: YYYY-MM-DD)." + DESCRICAO_PAGINACAO,
 )
 def listar_sessoes_por_data(
+    request: Request,
+    response: Response,
     data: date,
+    cursor: Optional[int] = _cursor_query(),
+    limit: int = _limit_query(),
+    stream: bool = _stream_query(),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as sessões de uma data específica.
 
     - **data**: Data no formato YYYY-MM-DD
+    - **cursor**: cursor da página anterior (header X-Proximo-Cursor)
+    - **limit**: tamanho da página
+    - **stream**: enviar todas as sessões como NDJSON
     """
     service = SessaoService(db)
-    return service.listar_sessoes_por_data(data)
+    nao_modificado = resposta_condicional(request, response, service.obter_etag(str(request.url.path) + "?" + request.url.query))
+    if nao_modificado:
+        return nao_modificado
+    if stream:
+        return _resposta_streaming(request, lambda servico: servico.iterar_sessoes_por_data(data, cursor), response)
+    return _resposta_pagina(request, service.listar_sessoes_por_data(data, cursor, limit), response)
 
 
 @router.put(
     "/{sessao_id}",
     response_model=SessaoResponse,
     summary="Atualizar sessão",
-    description="Atualiza os dados de uma sessão existente.",
+    description="Atualiza os dados de uma sessão existente. Retorna 409 se a sessão ficar ativa em um computador que já tem outra sessão ativa.",
 )
 def atualizar_sessao(
     sessao_id: int,
@@ -228,6 +421,57 @@ def atualizar_sessao(
     return service.atualizar_sessao(sessao_id, sessao)
 
 
+@router.post(
+    "/finalizar-lote",
+    response_model=SessaoLoteResponse,
+    summary="Finalizar sessões em lote",
+    description="""
+    Finaliza, em uma única operação, todas as sessões ainda não finalizadas de uma sala
+    coworking (`coworking_id`) ou de uma lista de IDs (`sessao_ids`).
+    
+    Útil para fechar a sala ao fim do expediente sem chamar /finalizar sessão por sessão.
+    """,
+)
+def finalizar_sessoes_em_lote(
+    lote: SessaoLoteRequest,
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Finaliza sessões em lote.
+
+    - **coworking_id**: finaliza todas as sessões abertas da sala
+    - **sessao_ids**: finaliza apenas as sessões informadas
+    
+    Informe apenas um dos dois campos. Retorna as sessões afetadas.
+    """
+    service = SessaoService(db)
+    return service.finalizar_sessoes_em_lote(lote)
+
+
+@router.post(
+    "/desativar-lote",
+    response_model=SessaoLoteResponse,
+    summary="Desativar sessões em lote",
+    description="Desativa, em uma única operação, todas as sessões ativadas de uma sala coworking ou de uma lista de IDs.",
+)
+def desativar_sessoes_em_lote(
+    lote: SessaoLoteRequest,
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Desativa sessões em lote.
+
+    - **coworking_id**: desativa todas as sessões ativadas da sala
+    - **sessao_ids**: desativa apenas as sessões informadas
+    
+    Informe apenas um dos dois campos. Retorna as sessões afetadas.
+    """
+    service = SessaoService(db)
+    return service.desativar_sessoes_em_lote(lote)
+
+
 @router.post(
     "/{sessao_id}/finalizar",
     response_model=SessaoResponse,
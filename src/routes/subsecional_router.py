@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.subsecional import SubsecionalCreate, SubsecionalUpdate, SubsecionalResponse
 from src.schemas.comum import MensagemResponse
@@ -46,7 +46,7 @@ def listar_subsecionais(
     skip: int = 0,
     limit: int = 100,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as subsecionais com paginação.
@@ -67,7 +67,7 @@ def listar_subsecionais(
 def obter_subsecional(
     subsecional_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de uma subsecional específica.
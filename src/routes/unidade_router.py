@@ -1,7 +1,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.unidade import UnidadeCreate, UnidadeUpdate, UnidadeResponse
 from src.schemas.comum import MensagemResponse
@@ -52,7 +52,7 @@ def listar_unidades(
     limit: int = 100,
     subsecional_id: Optional[int] = Query(None, description="Filtrar por subseccional (opcional)"),
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as unidades com paginação e filtro opcional.
@@ -79,7 +79,7 @@ def listar_unidades(
 def obter_unidade(
     unidade_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de uma unidade específica.
@@ -99,7 +99,7 @@ def obter_unidade(
 def listar_unidades_por_subsecional(
     subsecional_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as unidades de uma subsecional.
@@ -1,10 +1,10 @@
 from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from src.routes.dependencies import get_db
+from src.routes.dependencies import get_db, get_read_db, get_ids_lote, LOTE_MAX_IDS
 from src.routes.auth_dependencies import require_any_user, AuthUser
 from src.schemas.usuario_advogado import UsuarioAdvogadoCreate, UsuarioAdvogadoUpdate, UsuarioAdvogadoResponse
-from src.schemas.comum import MensagemResponse
+from src.schemas.comum import MensagemResponse, LoteResponse
 from src.services.usuario_advogado_service import UsuarioAdvogadoService
 
 router = APIRouter(
@@ -48,7 +48,7 @@ def listar_usuarios(
     skip: int = 0,
     limit: int = 100,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos os usuários advogados com paginação.
@@ -60,6 +60,27 @@ def listar_usuarios(
     return service.listar_usuarios(skip=skip, limit=limit)
 
 
+@router.get(
+    "/lote",
+    response_model=LoteResponse[UsuarioAdvogadoResponse],
+    summary="Obter usuários advogados por IDs (lote)",
+    description=f"Retorna os usuários advogados dos IDs informados em uma única consulta, na ordem dos IDs. "
+                f"Os IDs sem registro são listados em `ids_nao_encontrados`. Máximo de {LOTE_MAX_IDS} IDs por requisição.",
+)
+def obter_usuarios_lote(
+    ids: List[int] = Depends(get_ids_lote),
+    current_user: AuthUser = Depends(require_any_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Retorna vários registros de uma vez (substitui chamadas repetidas a `GET /usuarios-advogados/{id}`).
+
+    - **ids**: IDs separados por vírgula (ex.: `?ids=3,1,2`)
+    """
+    service = UsuarioAdvogadoService(db)
+    return service.obter_usuarios(ids)
+
+
 @router.get(
     "/{usuario_id}",
     response_model=UsuarioAdvogadoResponse,
@@ -69,7 +90,7 @@ def listar_usuarios(
 def obter_usuario(
     usuario_id: int,
     current_user: AuthUser = Depends(require_any_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna os detalhes de um usuário advogado específico.
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Generic, List, Optional, TypeVar
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+ItemType = TypeVar("ItemType")
 
 
 class MensagemResponse(BaseModel):
@@ -13,3 +15,8 @@ class ErroResponse(BaseModel):
     detalhes: Optional[str] = None
     sucesso: bool = False
 
+
+
+class LoteResponse(BaseModel, Generic[ItemType]):
+    itens: List[ItemType] = Field(..., description="Registros encontrados, na ordem dos ids informados")
+    ids_nao_encontrados: List[int] = Field(default_factory=list, description="Ids informados sem registro correspondente")
@@ -8,6 +8,7 @@ class DashboardFiltros(BaseModel):
     unidade_id: int = Field(..., description="ID da unidade (obrigatório)")
     coworking_id: int = Field(..., description="ID da sala coworking (obrigatório)")
     ano: Optional[int] = Field(None, description="Ano para filtrar os dados (opcional). Se não informado, retorna dados de todos os anos")
+    incluir_arquivo: bool = Field(False, description="Incluir as sessões arquivadas em Parquet (ver arquivamento_service)")
 
 
 class PicoAcesso(BaseModel):
@@ -35,3 +36,57 @@ class DashboardResponse(BaseModel):
     coworking_mais_utilizado: Optional[CoworkingMaisUtilizado] = Field(None, description="Sala coworking mais utilizada")
     frequencia_mensal: List[FrequenciaMensal] = Field(default_factory=list, description="Frequência de uso por mês")
 
+
+DIAS_SEMANA = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
+
+
+class PicoMapaCalor(BaseModel):
+    dia_semana: str = Field(..., description="Dia da semana com mais sessões iniciadas")
+    hora: int = Field(..., description="Hora (0-23)")
+    quantidade: int = Field(..., description="Sessões iniciadas nesse dia da semana/hora")
+
+
+class MapaCalorResponse(BaseModel):
+    coworking_id: int
+    ano: Optional[int] = Field(None, description="Ano filtrado (None = todos os anos)")
+    dias_semana: List[str] = Field(default_factory=lambda: list(DIAS_SEMANA), description="Rótulos das linhas da matriz")
+    horas: List[int] = Field(default_factory=lambda: list(range(24)), description="Rótulos das colunas da matriz")
+    matriz: List[List[int]] = Field(..., description="Sessões iniciadas por dia da semana (7 linhas, segunda a domingo) e hora (24 colunas)")
+    total_por_dia: List[int] = Field(..., description="Soma de cada linha (dia da semana)")
+    total_por_hora: List[int] = Field(..., description="Soma de cada coluna (hora)")
+    total_sessoes: int
+    pico: Optional[PicoMapaCalor] = None
+
+
+class OcupacaoIntervalo(BaseModel):
+    inicio: datetime = Field(..., description="Início do intervalo")
+    media_sessoes: float = Field(..., description="Média de sessões simultâneas no intervalo (ponderada pelo tempo)")
+    max_sessoes: int = Field(..., description="Maior número de sessões simultâneas no intervalo")
+    taxa_ocupacao: float = Field(..., description="Percentual médio dos computadores da sala em uso (0-100)")
+
+
+class PicoOcupacao(BaseModel):
+    inicio: datetime = Field(..., description="Início do intervalo em que ocorreu o pico")
+    sessoes: int = Field(..., description="Maior número de sessões simultâneas no período")
+    taxa_ocupacao: float = Field(..., description="Percentual dos computadores da sala em uso no pico")
+
+
+class OcupacaoResponse(BaseModel):
+    coworking_id: int
+    inicio: datetime = Field(..., description="Início do período analisado")
+    fim: datetime = Field(..., description="Fim do período analisado (exclusivo; no máximo o momento atual)")
+    intervalo_minutos: int = Field(..., description="Duração de cada intervalo da série")
+    total_computadores: int = Field(..., description="Computadores da sala (base da taxa de ocupação)")
+    total_sessoes: int = Field(..., description="Sessões com alguma parte dentro do período")
+    taxa_ocupacao_media: float = Field(..., description="Percentual médio dos computadores em uso no período")
+    pico: Optional[PicoOcupacao] = None
+    intervalos: List[OcupacaoIntervalo] = Field(default_factory=list)
+
+
+class CacheMetricasResponse(BaseModel):
+    habilitado: bool
+    hits: int
+    misses: int
+    invalidacoes: int
+    taxa_acerto: float = Field(..., description="hits / (hits + misses)")
+    entradas: Optional[int] = Field(None, description="Entradas armazenadas (se o backend informar)")
@@ -10,6 +10,25 @@ class OrdenacaoData(str, Enum):
     MAIS_ANTIGA_PRIMEIRO = "mais_antiga"    # Mais antiga primeiro (ASC)
 
 
+class ModoBuscaIp(str, Enum):
+    """Modos de busca por IP do computador"""
+    CONTEM = "contem"    # Qualquer parte do IP (índice trigram no PostgreSQL)
+    PREFIXO = "prefixo"  # Início do IP (índice B-tree no PostgreSQL e MySQL; no SQLite percorre a tabela)
+
+
+class ModoContagem(str, Enum):
+    """Como o total de sessões da listagem é informado"""
+    NENHUM = "nenhum"      # Sem total: apenas indica se há próxima página (X-Tem-Mais)
+    EXATO = "exato"        # Total exato, na mesma consulta (COUNT(*) OVER())
+    ESTIMADO = "estimado"  # Estimativa do planejador (PostgreSQL); exato nos demais bancos
+
+
+class FormatoExportacao(str, Enum):
+    """Formatos de exportação de sessões"""
+    CSV = "csv"
+    NDJSON = "ndjson"  # Um objeto JSON por linha
+
+
 class FiltroSessao(BaseModel):
     """Filtros para listagem de sessões"""
     skip: int = 0
@@ -17,6 +36,7 @@ class FiltroSessao(BaseModel):
     administrador_id: Optional[int] = None
     datetime_inicio: Optional[datetime] = Field(None, description="DateTime mínimo para filtrar sessões. Retorna sessões com inicio_de_sessao >= datetime_inicio")
     ip_computador: Optional[str] = None  # Busca parcial no IP do computador (string)
+    busca_ip: ModoBuscaIp = ModoBuscaIp.CONTEM  # Como ip_computador é comparado
     apenas_ativas: Optional[bool] = None  # Apenas sessões ativas (True) ou todas (False/None)
     ordenar_por_data: Optional[OrdenacaoData] = OrdenacaoData.MAIS_RECENTE_PRIMEIRO
 
@@ -1,6 +1,6 @@
 from typing import Optional, List
 from datetime import date, datetime
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, Field, computed_field
 
 
 class SessaoBase(BaseModel):
@@ -61,3 +61,39 @@ class SessaoResponse(SessaoBase):
     class Config:
         from_attributes = True
 
+
+
+class SessaoLoteRequest(BaseModel):
+    coworking_id: Optional[int] = Field(None, description="Aplicar a todas as sessões da sala coworking")
+    sessao_ids: Optional[List[int]] = Field(None, max_length=1000, description="Aplicar apenas às sessões informadas (máx: 1000)")
+
+
+class SessaoLoteItem(BaseModel):
+    sessao_id: int
+    data: date
+    inicio_de_sessao: datetime
+    final_de_sessao: Optional[datetime] = None
+    ativado: bool
+    computador_id: Optional[int] = None
+    usuario_id: Optional[int] = None
+    administrador_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SessaoLoteResponse(BaseModel):
+    total: int
+    sessoes: List[SessaoLoteItem]
+
+
+class ExpiracaoMetricasResponse(BaseModel):
+    habilitado: bool
+    lider: bool
+    duracao_maxima_horas: float
+    intervalo_segundos: float
+    execucoes: int
+    sessoes_expiradas_total: int
+    ultima_quantidade: int
+    ultima_execucao: Optional[datetime] = None
+    ultimo_erro: Optional[str] = None
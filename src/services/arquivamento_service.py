@@ -0,0 +1,218 @@
+"""
+Arquivamento de sessões antigas em arquivos Parquet.
+
+A tabela Sessao cresce sem limite e os agregados do dashboard percorrem todo o
+histórico. Este job move as sessões finalizadas com mais de SESSAO_ARQUIVO_ANOS
+anos, mês a mês, para arquivos Parquet comprimidos (zstd) em SESSAO_ARQUIVO_DIR,
+no layout particionado ano=AAAA/mes=MM/. O coworking_id é gravado junto com a
+sessão, para que o dashboard consiga agregar o arquivo sem consultar o banco, e os
+vínculos com analistas (Sessoes_analistas) vão na coluna analista_ids: nada do que
+é excluído do banco fica fora do arquivo.
+
+Particionamento nativo (PARTITION BY RANGE em Sessao.data) não é usado: no
+PostgreSQL a chave primária e os índices únicos de uma tabela particionada precisam
+incluir a coluna de partição, o que quebraria a FK de Sessoes_analistas e o índice
+ux_sessao_computador_ativa.
+
+Requer pyarrow (opcional). Execução (ex.: via cron):
+    python -m src.services.arquivamento_service --anos 3
+"""
+import argparse
+import importlib.util
+import os
+import uuid
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from src.database.connection import registrar_escrita
+from src.repositories.sessao_repository import SessaoRepository
+from src.services.sessao_service import SessaoService
+
+# pyarrow é carregado só no primeiro uso (_carregar_pyarrow): a importação custa
+# centenas de ms e este módulo é importado pelo dashboard em toda inicialização
+pa = pc = ds = pq = None
+
+
+SESSAO_ARQUIVO_DIR = os.getenv("SESSAO_ARQUIVO_DIR", "arquivo_sessoes")
+SESSAO_ARQUIVO_ANOS = int(os.getenv("SESSAO_ARQUIVO_ANOS", "3"))
+SESSAO_ARQUIVO_LOTE = int(os.getenv("SESSAO_ARQUIVO_LOTE", "50000"))
+
+
+def _carregar_pyarrow(operacao: str) -> None:
+    global pa, pc, ds, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError(f"{operacao} requer o pacote pyarrow")
+    pa, pc, ds, pq = pyarrow, pyarrow.compute, pyarrow.dataset, pyarrow.parquet
+
+
+def _esquema():
+    return pa.schema([
+        ("sessao_id", pa.int64()),
+        ("data", pa.date32()),
+        ("inicio_de_sessao", pa.timestamp("us")),
+        ("final_de_sessao", pa.timestamp("us")),
+        ("ativado", pa.bool_()),
+        ("computador_id", pa.int64()),
+        ("usuario_id", pa.int64()),
+        ("administrador_id", pa.int64()),
+        ("coworking_id", pa.int64()),
+        ("analista_ids", pa.list_(pa.int64())),
+    ])
+
+
+def pyarrow_disponivel() -> bool:
+    return pa is not None or importlib.util.find_spec("pyarrow") is not None
+
+
+class ResumoArquivo(NamedTuple):
+    """Agregados das sessões arquivadas usados pelo dashboard"""
+    total_por_sala: Dict[int, int]
+    sessoes_por_hora: Dict[datetime, int]
+    sessoes_por_mes: Dict[Tuple[int, int], int]
+
+
+class ArquivoSessoes:
+    """Leitura agregada dos arquivos Parquet de sessões"""
+
+    def __init__(self, diretorio: str = SESSAO_ARQUIVO_DIR):
+        self.diretorio = diretorio
+
+    def resumir(self, coworking_id: int, sala_ids: List[int], ano: Optional[int] = None) -> ResumoArquivo:
+        """Totais por sala (de `sala_ids`) e, para `coworking_id`, sessões por hora e por mês"""
+        vazio = ResumoArquivo({}, {}, {})
+        if not os.path.isdir(self.diretorio) or not sala_ids:
+            return vazio
+        _carregar_pyarrow("A leitura do arquivo de sessões")
+
+        dataset = ds.dataset(self.diretorio, format="parquet", partitioning="hive")
+        filtro = ds.field("coworking_id").isin(sala_ids)
+        if ano is not None:
+            filtro = filtro & (ds.field("ano") == ano)
+        tabela = dataset.to_table(columns=["coworking_id", "inicio_de_sessao", "data"], filter=filtro)
+        if tabela.num_rows == 0:
+            return vazio
+
+        por_sala = tabela.group_by("coworking_id").aggregate([("coworking_id", "count")])
+        total_por_sala = dict(zip(
+            por_sala["coworking_id"].to_pylist(), por_sala["coworking_id_count"].to_pylist()
+        ))
+
+        sala = tabela.filter(pc.equal(tabela["coworking_id"], coworking_id))
+        horas = pa.table({"hora": pc.floor_temporal(sala["inicio_de_sessao"], unit="hour")})
+        por_hora = horas.group_by("hora").aggregate([("hora", "count")])
+        meses = pa.table({"ano": pc.year(sala["data"]), "mes": pc.month(sala["data"])})
+        por_mes = meses.group_by(["ano", "mes"]).aggregate([("ano", "count")])
+
+        return ResumoArquivo(
+            total_por_sala,
+            dict(zip(por_hora["hora"].to_pylist(), por_hora["hora_count"].to_pylist())),
+            {
+                (a, m): total
+                for a, m, total in zip(
+                    por_mes["ano"].to_pylist(), por_mes["mes"].to_pylist(), por_mes["ano_count"].to_pylist()
+                )
+            },
+        )
+
+
+class ArquivamentoService:
+    def __init__(self, db: Session, diretorio: str = SESSAO_ARQUIVO_DIR):
+        self.db = db
+        self.diretorio = diretorio
+        self.repository = SessaoRepository(db)
+
+    @staticmethod
+    def limite_arquivamento(anos: int, hoje: Optional[date] = None) -> date:
+        """Primeiro dia do mês corrente, `anos` anos atrás (meses anteriores são arquivados)"""
+        hoje = hoje or date.today()
+        return date(hoje.year - anos, hoje.month, 1)
+
+    def arquivar_sessoes_antigas(self, anos: int = SESSAO_ARQUIVO_ANOS) -> Dict[str, int]:
+        """Arquiva, mês a mês, as sessões finalizadas anteriores ao limite
+
+        Returns:
+            Quantidade de meses (arquivos) e de sessões arquivadas
+        """
+        _carregar_pyarrow("O arquivamento de sessões")
+        meses = self.repository.get_meses_arquivaveis(self.limite_arquivamento(anos))
+        total = 0
+        for ano, mes in meses:
+            total += self._arquivar_mes(ano, mes)
+        return {"meses": len(meses), "sessoes": total}
+
+    def _arquivar_mes(self, ano: int, mes: int) -> int:
+        inicio = date(ano, mes, 1)
+        fim = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+
+        pasta = os.path.join(self.diretorio, f"ano={ano}", f"mes={mes:02d}")
+        os.makedirs(pasta, exist_ok=True)
+        # Um arquivo por execução: reexecuções no mesmo mês (sessões finalizadas
+        # depois) acrescentam arquivos em vez de reescrever os existentes
+        nome = f"parte-{uuid.uuid4().hex}.parquet"
+        destino = os.path.join(pasta, nome)
+        # Prefixo "_": ignorado pelo pyarrow.dataset enquanto o arquivo é escrito
+        temporario = os.path.join(pasta, f"_{nome}.tmp")
+
+        sessao_service = SessaoService(self.db)
+        sessao_ids: List[int] = []
+        coworking_ids = set()
+        esquema = _esquema()
+        # Carregados antes da iteração: o cursor em streaming não permite outra consulta no meio
+        analistas = self.repository.get_analistas_finalizadas_no_periodo(inicio, fim)
+        try:
+            with pq.ParquetWriter(temporario, esquema, compression="zstd") as escritor:
+                lote: List[dict] = []
+                for linha in self.repository.iterar_finalizadas_no_periodo(inicio, fim):
+                    linha["analista_ids"] = analistas.get(linha["sessao_id"], [])
+                    lote.append(linha)
+                    sessao_ids.append(linha["sessao_id"])
+                    coworking_ids.add(linha["coworking_id"])
+                    if len(lote) >= SESSAO_ARQUIVO_LOTE:
+                        escritor.write_table(pa.Table.from_pylist(lote, schema=esquema))
+                        lote = []
+                if lote:
+                    escritor.write_table(pa.Table.from_pylist(lote, schema=esquema))
+            if not sessao_ids:
+                os.remove(temporario)
+                return 0
+            os.replace(temporario, destino)
+            # Só remove do banco (sessões e vínculos) depois que o arquivo, com os
+            # vínculos em analista_ids, está completo no disco
+            sessao_service.agendar_versoes(coworking_ids)
+            self.repository.excluir_em_lote(sessao_ids)
+        except Exception:
+            for caminho in (temporario, destino):
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+            raise
+
+        registrar_escrita()
+        return len(sessao_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arquiva sessões antigas em arquivos Parquet")
+    parser.add_argument("--anos", type=int, default=SESSAO_ARQUIVO_ANOS,
+                        help=f"Arquivar sessões finalizadas com mais de N anos (padrão: {SESSAO_ARQUIVO_ANOS})")
+    parser.add_argument("--diretorio", default=SESSAO_ARQUIVO_DIR,
+                        help=f"Diretório dos arquivos Parquet (padrão: {SESSAO_ARQUIVO_DIR})")
+    args = parser.parse_args()
+
+    from src.database.connection import SessionLocal
+    db = SessionLocal()
+    try:
+        resultado = ArquivamentoService(db, args.diretorio).arquivar_sessoes_antigas(args.anos)
+    finally:
+        db.close()
+    print(f"📦 {resultado['sessoes']} sessões arquivadas em {resultado['meses']} meses ({args.diretorio})")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,18 @@ from fastapi import HTTPException, status
 from src.repositories.computador_repository import ComputadorRepository
 from src.repositories.sala_coworking_repository import SalaCoworkingRepository
 from src.schemas.computador import ComputadorCreate, ComputadorUpdate, ComputadorResponse
+from src.schemas.comum import LoteResponse
+from src.services.sessao_service import agendar_versoes_sessoes
+from src.utils.serializacao import Tabela
+
+
+# Colunas de ComputadorRepository._query_projetada
+COLUNAS_COMPUTADOR = ["computador_id", "ip_da_maquina", "numero_de_tombamento", "coworking_id"]
 
 
 class ComputadorService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = ComputadorRepository(db)
         self.sala_repo = SalaCoworkingRepository(db)
 
@@ -47,13 +55,21 @@ class ComputadorService:
             )
         return ComputadorResponse.model_validate(db_computador)
 
-    def listar_computadores(self, skip: int = 0, limit: int = 100) -> List[ComputadorResponse]:
-        computadores = self.repository.get_all(skip=skip, limit=limit)
-        return [ComputadorResponse.model_validate(c) for c in computadores]
+    def obter_computadores(self, ids: List[int]) -> LoteResponse[ComputadorResponse]:
+        """Busca vários computadores em uma única consulta, na ordem de `ids`"""
+        lote = self.repository.get_many(ids)
+        return LoteResponse[ComputadorResponse](
+            itens=[ComputadorResponse.model_validate(c) for c in lote.encontrados],
+            ids_nao_encontrados=lote.ids_nao_encontrados
+        )
+
+    def listar_computadores(self, skip: int = 0, limit: int = 100) -> Tabela:
+        """Lista computadores como linhas projetadas (já no formato de ComputadorResponse)"""
+        return Tabela(self.repository.get_all_projetado(skip=skip, limit=limit), COLUNAS_COMPUTADOR)
 
-    def listar_computadores_por_coworking(self, coworking_id: int) -> List[ComputadorResponse]:
-        computadores = self.repository.get_by_coworking(coworking_id)
-        return [ComputadorResponse.model_validate(c) for c in computadores]
+    def listar_computadores_por_coworking(self, coworking_id: int) -> Tabela:
+        """Lista os computadores da sala como linhas projetadas (já no formato de ComputadorResponse)"""
+        return Tabela(self.repository.get_by_coworking_projetado(coworking_id), COLUNAS_COMPUTADOR)
 
     def atualizar_computador(self, computador_id: int, computador: ComputadorUpdate) -> ComputadorResponse:
         db_computador = self.repository.get_by_id(computador_id)
@@ -88,6 +104,12 @@ class ComputadorService:
                 )
         
         update_dict = computador.model_dump(exclude_unset=True)
+        # Sala e IP aparecem nas listagens de sessões (join e filtro): as ETags das
+        # unidades de origem e de destino mudam no mesmo commit
+        nova_sala = update_dict.get("coworking_id", db_computador.coworking_id)
+        novo_ip = update_dict.get("ip_da_maquina", db_computador.ip_da_maquina)
+        if nova_sala != db_computador.coworking_id or novo_ip != db_computador.ip_da_maquina:
+            agendar_versoes_sessoes(self.db, [db_computador.coworking_id, nova_sala])
         updated_computador = self.repository.update(db_computador, update_dict)
         return ComputadorResponse.model_validate(updated_computador)
 
@@ -98,5 +120,7 @@ class ComputadorService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Computador não encontrado"
             )
+        # As sessões do computador perdem a sala (computador_id = NULL)
+        agendar_versoes_sessoes(self.db, [db_computador.coworking_id, None])
         return self.repository.delete(db_computador)
 
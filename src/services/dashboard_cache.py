@@ -0,0 +1,117 @@
+"""
+Cache das respostas do dashboard, indexado pela tupla de filtros
+(subsecional_id, unidade_id, coworking_id, ano).
+
+- Anos anteriores ao atual raramente mudam: TTL longo (DASHBOARD_CACHE_TTL_HISTORICO)
+- Ano atual e "todos os anos": TTL curto (DASHBOARD_CACHE_TTL_ATUAL) e invalidação
+  quando sessões da unidade são alteradas. A geração que faz parte da chave é a versão
+  das sessões da unidade em Versao_cache (sessoes:unidade:{id}), a mesma das ETags:
+  incrementada no commit de cada escrita, vale para todos os workers (o "coworking mais
+  utilizado" compara todas as salas da unidade, então a unidade inteira é invalidada).
+
+Métricas derivadas do dashboard (ex.: mapa de calor) usam o mesmo backend, com
+chaves por sala e ano e as mesmas regras de TTL e invalidação.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+from src.schemas.dashboard import DashboardFiltros, DashboardResponse
+from src.utils.cache import CacheBackend, CacheMetricas, LRUCacheBackend
+
+
+DASHBOARD_CACHE_HABILITADO = os.getenv("DASHBOARD_CACHE_HABILITADO", "true").lower() in ("1", "true", "sim")
+DASHBOARD_CACHE_TTL_ATUAL = float(os.getenv("DASHBOARD_CACHE_TTL_ATUAL", "60"))
+DASHBOARD_CACHE_TTL_HISTORICO = float(os.getenv("DASHBOARD_CACHE_TTL_HISTORICO", "86400"))
+DASHBOARD_CACHE_MAX_ENTRADAS = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRADAS", "2048"))
+
+
+class DashboardCache:
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        habilitado: bool = DASHBOARD_CACHE_HABILITADO,
+        ttl_atual: float = DASHBOARD_CACHE_TTL_ATUAL,
+        ttl_historico: float = DASHBOARD_CACHE_TTL_HISTORICO,
+    ):
+        self.backend = backend or LRUCacheBackend(DASHBOARD_CACHE_MAX_ENTRADAS)
+        self.habilitado = habilitado
+        self.ttl_atual = ttl_atual
+        self.ttl_historico = ttl_historico
+        self.metricas = CacheMetricas()
+        # Última geração vista por unidade, para contar as invalidações neste worker
+        self._geracoes: Dict[int, int] = {}
+
+    def configurar_backend(self, backend: CacheBackend) -> None:
+        """Substitui o armazenamento (ex.: um backend compartilhado entre workers)"""
+        self.backend = backend
+
+    @staticmethod
+    def e_historico(ano: Optional[int]) -> bool:
+        return ano is not None and ano < datetime.now().year
+
+    def _chave(self, filtros: DashboardFiltros, geracao: int) -> str:
+        chave = (
+            f"dashboard:{filtros.subsecional_id}:{filtros.unidade_id}:"
+            f"{filtros.coworking_id}:{filtros.ano or 'todos'}"
+        )
+        return self._sufixar(chave, filtros, geracao)
+
+    def _sufixar(self, chave: str, filtros: DashboardFiltros, geracao: int) -> str:
+        if filtros.incluir_arquivo:
+            chave = f"{chave}:arquivo"
+        if not self.e_historico(filtros.ano):
+            if geracao > self._geracoes.get(filtros.unidade_id, geracao):
+                self.metricas.registrar_invalidacao()
+            self._geracoes[filtros.unidade_id] = geracao
+            chave = f"{chave}:g{geracao}"
+        return chave
+
+    def obter(self, filtros: DashboardFiltros, geracao: int) -> Optional[DashboardResponse]:
+        """Resposta em cache; `geracao` é a versão atual das sessões da unidade (Versao_cache)"""
+        if not self.habilitado:
+            return None
+        valor = self.backend.get(self._chave(filtros, geracao))
+        if valor is None:
+            self.metricas.registrar_miss()
+            return None
+        self.metricas.registrar_hit()
+        return DashboardResponse.model_validate(valor)
+
+    def armazenar(self, filtros: DashboardFiltros, geracao: int, resposta: DashboardResponse) -> None:
+        if not self.habilitado:
+            return
+        ttl = self.ttl_historico if self.e_historico(filtros.ano) else self.ttl_atual
+        self.backend.set(self._chave(filtros, geracao), resposta.model_dump(mode="json"), ttl)
+
+    def _chave_metrica(self, nome: str, filtros: DashboardFiltros, geracao: int, *partes) -> str:
+        # Métricas de uma sala só dependem da sala e do ano (a unidade entra apenas na geração)
+        chave = ":".join(str(p) for p in (f"dashboard:{nome}", filtros.coworking_id, filtros.ano or "todos", *partes))
+        return self._sufixar(chave, filtros, geracao)
+
+    def obter_metrica(self, nome: str, filtros: DashboardFiltros, geracao: int, *partes) -> Optional[Any]:
+        """Valor em cache de uma métrica derivada (JSON-serializável), ou None"""
+        if not self.habilitado:
+            return None
+        valor = self.backend.get(self._chave_metrica(nome, filtros, geracao, *partes))
+        if valor is None:
+            self.metricas.registrar_miss()
+            return None
+        self.metricas.registrar_hit()
+        return valor
+
+    def armazenar_metrica(self, nome: str, filtros: DashboardFiltros, geracao: int, valor: Any, *partes) -> None:
+        if not self.habilitado:
+            return
+        ttl = self.ttl_historico if self.e_historico(filtros.ano) else self.ttl_atual
+        self.backend.set(self._chave_metrica(nome, filtros, geracao, *partes), valor, ttl)
+
+    def obter_metricas(self) -> dict:
+        return {
+            **self.metricas.como_dict(),
+            "habilitado": self.habilitado,
+            "entradas": self.backend.tamanho(),
+        }
+
+
+# Instância única por processo
+dashboard_cache = DashboardCache()
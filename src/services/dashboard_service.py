@@ -1,32 +1,59 @@
-from typing import Optional
-from datetime import datetime
+import math
+import os
+from typing import Dict, Optional, Tuple
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from src.repositories.dashboard_repository import DashboardRepository
-from src.repositories.subsecional_repository import SubsecionalRepository
-from src.repositories.unidade_repository import UnidadeRepository
-from src.repositories.sala_coworking_repository import SalaCoworkingRepository
-from src.schemas.dashboard import DashboardFiltros, DashboardResponse, PicoAcesso, CoworkingMaisUtilizado, FrequenciaMensal
+from src.repositories.versao_repository import VersaoRepository
+from src.services.hierarquia_service import hierarquia_index, CHAVE_VERSAO_HIERARQUIA
+from src.services.sessao_service import chave_versao_sessoes_unidade
+from src.services.dashboard_cache import dashboard_cache
+from src.services.arquivamento_service import ArquivoSessoes, pyarrow_disponivel
+from src.services.expiracao_service import SESSAO_DURACAO_MAXIMA_HORAS
+from src.schemas.dashboard import (
+    DashboardFiltros, DashboardResponse, PicoAcesso, CoworkingMaisUtilizado, FrequenciaMensal,
+    MapaCalorResponse, PicoMapaCalor, DIAS_SEMANA, OcupacaoResponse, OcupacaoIntervalo, PicoOcupacao,
+)
+from src.utils.etag import gerar_etag
+from src.utils.mapa_calor import matriz_dia_hora, matriz_de_horas
+from src.utils.ocupacao_temporal import curva_concorrencia, ocupacao_por_intervalo, para_segundos
+
+
+# Limite de pontos da série de ocupação (ex.: 1 ano em intervalos de 1 hora = 8760)
+OCUPACAO_MAX_INTERVALOS = int(os.getenv("OCUPACAO_MAX_INTERVALOS", "10000"))
+OCUPACAO_DIAS_PADRAO = 7
 
 
 class DashboardService:
     def __init__(self, db: Session):
+        self.db = db
         self.dashboard_repo = DashboardRepository(db)
-        self.subsecional_repo = SubsecionalRepository(db)
-        self.unidade_repo = UnidadeRepository(db)
-        self.sala_repo = SalaCoworkingRepository(db)
+        self._versoes_por_unidade: Dict[int, Dict[str, int]] = {}
+
+    def _versoes(self, unidade_id: int) -> Dict[str, int]:
+        """Versões das sessões da unidade e da hierarquia, lidas uma vez (ETag e cache)"""
+        if unidade_id not in self._versoes_por_unidade:
+            self._versoes_por_unidade[unidade_id] = VersaoRepository(self.db).obter_varias(
+                [chave_versao_sessoes_unidade(unidade_id), CHAVE_VERSAO_HIERARQUIA]
+            )
+        return self._versoes_por_unidade[unidade_id]
+
+    def _geracao(self, filtros: DashboardFiltros) -> int:
+        """Geração do cache do dashboard: a versão das sessões da unidade"""
+        return self._versoes(filtros.unidade_id)[chave_versao_sessoes_unidade(filtros.unidade_id)]
 
     def _validar_filtros(self, filtros: DashboardFiltros) -> None:
         """Valida se os filtros existem e estão relacionados corretamente"""
         # Validar subseccional
-        if not self.subsecional_repo.get_by_id(filtros.subsecional_id):
+        if not hierarquia_index.obter_subsecional(self.db, filtros.subsecional_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Subseccional não encontrada. Por favor, selecione uma subseccional válida."
             )
         
         # Validar unidade
-        unidade = self.unidade_repo.get_by_id(filtros.unidade_id)
+        unidade = hierarquia_index.obter_unidade(self.db, filtros.unidade_id)
         if not unidade:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -41,7 +68,7 @@ class DashboardService:
             )
         
         # Validar sala coworking
-        sala = self.sala_repo.get_by_id(filtros.coworking_id)
+        sala = hierarquia_index.obter_sala(self.db, filtros.coworking_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -55,6 +82,68 @@ class DashboardService:
                 detail="A sala de coworking selecionada não pertence à unidade e subseccional informadas. Por favor, selecione uma sala válida."
             )
 
+    def obter_etag(self, filtros: DashboardFiltros, metrica: str = "dashboard", *partes) -> str:
+        """ETag do dashboard: muda quando sessões da unidade ou a hierarquia são alteradas"""
+        chave_unidade = chave_versao_sessoes_unidade(filtros.unidade_id)
+        versoes = self._versoes(filtros.unidade_id)
+        return gerar_etag(
+            metrica, filtros.subsecional_id, filtros.unidade_id, filtros.coworking_id,
+            filtros.ano, filtros.incluir_arquivo, versoes[chave_unidade], versoes[CHAVE_VERSAO_HIERARQUIA], *partes
+        )
+
+    def _mesclar_arquivo(self, filtros: DashboardFiltros, total_sessoes: int, pico_acesso_data, frequencia_data: list):
+        """Soma aos dados do banco as sessões arquivadas em Parquet
+        
+        O arquivamento move meses inteiros, então os períodos do banco e do arquivo não se
+        sobrepõem: o pico de acesso é o maior entre os dois.
+        """
+        if not pyarrow_disponivel():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="A consulta às sessões arquivadas requer o pacote pyarrow no servidor."
+            )
+        snapshot = hierarquia_index.obter(self.db)
+        sala_ids = [
+            sala.coworking_id for sala in snapshot.salas.values()
+            if sala.unidade_id == filtros.unidade_id and sala.subsecional_id == filtros.subsecional_id
+        ]
+        resumo = ArquivoSessoes().resumir(filtros.coworking_id, sala_ids, filtros.ano)
+
+        total_sessoes += resumo.total_por_sala.get(filtros.coworking_id, 0)
+
+        pico_acesso = None
+        candidatos = [pico_acesso_data] if pico_acesso_data else []
+        if resumo.sessoes_por_hora:
+            candidatos.append(max(resumo.sessoes_por_hora.items(), key=lambda item: item[1]))
+        if candidatos:
+            hora_pico, quantidade = max(candidatos, key=lambda item: item[1])
+            pico_acesso = PicoAcesso(
+                horario=hora_pico.strftime("%H:%M"),
+                data=hora_pico.strftime("%d/%m/%Y"),
+                quantidade=quantidade
+            )
+
+        por_sala = self.dashboard_repo.contar_sessoes_por_sala(filtros.subsecional_id, filtros.unidade_id, filtros.ano)
+        for coworking_id, quantidade in resumo.total_por_sala.items():
+            por_sala[coworking_id] = por_sala.get(coworking_id, 0) + quantidade
+        coworking_mais_utilizado = None
+        if por_sala:
+            coworking_id, quantidade = max(por_sala.items(), key=lambda item: item[1])
+            coworking_mais_utilizado = CoworkingMaisUtilizado(
+                coworking_id=coworking_id,
+                nome_da_sala=snapshot.salas[coworking_id].nome_da_sala,
+                total_sessoes=quantidade
+            )
+
+        por_mes = {(item['ano'], item['mes']): item['total_sessoes'] for item in frequencia_data}
+        for chave, quantidade in resumo.sessoes_por_mes.items():
+            por_mes[chave] = por_mes.get(chave, 0) + quantidade
+        frequencia_data = [
+            {'ano': ano, 'mes': mes, 'total_sessoes': total}
+            for (ano, mes), total in sorted(por_mes.items())
+        ]
+        return total_sessoes, pico_acesso, coworking_mais_utilizado, frequencia_data
+
     def _nome_mes(self, numero_mes: int) -> str:
         """Converte número do mês para nome em português"""
         meses = {
@@ -69,6 +158,14 @@ class DashboardService:
         # Validar filtros
         self._validar_filtros(filtros)
 
+        geracao = self._geracao(filtros)
+        em_cache = dashboard_cache.obter(filtros, geracao)
+        if em_cache is not None:
+            if dashboard_cache.e_historico(filtros.ano):
+                # Sessões ativas independem do ano: sempre contadas no momento
+                em_cache.sessoes_ativas = self.dashboard_repo.contar_sessoes_ativas(filtros.coworking_id)
+            return em_cache
+
         # Contar sessões ativas
         sessoes_ativas = self.dashboard_repo.contar_sessoes_ativas(filtros.coworking_id, filtros.ano)
         total_sessoes = self.dashboard_repo.contar_total_sessoes(filtros.coworking_id, filtros.ano)
@@ -96,6 +193,11 @@ class DashboardService:
 
         # Obter frequência mensal
         frequencia_data = self.dashboard_repo.obter_frequencia_mensal(filtros.coworking_id, filtros.ano)
+
+        if filtros.incluir_arquivo:
+            total_sessoes, pico_acesso, coworking_mais_utilizado, frequencia_data = self._mesclar_arquivo(
+                filtros, total_sessoes, pico_acesso_data, frequencia_data
+            )
         frequencia_mensal = [
             FrequenciaMensal(
                 mes=self._nome_mes(item['mes']),
@@ -105,11 +207,161 @@ class DashboardService:
             for item in frequencia_data
         ]
 
-        return DashboardResponse(
+        resposta = DashboardResponse(
             sessoes_ativas=sessoes_ativas,
             total_sessoes=total_sessoes,
             pico_acesso=pico_acesso,
             coworking_mais_utilizado=coworking_mais_utilizado,
             frequencia_mensal=frequencia_mensal
         )
+        dashboard_cache.armazenar(filtros, geracao, resposta)
+        return resposta
 
+    def obter_mapa_calor(self, filtros: DashboardFiltros) -> MapaCalorResponse:
+        """Mapa de calor 7x24 (dia da semana x hora) das sessões iniciadas na sala
+        
+        Uma consulta agrupada por dia da semana/hora; com incluir_arquivo, soma os
+        agregados por hora das sessões arquivadas. Em cache por (coworking_id, ano).
+        """
+        self._validar_filtros(filtros)
+
+        geracao = self._geracao(filtros)
+        em_cache = dashboard_cache.obter_metrica("mapa-calor", filtros, geracao)
+        if em_cache is not None:
+            return MapaCalorResponse.model_validate(em_cache)
+
+        matriz = matriz_dia_hora(
+            self.dashboard_repo.contar_sessoes_por_dia_semana_e_hora(filtros.coworking_id, filtros.ano)
+        )
+        if filtros.incluir_arquivo:
+            if not pyarrow_disponivel():
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="A consulta às sessões arquivadas requer o pacote pyarrow no servidor."
+                )
+            resumo = ArquivoSessoes().resumir(filtros.coworking_id, [filtros.coworking_id], filtros.ano)
+            matriz += matriz_de_horas(resumo.sessoes_por_hora)
+
+        pico = None
+        if matriz.any():
+            dia, hora = divmod(int(matriz.argmax()), matriz.shape[1])
+            pico = PicoMapaCalor(dia_semana=DIAS_SEMANA[dia], hora=hora, quantidade=int(matriz[dia, hora]))
+
+        resposta = MapaCalorResponse(
+            coworking_id=filtros.coworking_id,
+            ano=filtros.ano,
+            matriz=matriz.tolist(),
+            total_por_dia=matriz.sum(axis=1).tolist(),
+            total_por_hora=matriz.sum(axis=0).tolist(),
+            total_sessoes=int(matriz.sum()),
+            pico=pico
+        )
+        dashboard_cache.armazenar_metrica("mapa-calor", filtros, geracao, resposta.model_dump(mode="json"))
+        return resposta
+
+    @staticmethod
+    def periodo_ocupacao(
+        ano: Optional[int], data_inicio: Optional[date], data_fim: Optional[date], intervalo_minutos: int
+    ) -> Tuple[datetime, datetime]:
+        """Período [inicio, fim) da série de ocupação
+        
+        Datas informadas têm prioridade (fim inclusivo); sem datas, usa o ano inteiro ou,
+        sem ano, os últimos OCUPACAO_DIAS_PADRAO dias. O fim nunca passa do minuto atual,
+        então o período (e a ETag) avança enquanto houver sessões em andamento.
+        """
+        agora = datetime.now().replace(second=0, microsecond=0)
+        hoje = agora.date()
+        if data_inicio is not None or data_fim is not None:
+            data_fim = data_fim or hoje
+            data_inicio = data_inicio or data_fim - timedelta(days=OCUPACAO_DIAS_PADRAO - 1)
+            inicio = datetime.combine(data_inicio, time.min)
+            fim = datetime.combine(data_fim + timedelta(days=1), time.min)
+        elif ano is not None:
+            inicio, fim = datetime(ano, 1, 1), datetime(ano + 1, 1, 1)
+        else:
+            inicio = datetime.combine(hoje - timedelta(days=OCUPACAO_DIAS_PADRAO - 1), time.min)
+            fim = datetime.combine(hoje + timedelta(days=1), time.min)
+        fim = min(fim, agora)
+
+        if fim <= inicio:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Período inválido: a data inicial deve ser anterior à final e não pode estar no futuro."
+            )
+        intervalos = math.ceil((fim - inicio) / timedelta(minutes=intervalo_minutos))
+        if intervalos > OCUPACAO_MAX_INTERVALOS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"O período geraria {intervalos} intervalos (máximo: {OCUPACAO_MAX_INTERVALOS}). "
+                       "Reduza o período ou aumente intervalo_minutos."
+            )
+        return inicio, fim
+
+    def obter_ocupacao(
+        self, filtros: DashboardFiltros, inicio: datetime, fim: datetime, intervalo_minutos: int
+    ) -> OcupacaoResponse:
+        """Série de ocupação da sala: sessões simultâneas e % dos computadores em uso
+        
+        Os intervalos das sessões (as ativas vão até agora) passam pela varredura
+        vetorizada de ocupacao_temporal. Em cache por sala, período e intervalo.
+        """
+        self._validar_filtros(filtros)
+
+        partes = (inicio.isoformat(), fim.isoformat(), intervalo_minutos)
+        geracao = self._geracao(filtros)
+        em_cache = dashboard_cache.obter_metrica("ocupacao", filtros, geracao, *partes)
+        if em_cache is not None:
+            return OcupacaoResponse.model_validate(em_cache)
+
+        total_computadores = self.dashboard_repo.contar_computadores(filtros.coworking_id)
+        sessoes = self.dashboard_repo.obter_intervalos_sessoes(
+            filtros.coworking_id, inicio, fim, timedelta(hours=SESSAO_DURACAO_MAXIMA_HORAS)
+        )
+        agora = datetime.now()
+        curva = curva_concorrencia(
+            para_segundos(inicio_sessao for inicio_sessao, _ in sessoes),
+            para_segundos(final or agora for _, final in sessoes),
+        )
+        passo = timedelta(minutes=intervalo_minutos)
+        inicio_s, fim_s = para_segundos((inicio, fim)).tolist()
+        serie = ocupacao_por_intervalo(curva, inicio_s, fim_s, int(passo.total_seconds()))
+
+        # Percentual dos computadores em uso; sala sem computadores fica com 0%
+        escala = 100 / total_computadores if total_computadores else 0.0
+        medias = serie.media.round(3).tolist()
+        taxas = (serie.media * escala).round(2).tolist()
+        maximos = serie.maximo.tolist()
+        intervalos = [
+            OcupacaoIntervalo(inicio=inicio + passo * k, media_sessoes=media, max_sessoes=maximo, taxa_ocupacao=taxa)
+            for k, (media, maximo, taxa) in enumerate(zip(medias, maximos, taxas))
+        ]
+
+        pico = None
+        if serie.maximo.any():
+            k = int(serie.maximo.argmax())
+            pico = PicoOcupacao(
+                inicio=intervalos[k].inicio,
+                sessoes=maximos[k],
+                taxa_ocupacao=round(maximos[k] * escala, 2)
+            )
+
+        # Média do período ponderada pela duração (o último intervalo pode ser mais curto)
+        bordas = serie.inicios.tolist() + [fim_s]
+        media_periodo = sum(
+            media * (fim_intervalo - inicio_intervalo)
+            for media, inicio_intervalo, fim_intervalo in zip(serie.media.tolist(), bordas, bordas[1:])
+        ) / (fim_s - inicio_s)
+
+        resposta = OcupacaoResponse(
+            coworking_id=filtros.coworking_id,
+            inicio=inicio,
+            fim=fim,
+            intervalo_minutos=intervalo_minutos,
+            total_computadores=total_computadores,
+            total_sessoes=len(sessoes),
+            taxa_ocupacao_media=round(media_periodo * escala, 2),
+            pico=pico,
+            intervalos=intervalos
+        )
+        dashboard_cache.armazenar_metrica("ocupacao", filtros, geracao, resposta.model_dump(mode="json"), *partes)
+        return resposta
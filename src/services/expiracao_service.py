@@ -0,0 +1,210 @@
+"""
+Expiração automática de sessões esquecidas como ativas.
+
+Sessões que ficam com ativado=True indefinidamente inflam a contagem de sessões
+ativas do dashboard e de /sessoes/ativas. O agendador finaliza periodicamente,
+em lotes, as sessões iniciadas há mais de SESSAO_DURACAO_MAXIMA_HORAS.
+
+Com vários workers, apenas um executa a expiração: a liderança é obtida com um
+advisory lock no banco (pg_try_advisory_lock no PostgreSQL, GET_LOCK no MySQL).
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.database.connection import engine, SessionLocal
+from src.repositories.sessao_repository import SessaoRepository
+from src.services.sessao_service import SessaoService
+
+
+SESSAO_EXPIRACAO_HABILITADA = os.getenv("SESSAO_EXPIRACAO_HABILITADA", "false").lower() in ("1", "true", "sim")
+SESSAO_DURACAO_MAXIMA_HORAS = float(os.getenv("SESSAO_DURACAO_MAXIMA_HORAS", "12"))
+SESSAO_EXPIRACAO_INTERVALO_SEGUNDOS = float(os.getenv("SESSAO_EXPIRACAO_INTERVALO_SEGUNDOS", "300"))
+SESSAO_EXPIRACAO_LOTE = int(os.getenv("SESSAO_EXPIRACAO_LOTE", "500"))
+
+# Identificador do advisory lock (PostgreSQL) / nome do lock (MySQL)
+CHAVE_LOCK_EXPIRACAO = 7301
+NOME_LOCK_EXPIRACAO = "middleware_oab_expiracao_sessoes"
+
+
+class ExpiracaoSessoesService:
+    def __init__(self, db: Session):
+        self.repository = SessaoRepository(db)
+        self.sessao_service = SessaoService(db)
+
+    def expirar_sessoes_antigas(
+        self,
+        duracao_maxima: timedelta,
+        tamanho_lote: int = SESSAO_EXPIRACAO_LOTE
+    ) -> int:
+        """Finaliza, em lotes, as sessões abertas iniciadas antes de agora - duracao_maxima
+
+        Cada sessão expirada termina em inicio_de_sessao + duracao_maxima, não no
+        momento em que o agendador a encontrou.
+
+        Returns:
+            Quantidade de sessões expiradas
+        """
+        limite = datetime.now() - duracao_maxima
+        total = 0
+        while True:
+            sessoes = self.repository.get_ativas_iniciadas_antes(limite, tamanho_lote)
+            if not sessoes:
+                break
+            resultado = self.sessao_service.expirar_sessoes(sessoes, duracao_maxima)
+            total += resultado.total
+            if len(sessoes) < tamanho_lote:
+                break
+        return total
+
+
+class _LiderancaBanco:
+    """Eleição de líder entre workers via advisory lock mantido em uma conexão dedicada"""
+
+    def __init__(self):
+        self._conexao = None
+        self._sem_lock = False
+
+    @property
+    def lider(self) -> bool:
+        return self._sem_lock or self._conexao is not None
+
+    def tentar_obter(self) -> bool:
+        if self.lider:
+            return True
+        dialeto = engine.dialect.name
+        if dialeto not in ("postgresql", "mysql", "mariadb"):
+            # Sem advisory lock (ex.: SQLite): assume processo único
+            self._sem_lock = True
+            return True
+        conexao = engine.connect()
+        try:
+            if dialeto == "postgresql":
+                obtido = conexao.execute(
+                    text("SELECT pg_try_advisory_lock(:chave)"), {"chave": CHAVE_LOCK_EXPIRACAO}
+                ).scalar()
+            else:
+                obtido = conexao.execute(
+                    text("SELECT GET_LOCK(:nome, 0)"), {"nome": NOME_LOCK_EXPIRACAO}
+                ).scalar() == 1
+            # Encerrar a transação implícita, mantendo o lock (escopo de sessão)
+            conexao.commit()
+        except Exception:
+            conexao.close()
+            raise
+        if obtido:
+            self._conexao = conexao
+            return True
+        conexao.close()
+        return False
+
+    def verificar(self) -> bool:
+        """Confirma que a conexão que segura o lock continua viva"""
+        if self._sem_lock:
+            return True
+        if self._conexao is None:
+            return False
+        try:
+            self._conexao.execute(text("SELECT 1"))
+            self._conexao.commit()
+            return True
+        except Exception:
+            self.liberar()
+            return False
+
+    def liberar(self) -> None:
+        self._sem_lock = False
+        if self._conexao is None:
+            return
+        try:
+            # Fechar a conexão encerra a sessão no banco e libera o lock
+            self._conexao.invalidate()
+            self._conexao.close()
+        except Exception:
+            pass
+        self._conexao = None
+
+
+class AgendadorExpiracao:
+    """Executa a expiração de sessões periodicamente dentro do processo da API"""
+
+    def __init__(
+        self,
+        duracao_maxima_horas: float = SESSAO_DURACAO_MAXIMA_HORAS,
+        intervalo_segundos: float = SESSAO_EXPIRACAO_INTERVALO_SEGUNDOS,
+        tamanho_lote: int = SESSAO_EXPIRACAO_LOTE,
+    ):
+        self.duracao_maxima = timedelta(hours=duracao_maxima_horas)
+        self.intervalo_segundos = intervalo_segundos
+        self.tamanho_lote = tamanho_lote
+        self._lideranca = _LiderancaBanco()
+        self._tarefa: Optional[asyncio.Task] = None
+        self.metricas = {
+            "execucoes": 0,
+            "sessoes_expiradas_total": 0,
+            "ultima_execucao": None,
+            "ultima_quantidade": 0,
+            "ultimo_erro": None,
+        }
+
+    @property
+    def ativo(self) -> bool:
+        return self._tarefa is not None and not self._tarefa.done()
+
+    def obter_metricas(self) -> dict:
+        return {
+            **self.metricas,
+            "habilitado": self.ativo,
+            "lider": self._lideranca.lider,
+            "duracao_maxima_horas": self.duracao_maxima.total_seconds() / 3600,
+            "intervalo_segundos": self.intervalo_segundos,
+        }
+
+    def executar_uma_vez(self) -> int:
+        """Tenta assumir a liderança e, se for o líder, expira as sessões antigas"""
+        if not (self._lideranca.tentar_obter() and self._lideranca.verificar()):
+            return 0
+        db = SessionLocal()
+        try:
+            quantidade = ExpiracaoSessoesService(db).expirar_sessoes_antigas(
+                self.duracao_maxima, self.tamanho_lote
+            )
+        finally:
+            db.close()
+        self.metricas["execucoes"] += 1
+        self.metricas["sessoes_expiradas_total"] += quantidade
+        self.metricas["ultima_execucao"] = datetime.now()
+        self.metricas["ultima_quantidade"] = quantidade
+        self.metricas["ultimo_erro"] = None
+        return quantidade
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                quantidade = await asyncio.to_thread(self.executar_uma_vez)
+                if quantidade:
+                    print(f"⏱️ {quantidade} sessões expiradas automaticamente")
+            except Exception as e:
+                self.metricas["ultimo_erro"] = str(e)
+                print(f"⚠️ Aviso: Falha na expiração automática de sessões: {e}")
+            await asyncio.sleep(self.intervalo_segundos)
+
+    def iniciar(self) -> None:
+        if not self.ativo:
+            self._tarefa = asyncio.get_running_loop().create_task(self._loop())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        await asyncio.to_thread(self._lideranca.liberar)
+
+
+# Instância única por processo
+agendador_expiracao = AgendadorExpiracao()
@@ -0,0 +1,163 @@
+"""
+Índice em memória da hierarquia subseccional -> unidade -> sala coworking.
+
+A hierarquia muda raramente, mas é validada em todas as chamadas do dashboard,
+dos relatórios e da criação de salas. O índice carrega as três tabelas (apenas
+as colunas necessárias) e responde às validações sem acessar o banco.
+
+Invalidação entre workers: antes de cada escrita, os services de
+subseccional/unidade/sala agendam o incremento da versão "hierarquia" na tabela
+Versao_cache, gravado no mesmo commit da escrita (agendar_invalidacao). Cada
+worker compara sua versão com a do banco no máximo a cada
+HIERARQUIA_CACHE_VERIFICACAO_SEGUNDOS (uma consulta por chave primária) e
+recarrega o índice quando ela muda.
+"""
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.entities.subsecional import Subsecional
+from src.entities.unidade import Unidade, HierarquiaEnum
+from src.entities.sala_coworking import Sala_coworking
+from src.repositories.versao_repository import VersaoRepository
+
+
+HIERARQUIA_CACHE_VERIFICACAO_SEGUNDOS = float(os.getenv("HIERARQUIA_CACHE_VERIFICACAO_SEGUNDOS", "5"))
+
+CHAVE_VERSAO_HIERARQUIA = "hierarquia"
+
+# Chave de Session.info: descartar o índice local após o commit
+_INVALIDAR_INDICE = "hierarquia_invalidada"
+
+
+class SubsecionalNo(NamedTuple):
+    subsecional_id: int
+    nome: str
+
+
+class UnidadeNo(NamedTuple):
+    unidade_id: int
+    nome: str
+    hierarquia: HierarquiaEnum
+    subsecional_id: Optional[int]
+
+
+class SalaNo(NamedTuple):
+    coworking_id: int
+    nome_da_sala: str
+    subsecional_id: Optional[int]
+    unidade_id: Optional[int]
+
+
+class _Snapshot(NamedTuple):
+    versao: int
+    subsecionais: Dict[int, SubsecionalNo]
+    unidades: Dict[int, UnidadeNo]
+    salas: Dict[int, SalaNo]
+
+
+class HierarquiaIndex:
+    def __init__(self, verificacao_segundos: float = HIERARQUIA_CACHE_VERIFICACAO_SEGUNDOS):
+        self._verificacao_segundos = verificacao_segundos
+        self._snapshot: Optional[_Snapshot] = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+
+    def _carregar(self, db: Session, versao: int) -> _Snapshot:
+        subsecionais = {
+            r.subsecional_id: SubsecionalNo(r.subsecional_id, r.nome)
+            for r in db.query(Subsecional.subsecional_id, Subsecional.nome).all()
+        }
+        unidades = {
+            r.unidade_id: UnidadeNo(r.unidade_id, r.nome, r.hierarquia, r.subsecional_id)
+            for r in db.query(
+                Unidade.unidade_id, Unidade.nome, Unidade.hierarquia, Unidade.subsecional_id
+            ).all()
+        }
+        salas = {
+            r.coworking_id: SalaNo(r.coworking_id, r.nome_da_sala, r.subsecional_id, r.unidade_id)
+            for r in db.query(
+                Sala_coworking.coworking_id,
+                Sala_coworking.nome_da_sala,
+                Sala_coworking.subsecional_id,
+                Sala_coworking.unidade_id
+            ).all()
+        }
+        return _Snapshot(versao, subsecionais, unidades, salas)
+
+    def obter(self, db: Session, forcar_verificacao: bool = False) -> _Snapshot:
+        """Retorna o índice, recarregando-o se a versão no banco mudou"""
+        agora = time.monotonic()
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and not forcar_verificacao
+            and agora - self._verificado_em < self._verificacao_segundos
+        ):
+            return snapshot
+        with self._lock:
+            versao = VersaoRepository(db).obter(CHAVE_VERSAO_HIERARQUIA)
+            if self._snapshot is None or self._snapshot.versao != versao:
+                self._snapshot = self._carregar(db, versao)
+            self._verificado_em = agora
+            return self._snapshot
+
+    def _buscar(self, db: Session, tabela: str, id: int):
+        no = getattr(self.obter(db), tabela).get(id)
+        if no is None:
+            # Pode ter sido criado por outro worker: confirmar a versão antes de negar
+            no = getattr(self.obter(db, forcar_verificacao=True), tabela).get(id)
+        return no
+
+    def obter_subsecional(self, db: Session, subsecional_id: int) -> Optional[SubsecionalNo]:
+        return self._buscar(db, "subsecionais", subsecional_id)
+
+    def obter_unidade(self, db: Session, unidade_id: int) -> Optional[UnidadeNo]:
+        return self._buscar(db, "unidades", unidade_id)
+
+    def obter_sala(self, db: Session, coworking_id: int) -> Optional[SalaNo]:
+        return self._buscar(db, "salas", coworking_id)
+
+    def validar_hierarquia(self, db: Session, subsecional_id: int, unidade_id: int, coworking_id: int) -> bool:
+        """Valida se a hierarquia subsecional -> unidade -> coworking está correta"""
+        sala = self.obter_sala(db, coworking_id)
+        return (
+            sala is not None
+            and sala.unidade_id == unidade_id
+            and sala.subsecional_id == subsecional_id
+        )
+
+    def agendar_invalidacao(self, db: Session) -> None:
+        """
+        Marca a hierarquia como alterada no commit da transação corrente (para este
+        e para os demais workers): a versão é incrementada junto com a escrita.
+        """
+        VersaoRepository(db).agendar_incremento(CHAVE_VERSAO_HIERARQUIA)
+        db.info[_INVALIDAR_INDICE] = True
+
+    def invalidar(self, db: Session) -> None:
+        """Marca a hierarquia como alterada e faz commit (cargas feitas fora dos services)"""
+        self.agendar_invalidacao(db)
+        db.commit()
+
+    def descartar(self) -> None:
+        """Descarta o índice deste worker (recarregado no próximo uso)"""
+        with self._lock:
+            self._snapshot = None
+
+
+# Instância única por processo
+hierarquia_index = HierarquiaIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _descartar_apos_commit(db: Session) -> None:
+    if db.info.pop(_INVALIDAR_INDICE, False):
+        hierarquia_index.descartar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _cancelar_invalidacao(db: Session) -> None:
+    db.info.pop(_INVALIDAR_INDICE, None)
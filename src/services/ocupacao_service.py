@@ -0,0 +1,364 @@
+"""
+Feed de ocupação em tempo real das salas de coworking.
+
+Mantém em memória, por sala (coworking_id), o mapa computador_id -> sessão ativa
+e envia eventos delta (inicio/fim) para os clientes inscritos via WebSocket/SSE,
+evitando que as recepções precisem consultar GET /sessoes/ativas periodicamente.
+
+O mapa e os inscritos são por processo (worker). Com vários workers (src.servidor),
+os deltas precisam chegar a todos eles:
+- PostgreSQL: cada evento é publicado com pg_notify no canal OCUPACAO_CANAL e cada
+  worker com inscritos mantém uma conexão em LISTEN (thread _OuvinteNotificacoes),
+  que aplica o evento ao mapa local e o distribui. Se a conexão cai, os inscritos
+  recebem "resync" (podem ter perdido eventos)
+- MySQL/SQLite: não há canal entre processos; com mais de um worker o feed é
+  recusado (feed_disponivel) em vez de entregar só parte dos eventos
+
+Cada cliente recebe um snapshot ao conectar (e ao ressincronizar) e, depois, os
+deltas. O snapshot sai do mapa em memória: o banco (primário) só é consultado na
+primeira inscrição da sala no worker e depois de uma queda da conexão LISTEN, que
+invalida os mapas. Os deltas que chegam durante a carga são reaplicados sobre ela.
+"""
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from src.schemas.sessao import SessaoResponse
+
+
+OCUPACAO_CANAL = os.getenv("OCUPACAO_CANAL", "ocupacao_salas")
+
+logger = logging.getLogger(__name__)
+
+
+def _engine_primario():
+    from src.database.connection import engine
+    return engine
+
+
+class _OuvinteNotificacoes(threading.Thread):
+    """Conexão dedicada em LISTEN que repassa as notificações do PostgreSQL ao hub"""
+
+    INTERVALO_POLL = 5.0
+    ESPERA_RECONEXAO = 2.0
+
+    def __init__(self, hub: "OcupacaoHub", canal: str):
+        super().__init__(name="ocupacao-listen", daemon=True)
+        self.hub = hub
+        self.canal = canal
+        self.pronto = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            try:
+                self._escutar()
+            except Exception:
+                logger.exception("Conexão LISTEN do feed de ocupação perdida; reconectando")
+            # Eventos publicados durante a queda não chegaram: os inscritos ressincronizam
+            self.hub.ressincronizar_todos()
+            time.sleep(self.ESPERA_RECONEXAO)
+
+    def _escutar(self) -> None:
+        conexao = _engine_primario().raw_connection()
+        try:
+            driver = conexao.driver_connection
+            driver.autocommit = True
+            with driver.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.canal}"')
+            self.pronto.set()
+            if callable(driver.notifies):
+                # psycopg 3: gerador de notificações
+                while True:
+                    for notificacao in driver.notifies(timeout=self.INTERVALO_POLL):
+                        self.hub._aplicar(json.loads(notificacao.payload))
+            # psycopg2: poll() preenche a lista driver.notifies
+            while True:
+                if select.select([driver], [], [], self.INTERVALO_POLL) == ([], [], []):
+                    continue
+                driver.poll()
+                while driver.notifies:
+                    self.hub._aplicar(json.loads(driver.notifies.pop(0).payload))
+        finally:
+            # Conexão com LISTEN ativo não volta para o pool
+            conexao.invalidate()
+
+
+class _Assinante:
+    """Fila de eventos de um cliente conectado"""
+
+    def __init__(self, coworking_id: int, tamanho_fila: int):
+        self.coworking_id = coworking_id
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=tamanho_fila)
+        self.atrasado = False
+
+
+class OcupacaoHub:
+    def __init__(self, tamanho_fila: int = 100, canal: str = OCUPACAO_CANAL):
+        self._tamanho_fila = tamanho_fila
+        self._canal = canal
+        self._lock = threading.Lock()
+        self._mapas: Dict[int, Dict[int, dict]] = {}
+        # Salas cujo mapa foi carregado do banco e está em dia com os deltas
+        self._carregadas: Set[int] = set()
+        # Deltas recebidos durante a carga de cada sala (reaplicados sobre o snapshot)
+        self._pendentes_carga: Dict[int, List[dict]] = {}
+        self._locks_carga: Dict[int, threading.Lock] = {}
+        # Incrementada quando a conexão LISTEN cai: cargas em andamento ficam inválidas
+        self._geracao = 0
+        self._assinantes: Dict[int, Set[_Assinante]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers = 1
+        self._ouvinte: Optional[_OuvinteNotificacoes] = None
+
+    # ------------------------------------------------------------------
+    # Distribuição entre workers
+    # ------------------------------------------------------------------
+
+    def configurar_workers(self, workers: int) -> None:
+        """Informa quantos workers atendem a aplicação (chamado pelo src.servidor antes do fork)"""
+        self._workers = workers
+
+    @staticmethod
+    def usa_notificacoes() -> bool:
+        """Eventos trafegam pelo PostgreSQL (LISTEN/NOTIFY) em vez de só pela memória"""
+        return _engine_primario().dialect.name == "postgresql"
+
+    def feed_disponivel(self) -> bool:
+        """Com vários workers, o feed só é completo se os eventos cruzam os processos"""
+        return self._workers <= 1 or self.usa_notificacoes()
+
+    def _garantir_ouvinte(self) -> None:
+        if not self.usa_notificacoes():
+            return
+        with self._lock:
+            if self._ouvinte is not None and self._ouvinte.is_alive():
+                return
+            self._ouvinte = _OuvinteNotificacoes(self, self._canal)
+            self._ouvinte.start()
+        # O snapshot enviado ao cliente é carregado depois do LISTEN: nenhum delta se perde
+        self._ouvinte.pronto.wait(timeout=10)
+
+    def ressincronizar_todos(self) -> None:
+        """Invalida os mapas (podem ter perdido eventos) e pede um novo snapshot a todos os inscritos"""
+        with self._lock:
+            self._carregadas.clear()
+            self._geracao += 1
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        with self._lock:
+            salas = list(self._assinantes)
+        for coworking_id in salas:
+            try:
+                loop.call_soon_threadsafe(self._forcar_resync, coworking_id)
+            except RuntimeError:
+                return
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    def carregar_snapshot(self, db: Session, coworking_id: int) -> List[dict]:
+        """
+        Carrega do banco as sessões ativas da sala, se o mapa ainda não estiver carregado.
+
+        Use uma sessão do primário: um snapshot atrasado (réplica) apagaria inícios
+        já aplicados pelos deltas. Os deltas recebidos durante a consulta são
+        reaplicados sobre o resultado.
+        """
+        from src.services.sessao_service import SessaoService
+
+        with self._lock:
+            lock_carga = self._locks_carga.setdefault(coworking_id, threading.Lock())
+        with lock_carga:
+            with self._lock:
+                if coworking_id in self._carregadas:
+                    return list(self._mapas.get(coworking_id, {}).values())
+                self._pendentes_carga[coworking_id] = []
+                geracao = self._geracao
+            try:
+                sessoes = SessaoService(db).listar_sessoes_ativas_por_coworking(coworking_id)
+            except Exception:
+                with self._lock:
+                    del self._pendentes_carga[coworking_id]
+                raise
+            mapa = {s.computador_id: s.model_dump(mode="json") for s in sessoes}
+            with self._lock:
+                for evento in self._pendentes_carga.pop(coworking_id):
+                    self._aplicar_ao_mapa(mapa, evento)
+                self._mapas[coworking_id] = mapa
+                if geracao == self._geracao:
+                    self._carregadas.add(coworking_id)
+                return list(mapa.values())
+
+    def snapshot(self, coworking_id: int) -> Optional[List[dict]]:
+        """Sessões ativas da sala pelo mapa em memória (None se o mapa não estiver carregado)"""
+        with self._lock:
+            if coworking_id not in self._carregadas:
+                return None
+            return list(self._mapas.get(coworking_id, {}).values())
+
+    def registrar_inicio(self, sessao: SessaoResponse) -> None:
+        """Registra o início de uma sessão e notifica os inscritos da sala"""
+        if not sessao.sala_coworking:
+            return
+        coworking_id = sessao.sala_coworking.coworking_id
+        dados = sessao.model_dump(mode="json")
+        self._publicar({
+            "tipo": "inicio",
+            "coworking_id": coworking_id,
+            "computador_id": sessao.computador_id,
+            "sessao": dados,
+        })
+
+    def registrar_fim(self, sessao: SessaoResponse) -> None:
+        """Registra o fim (finalização/desativação) de uma sessão e notifica os inscritos"""
+        coworking_id = sessao.sala_coworking.coworking_id if sessao.sala_coworking else None
+        self.registrar_fim_por_computador(sessao.computador_id, sessao.sessao_id, coworking_id)
+
+    def registrar_fim_por_computador(self, computador_id: int, sessao_id: int, coworking_id: Optional[int] = None) -> None:
+        """
+        Registra o fim de uma sessão a partir do computador.
+
+        Se coworking_id não for informado, a sala é localizada pelo mapa em memória
+        de cada worker.
+        """
+        self._publicar({
+            "tipo": "fim",
+            "coworking_id": coworking_id,
+            "computador_id": computador_id,
+            "sessao_id": sessao_id,
+        })
+
+    @staticmethod
+    def _aplicar_ao_mapa(mapa: Dict[int, dict], evento: dict) -> None:
+        computador_id = evento["computador_id"]
+        if evento["tipo"] == "inicio":
+            mapa[computador_id] = evento["sessao"]
+        elif mapa.get(computador_id, {}).get("sessao_id") == evento["sessao_id"]:
+            del mapa[computador_id]
+
+    def _aplicar(self, evento: dict) -> None:
+        """Atualiza o mapa local com o evento e o distribui aos inscritos deste worker"""
+        computador_id = evento["computador_id"]
+        with self._lock:
+            if evento["tipo"] == "fim" and evento["coworking_id"] is None:
+                # Sala não informada (operações em lote): pode estar em uma carga em andamento
+                for pendentes in self._pendentes_carga.values():
+                    pendentes.append(evento)
+                evento["coworking_id"] = next(
+                    (cid for cid, mapa in self._mapas.items()
+                     if mapa.get(computador_id, {}).get("sessao_id") == evento["sessao_id"]),
+                    None
+                )
+                if evento["coworking_id"] is None:
+                    return
+            elif evento["coworking_id"] in self._pendentes_carga:
+                self._pendentes_carga[evento["coworking_id"]].append(evento)
+            self._aplicar_ao_mapa(self._mapas.setdefault(evento["coworking_id"], {}), evento)
+        self._enfileirar(evento["coworking_id"], evento)
+
+    # ------------------------------------------------------------------
+    # Inscrições e fan-out
+    # ------------------------------------------------------------------
+
+    def inscrever(self, coworking_id: int) -> _Assinante:
+        """Inscreve um cliente na sala (deve ser chamado dentro do event loop)"""
+        self._loop = asyncio.get_running_loop()
+        assinante = _Assinante(coworking_id, self._tamanho_fila)
+        with self._lock:
+            self._assinantes.setdefault(coworking_id, set()).add(assinante)
+        return assinante
+
+    async def inscrever_async(self, coworking_id: int) -> _Assinante:
+        """Inscreve o cliente e, com PostgreSQL, garante o LISTEN deste worker (fora do event loop)"""
+        from starlette.concurrency import run_in_threadpool
+
+        assinante = self.inscrever(coworking_id)
+        await run_in_threadpool(self._garantir_ouvinte)
+        return assinante
+
+    def cancelar(self, assinante: _Assinante) -> None:
+        with self._lock:
+            inscritos = self._assinantes.get(assinante.coworking_id)
+            if inscritos:
+                inscritos.discard(assinante)
+                if not inscritos:
+                    del self._assinantes[assinante.coworking_id]
+
+    def total_assinantes(self, coworking_id: Optional[int] = None) -> int:
+        with self._lock:
+            if coworking_id is not None:
+                return len(self._assinantes.get(coworking_id, ()))
+            return sum(len(a) for a in self._assinantes.values())
+
+    def _publicar(self, evento: dict) -> None:
+        """
+        Publica um evento para os inscritos da sala em todos os workers.
+
+        Pode ser chamado de qualquer thread (os services rodam no threadpool do
+        FastAPI). Com PostgreSQL o evento vai por pg_notify e volta, inclusive para
+        este worker, pelo _OuvinteNotificacoes; sem ele, é aplicado direto.
+        """
+        if not self.usa_notificacoes():
+            self._aplicar(evento)
+            return
+        try:
+            with _engine_primario().connect() as conexao:
+                conexao.execute(
+                    text("SELECT pg_notify(:canal, :mensagem)"),
+                    {"canal": self._canal, "mensagem": json.dumps(evento, ensure_ascii=False)}
+                )
+                conexao.commit()
+        except Exception:
+            # O feed é auxiliar: falhar aqui não pode desfazer a sessão já gravada
+            logger.exception("Falha ao publicar evento de ocupação")
+
+    def _enfileirar(self, coworking_id: int, evento: dict) -> None:
+        """Serializa o evento uma única vez e o distribui no event loop"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.total_assinantes(coworking_id):
+            return
+        mensagem = json.dumps(evento, ensure_ascii=False)
+        try:
+            loop.call_soon_threadsafe(self._distribuir, coworking_id, mensagem)
+        except RuntimeError:
+            # Event loop encerrado (shutdown)
+            pass
+
+    def _forcar_resync(self, coworking_id: int) -> None:
+        with self._lock:
+            inscritos = list(self._assinantes.get(coworking_id, ()))
+        for assinante in inscritos:
+            self._marcar_atrasado(assinante)
+
+    def _marcar_atrasado(self, assinante: _Assinante) -> None:
+        """Descarta os deltas pendentes do cliente e pede um novo snapshot"""
+        if assinante.atrasado:
+            return
+        assinante.atrasado = True
+        while not assinante.fila.empty():
+            assinante.fila.get_nowait()
+        assinante.fila.put_nowait(json.dumps({"tipo": "resync", "coworking_id": assinante.coworking_id}))
+
+    def _distribuir(self, coworking_id: int, mensagem: str) -> None:
+        with self._lock:
+            inscritos = list(self._assinantes.get(coworking_id, ()))
+        for assinante in inscritos:
+            if assinante.atrasado:
+                continue
+            try:
+                assinante.fila.put_nowait(mensagem)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta os deltas pendentes e pede um novo snapshot
+                self._marcar_atrasado(assinante)
+
+
+# Instância única por processo
+ocupacao_hub = OcupacaoHub()
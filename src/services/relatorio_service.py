@@ -1,25 +1,45 @@
 import os
+import time
+from types import SimpleNamespace
 from typing import Dict
 from datetime import datetime
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from google import genai
 
 from src.repositories.dashboard_repository import DashboardRepository
-from src.repositories.subsecional_repository import SubsecionalRepository
-from src.repositories.unidade_repository import UnidadeRepository
-from src.repositories.sala_coworking_repository import SalaCoworkingRepository
+from src.services.hierarquia_service import hierarquia_index
 from src.schemas.relatorio import RelatorioRequest, RelatorioResponse
 from src.schemas.dashboard import DashboardFiltros
 
 
+# LLM simulado (testes de carga/desenvolvimento): não chama a API Gemini nem exige
+# GEMINI_API_KEY; responde um Markdown fixo após RELATORIO_LLM_SIMULADO_LATENCIA segundos
+RELATORIO_LLM_SIMULADO = os.getenv("RELATORIO_LLM_SIMULADO", "false").lower() in ("1", "true", "sim")
+RELATORIO_LLM_SIMULADO_LATENCIA = float(os.getenv("RELATORIO_LLM_SIMULADO_LATENCIA", "1.5"))
+
+
+class ClienteLLMSimulado:
+    """Substituto de genai.Client com a mesma interface usada aqui (models.generate_content)"""
+
+    def __init__(self, latencia: float = RELATORIO_LLM_SIMULADO_LATENCIA):
+        self.latencia = latencia
+        self.models = self
+
+    def generate_content(self, model: str, contents: str):
+        time.sleep(self.latencia)
+        return SimpleNamespace(
+            text=f"# Relatório (LLM simulado)\n\nModelo: {model}\n\nPrompt com {len(contents)} caracteres."
+        )
+
+
 class RelatorioService:
     def __init__(self, db: Session):
         self.db = db
         self.dashboard_repo = DashboardRepository(db)
-        self.subsecional_repo = SubsecionalRepository(db)
-        self.unidade_repo = UnidadeRepository(db)
-        self.sala_repo = SalaCoworkingRepository(db)
+        
+        if RELATORIO_LLM_SIMULADO:
+            self.client = ClienteLLMSimulado()
+            return
         
         # Configurar Gemini API (nova sintaxe oficial)
         api_key = os.getenv("GEMINI_API_KEY")
@@ -28,13 +48,15 @@ class RelatorioService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="GEMINI_API_KEY não configurada no arquivo .env"
             )
-        # Usar o novo cliente da API Gemini
+        # Usar o novo cliente da API Gemini.
+        # Import tardio: o SDK é pesado e só é necessário quando um relatório é gerado
+        from google import genai
         self.client = genai.Client(api_key=api_key)
 
     def _validar_e_obter_dados(self, request: RelatorioRequest) -> Dict:
         """Valida e obtém os dados necessários para o relatório"""
         # Validar subseccional
-        subsecional = self.subsecional_repo.get_by_id(request.subsecional_id)
+        subsecional = hierarquia_index.obter_subsecional(self.db, request.subsecional_id)
         if not subsecional:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -42,7 +64,7 @@ class RelatorioService:
             )
         
         # Validar unidade
-        unidade = self.unidade_repo.get_by_id(request.unidade_id)
+        unidade = hierarquia_index.obter_unidade(self.db, request.unidade_id)
         if not unidade:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -56,7 +78,7 @@ class RelatorioService:
             )
         
         # Validar sala coworking
-        sala = self.sala_repo.get_by_id(request.coworking_id)
+        sala = hierarquia_index.obter_sala(self.db, request.coworking_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -6,10 +6,13 @@ from src.repositories.subsecional_repository import SubsecionalRepository
 from src.repositories.unidade_repository import UnidadeRepository
 from src.repositories.administrador_sala_repository import AdministradorSalaRepository
 from src.schemas.sala_coworking import SalaCoworkingCreate, SalaCoworkingUpdate, SalaCoworkingResponse
+from src.schemas.comum import LoteResponse
+from src.services.hierarquia_service import hierarquia_index
 
 
 class SalaCoworkingService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = SalaCoworkingRepository(db)
         self.subsecional_repo = SubsecionalRepository(db)
         self.unidade_repo = UnidadeRepository(db)
@@ -17,14 +20,14 @@ class SalaCoworkingService:
 
     def criar_sala(self, sala: SalaCoworkingCreate) -> SalaCoworkingResponse:
         # Validar subsecional
-        if not self.subsecional_repo.get_by_id(sala.subsecional_id):
+        if not hierarquia_index.obter_subsecional(self.db, sala.subsecional_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Subsecional não encontrada"
             )
         
         # Validar unidade
-        if not self.unidade_repo.get_by_id(sala.unidade_id):
+        if not hierarquia_index.obter_unidade(self.db, sala.unidade_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Unidade não encontrada"
@@ -38,6 +41,7 @@ class SalaCoworkingService:
             )
         
         sala_dict = sala.model_dump()
+        hierarquia_index.agendar_invalidacao(self.db)
         db_sala = self.repository.create(sala_dict)
         return SalaCoworkingResponse.model_validate(db_sala)
 
@@ -50,6 +54,14 @@ class SalaCoworkingService:
             )
         return SalaCoworkingResponse.model_validate(db_sala)
 
+    def obter_salas(self, ids: List[int]) -> LoteResponse[SalaCoworkingResponse]:
+        """Busca várias salas de coworking em uma única consulta, na ordem de `ids`"""
+        lote = self.repository.get_many(ids)
+        return LoteResponse[SalaCoworkingResponse](
+            itens=[SalaCoworkingResponse.model_validate(s) for s in lote.encontrados],
+            ids_nao_encontrados=lote.ids_nao_encontrados
+        )
+
     def listar_salas(self, skip: int = 0, limit: int = 100) -> List[SalaCoworkingResponse]:
         salas = self.repository.get_all(skip=skip, limit=limit)
         return [SalaCoworkingResponse.model_validate(s) for s in salas]
@@ -96,6 +108,7 @@ class SalaCoworkingService:
             )
         
         update_dict = sala.model_dump(exclude_unset=True)
+        hierarquia_index.agendar_invalidacao(self.db)
         updated_sala = self.repository.update(db_sala, update_dict)
         return SalaCoworkingResponse.model_validate(updated_sala)
 
@@ -106,5 +119,7 @@ class SalaCoworkingService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sala de coworking não encontrada"
             )
-        return self.repository.delete(db_sala)
+        hierarquia_index.agendar_invalidacao(self.db)
+        deletada = self.repository.delete(db_sala)
+        return deletada
 
@@ -1,38 +1,88 @@
-from typing import Optional, List
-from datetime import date, datetime
+import os
+from typing import Callable, Iterator, NamedTuple, Optional, List
+from datetime import date, datetime, timedelta
+from functools import partial
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from src.database.connection import registrar_escrita
 from src.repositories.sessao_repository import SessaoRepository
 from src.repositories.computador_repository import ComputadorRepository
 from src.repositories.usuario_advogado_repository import UsuarioAdvogadoRepository
 from src.repositories.administrador_sala_repository import AdministradorSalaRepository
-from src.schemas.sessao import SessaoCreate, SessaoUpdate, SessaoResponse
-from src.schemas.filtro_sessao import FiltroSessao
+from src.repositories.versao_repository import VersaoRepository
+from src.schemas.sessao import SessaoCreate, SessaoUpdate, SessaoResponse, SessaoLoteRequest, SessaoLoteResponse, SessaoLoteItem
+from src.schemas.filtro_sessao import FiltroSessao, ModoContagem
+from src.services.ocupacao_service import ocupacao_hub
+from src.services.hierarquia_service import hierarquia_index, CHAVE_VERSAO_HIERARQUIA
+from src.utils.etag import gerar_etag
+from src.utils.serializacao import Tabela
+
+
+# Tamanho de página padrão e máximo das listagens paginadas por cursor
+SESSOES_PAGINA_PADRAO = int(os.getenv("SESSOES_PAGINA_PADRAO", "100"))
+SESSOES_PAGINA_MAXIMA = int(os.getenv("SESSOES_PAGINA_MAXIMA", "1000"))
+
+# Colunas planas de SessaoRepository._query_projetada (exportação CSV e listagens em MessagePack)
+COLUNAS_EXPORTACAO = [
+    "sessao_id", "data", "inicio_de_sessao", "final_de_sessao", "ativado",
+    "computador_id", "usuario_id", "administrador_id",
+    "coworking_id", "nome_da_sala", "unidade_id", "unidade_nome",
+    "subsecional_id", "subsecional_nome",
+]
+
+# Chaves de versão (Versao_cache) usadas nas ETags: uma por unidade, para que
+# escritas em unidades diferentes não disputem a mesma linha
+PREFIXO_VERSAO_SESSOES = "sessoes:unidade:"
+
+
+def chave_versao_sessoes_unidade(unidade_id: Optional[int]) -> str:
+    """Chave de versão das sessões da unidade (None: sessões sem sala ou sala sem unidade)"""
+    return f"{PREFIXO_VERSAO_SESSOES}{unidade_id if unidade_id is not None else 'nenhuma'}"
+
+
+def agendar_versoes_sessoes(db: Session, coworking_ids) -> None:
+    """
+    Agenda o incremento das versões de sessões das unidades das salas informadas
+    para o commit da transação corrente de `db` (o mesmo da escrita).
+    """
+    unidades = set()
+    for coworking_id in set(coworking_ids):
+        sala = hierarquia_index.obter_sala(db, coworking_id) if coworking_id is not None else None
+        unidades.add(sala.unidade_id if sala is not None else None)
+    VersaoRepository(db).agendar_incremento(*(chave_versao_sessoes_unidade(u) for u in unidades))
+
+
+class PaginaSessoes(NamedTuple):
+    sessoes: Tabela
+    proximo_cursor: Optional[int]
+
+
+class ListagemSessoes(NamedTuple):
+    sessoes: Tabela
+    tem_mais: bool
+    total: Optional[int] = None
+    total_estimado: Optional[int] = None
 
 
 class SessaoService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = SessaoRepository(db)
         self.computador_repo = ComputadorRepository(db)
         self.usuario_repo = UsuarioAdvogadoRepository(db)
         self.admin_repo = AdministradorSalaRepository(db)
+        self.versao_repo = VersaoRepository(db)
 
     def criar_sessao(self, sessao: SessaoCreate) -> SessaoResponse:
         # Validar computador
-        if not self.computador_repo.get_by_id(sessao.computador_id):
+        computador = self.computador_repo.get_by_id(sessao.computador_id)
+        if not computador:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Computador não encontrado"
             )
         
-        # Verificar se computador já está em uso
-        sessao_existente = self.repository.get_by_computador(sessao.computador_id)
-        if sessao_existente and sessao_existente.ativado:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Computador já está em uso"
-            )
-        
         # Validar usuário
         if not self.usuario_repo.get_by_id(sessao.usuario_id):
             raise HTTPException(
@@ -47,11 +97,27 @@ class SessaoService:
                 detail="Administrador não encontrado"
             )
         
+        # Verificar se computador já está em uso (com lock no computador até o commit)
+        if self.repository.get_ativa_by_computador(sessao.computador_id, bloquear=True):
+            raise self._computador_em_uso()
+        
         sessao_dict = sessao.model_dump(exclude={"analista_ids"})
-        db_sessao = self.repository.create(sessao_dict, analista_ids=sessao.analista_ids)
+        self.agendar_versoes([computador.coworking_id])
+        try:
+            db_sessao = self.repository.create(sessao_dict, analista_ids=sessao.analista_ids)
+        except IntegrityError:
+            # Outra requisição iniciou uma sessão no mesmo computador (índice único parcial)
+            self.repository.db.rollback()
+            if self.repository.get_ativa_by_computador(sessao.computador_id):
+                raise self._computador_em_uso()
+            raise
         # Recarregar a sessão com as relações
         db_sessao = self.repository.get_by_id(db_sessao.sessao_id)
-        return self._sessao_to_response(db_sessao)
+        resposta = self._sessao_to_response(db_sessao)
+        registrar_escrita()
+        if resposta.ativado and not resposta.final_de_sessao:
+            ocupacao_hub.registrar_inicio(resposta)
+        return resposta
 
     def obter_sessao(self, sessao_id: int) -> SessaoResponse:
         db_sessao = self.repository.get_by_id(sessao_id)
@@ -62,8 +128,43 @@ class SessaoService:
             )
         return self._sessao_to_response(db_sessao)
 
+    @staticmethod
+    def _computador_em_uso() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Computador já está em uso"
+        )
+
+    @staticmethod
+    def _coworking_id(resposta: SessaoResponse) -> Optional[int]:
+        return resposta.sala_coworking.coworking_id if resposta.sala_coworking else None
+
+    @staticmethod
+    def _coworking_da_sessao(db_sessao) -> Optional[int]:
+        return db_sessao.computador.coworking_id if db_sessao.computador else None
+
+    def agendar_versoes(self, coworking_ids) -> None:
+        """Incrementa as versões (ETags) das unidades no commit da escrita, na mesma transação"""
+        agendar_versoes_sessoes(self.db, coworking_ids)
+
+    def notificar_alteracao(self, coworking_ids) -> None:
+        """Para escritas de sessões já confirmadas fora do serviço (gerador, seed): versões e caches"""
+        self.agendar_versoes(coworking_ids)
+        self.db.commit()
+        registrar_escrita()
+
+    def obter_etag(self, escopo: str) -> str:
+        """ETag das listagens de sessões: muda a cada escrita de sessão (de qualquer unidade) ou da hierarquia"""
+        versoes = self.versao_repo.obter_por_prefixo(PREFIXO_VERSAO_SESSOES)
+        hierarquia = self.versao_repo.obter(CHAVE_VERSAO_HIERARQUIA)
+        return gerar_etag("sessoes", escopo, hierarquia, *sorted(versoes.items()))
+
     def _sessao_to_response(self, sessao) -> SessaoResponse:
         """Converte uma sessão em SessaoResponse com informações relacionadas."""
+        return SessaoResponse.model_validate(self._sessao_to_dict(sessao))
+
+    def _sessao_to_dict(self, sessao) -> dict:
+        """Converte uma sessão no dicionário de SessaoResponse (sem validação, para listagens)"""
         response_dict = {
             "sessao_id": sessao.sessao_id,
             "data": sessao.data,
@@ -106,25 +207,114 @@ class SessaoService:
                     "nome": sala.subsecional.nome
                 }
         
-        return SessaoResponse.model_validate(response_dict)
+        return response_dict
 
-    def listar_sessoes(self, filtros: FiltroSessao) -> List[SessaoResponse]:
-        """Lista sessões com filtros robustos"""
-        sessoes = self.repository.filtrar_sessoes(filtros)
-        return [self._sessao_to_response(s) for s in sessoes]
+    @staticmethod
+    def _linha_to_dict(linha: dict) -> dict:
+        """Converte uma linha projetada do repositório no dicionário de SessaoResponse"""
+        return {
+            "sessao_id": linha["sessao_id"],
+            "data": linha["data"],
+            "inicio_de_sessao": linha["inicio_de_sessao"],
+            "final_de_sessao": linha["final_de_sessao"],
+            "ativado": linha["ativado"],
+            "computador_id": linha["computador_id"],
+            "usuario_id": linha["usuario_id"],
+            "administrador_id": linha["administrador_id"],
+            "sala_coworking": {
+                "coworking_id": linha["coworking_id"],
+                "nome_da_sala": linha["nome_da_sala"]
+            } if linha["coworking_id"] is not None else None,
+            "unidade": {
+                "unidade_id": linha["unidade_id"],
+                "nome": linha["unidade_nome"]
+            } if linha["unidade_id"] is not None else None,
+            "subsecional": {
+                "subsecional_id": linha["subsecional_id"],
+                "nome": linha["subsecional_nome"]
+            } if linha["subsecional_id"] is not None else None
+        }
 
-    def listar_sessoes_ativas(self) -> List[SessaoResponse]:
-        sessoes = self.repository.get_ativas()
-        return [self._sessao_to_response(s) for s in sessoes]
+    @classmethod
+    def _tabela(cls, linhas: List[dict]) -> Tabela:
+        """Linhas projetadas da página: _linha_to_dict em JSON, colunas planas em MessagePack"""
+        return Tabela(linhas, COLUNAS_EXPORTACAO, cls._linha_to_dict)
 
-    def listar_sessoes_por_usuario(self, usuario_id: int) -> List[SessaoResponse]:
-        sessoes = self.repository.get_by_usuario(usuario_id)
-        return [self._sessao_to_response(s) for s in sessoes]
+    def listar_sessoes(self, filtros: FiltroSessao, contagem: ModoContagem = ModoContagem.NENHUM) -> ListagemSessoes:
+        """Lista sessões com filtros robustos
+        
+        Busca limit+1 linhas para saber se há próxima página. O total depende de `contagem`:
+        - nenhum: não é calculado
+        - exato: COUNT(*) OVER() na própria consulta da página
+        - estimado: estimativa do planejador (sem percorrer as linhas)
+        """
+        consulta = filtros.model_copy(update={"limit": filtros.limit + 1})
+        linhas = self.repository.filtrar_sessoes(consulta, com_total=contagem == ModoContagem.EXATO)
+        tem_mais = len(linhas) > filtros.limit
+        linhas = linhas[:filtros.limit]
+        
+        total = total_estimado = None
+        if contagem == ModoContagem.EXATO:
+            if linhas:
+                total = linhas[0]["total"]
+            else:
+                # Página vazia: a janela não trouxe o total (skip além do fim)
+                total = self.repository.contar_sessoes_filtradas(filtros) if filtros.skip else 0
+        elif contagem == ModoContagem.ESTIMADO:
+            total_estimado = self.repository.estimar_sessoes_filtradas(filtros)
+        
+        return ListagemSessoes(self._tabela(linhas), tem_mais, total, total_estimado)
+
+    def _paginar(self, consulta: Callable[..., List[dict]], cursor: Optional[int], limite: int) -> PaginaSessoes:
+        """Busca limite+1 linhas para saber se há próxima página sem COUNT"""
+        limite = min(limite, SESSOES_PAGINA_MAXIMA)
+        linhas = consulta(cursor=cursor, limite=limite + 1)
+        proximo_cursor = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo_cursor = linhas[-1]["sessao_id"]
+        return PaginaSessoes(self._tabela(linhas), proximo_cursor)
+
+    def _iterar(self, consulta: Callable[..., List[dict]], cursor: Optional[int] = None) -> Iterator[dict]:
+        """Percorre todas as páginas (modo streaming), mantendo em memória uma página por vez"""
+        while True:
+            linhas = consulta(cursor=cursor, limite=SESSOES_PAGINA_MAXIMA)
+            for linha in linhas:
+                yield self._linha_to_dict(linha)
+            if len(linhas) < SESSOES_PAGINA_MAXIMA:
+                return
+            cursor = linhas[-1]["sessao_id"]
+
+    def exportar_sessoes(self, filtros: FiltroSessao) -> Iterator[dict]:
+        """Todas as sessões dos filtros (skip/limit ignorados), em linhas planas, via cursor no servidor"""
+        return self.repository.iterar_sessoes_filtradas(filtros)
+
+    def listar_sessoes_ativas(self, cursor: Optional[int] = None, limite: int = SESSOES_PAGINA_PADRAO) -> PaginaSessoes:
+        return self._paginar(self.repository.get_ativas, cursor, limite)
+
+    def iterar_sessoes_ativas(self, cursor: Optional[int] = None) -> Iterator[dict]:
+        return self._iterar(self.repository.get_ativas, cursor)
 
-    def listar_sessoes_por_data(self, data: date) -> List[SessaoResponse]:
-        sessoes = self.repository.get_por_data(data)
+    def listar_sessoes_ativas_por_coworking(self, coworking_id: int) -> List[SessaoResponse]:
+        sessoes = self.repository.get_ativas_por_coworking(coworking_id)
         return [self._sessao_to_response(s) for s in sessoes]
 
+    def listar_sessoes_por_usuario(
+        self, usuario_id: int, cursor: Optional[int] = None, limite: int = SESSOES_PAGINA_PADRAO
+    ) -> PaginaSessoes:
+        return self._paginar(partial(self.repository.get_by_usuario, usuario_id), cursor, limite)
+
+    def iterar_sessoes_por_usuario(self, usuario_id: int, cursor: Optional[int] = None) -> Iterator[dict]:
+        return self._iterar(partial(self.repository.get_by_usuario, usuario_id), cursor)
+
+    def listar_sessoes_por_data(
+        self, data: date, cursor: Optional[int] = None, limite: int = SESSOES_PAGINA_PADRAO
+    ) -> PaginaSessoes:
+        return self._paginar(partial(self.repository.get_por_data, data), cursor, limite)
+
+    def iterar_sessoes_por_data(self, data: date, cursor: Optional[int] = None) -> Iterator[dict]:
+        return self._iterar(partial(self.repository.get_por_data, data), cursor)
+
     def atualizar_sessao(self, sessao_id: int, sessao: SessaoUpdate) -> SessaoResponse:
         db_sessao = self.repository.get_by_id(sessao_id)
         if not db_sessao:
@@ -133,30 +323,56 @@ class SessaoService:
                 detail="Sessão não encontrada"
             )
         
+        coworking_ids = [self._coworking_da_sessao(db_sessao)]
+        computador_id = db_sessao.computador_id
         # Validar computador se fornecido
         if sessao.computador_id and sessao.computador_id != db_sessao.computador_id:
-            if not self.computador_repo.get_by_id(sessao.computador_id):
+            novo_computador = self.computador_repo.get_by_id(sessao.computador_id)
+            if not novo_computador:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Computador não encontrado"
                 )
-            # Verificar se novo computador já está em uso
-            sessao_existente = self.repository.get_by_computador(sessao.computador_id)
-            if sessao_existente and sessao_existente.ativado and sessao_existente.sessao_id != sessao_id:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Computador já está em uso"
-                )
+            computador_id = sessao.computador_id
+            coworking_ids.append(novo_computador.coworking_id)
         
         update_dict = sessao.model_dump(exclude_unset=True, exclude={"analista_ids"})
-        updated_sessao = self.repository.update(
-            db_sessao, 
-            update_dict, 
-            analista_ids=sessao.analista_ids
+        
+        # Se a sessão ficar aberta em outro computador, ou for reaberta (ativado=True e
+        # sem final), o computador de destino não pode ter outra sessão ativa
+        estava_ativa = db_sessao.ativado and db_sessao.final_de_sessao is None
+        ficara_ativa = (
+            update_dict.get("ativado", db_sessao.ativado)
+            and update_dict.get("final_de_sessao", db_sessao.final_de_sessao) is None
         )
+        if ficara_ativa and (computador_id != db_sessao.computador_id or not estava_ativa):
+            sessao_existente = self.repository.get_ativa_by_computador(computador_id, bloquear=True)
+            if sessao_existente and sessao_existente.sessao_id != sessao_id:
+                raise self._computador_em_uso()
+        
+        anterior = self._sessao_to_response(db_sessao)
+        self.agendar_versoes(coworking_ids)
+        try:
+            updated_sessao = self.repository.update(
+                db_sessao, 
+                update_dict, 
+                analista_ids=sessao.analista_ids
+            )
+        except IntegrityError:
+            # Outra requisição abriu uma sessão no computador (índice único parcial)
+            self.repository.db.rollback()
+            if self.repository.get_ativa_by_computador(computador_id):
+                raise self._computador_em_uso()
+            raise
         # Recarregar a sessão com as relações
         updated_sessao = self.repository.get_by_id(updated_sessao.sessao_id)
-        return self._sessao_to_response(updated_sessao)
+        resposta = self._sessao_to_response(updated_sessao)
+        registrar_escrita()
+        if anterior.ativado and not anterior.final_de_sessao:
+            ocupacao_hub.registrar_fim(anterior)
+        if resposta.ativado and not resposta.final_de_sessao:
+            ocupacao_hub.registrar_inicio(resposta)
+        return resposta
 
     def finalizar_sessao(self, sessao_id: int) -> SessaoResponse:
         db_sessao = self.repository.get_by_id(sessao_id)
@@ -172,10 +388,14 @@ class SessaoService:
                 detail="Sessão já foi finalizada"
             )
         
+        self.agendar_versoes([self._coworking_da_sessao(db_sessao)])
         finalizada = self.repository.finalizar_sessao(db_sessao, datetime.now())
         # Recarregar a sessão com as relações
         finalizada = self.repository.get_by_id(finalizada.sessao_id)
-        return self._sessao_to_response(finalizada)
+        resposta = self._sessao_to_response(finalizada)
+        registrar_escrita()
+        ocupacao_hub.registrar_fim(resposta)
+        return resposta
 
     def desativar_sessao(self, sessao_id: int) -> SessaoResponse:
         db_sessao = self.repository.get_by_id(sessao_id)
@@ -191,10 +411,71 @@ class SessaoService:
                 detail="Sessão já está desativada"
             )
         
+        self.agendar_versoes([self._coworking_da_sessao(db_sessao)])
         desativada = self.repository.desativar_sessao(db_sessao)
         # Recarregar a sessão com as relações
         desativada = self.repository.get_by_id(desativada.sessao_id)
-        return self._sessao_to_response(desativada)
+        resposta = self._sessao_to_response(desativada)
+        registrar_escrita()
+        ocupacao_hub.registrar_fim(resposta)
+        return resposta
+
+    def _validar_lote(self, lote: SessaoLoteRequest) -> None:
+        if (lote.coworking_id is None) == (lote.sessao_ids is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe coworking_id ou sessao_ids (apenas um dos dois)"
+            )
+
+    def _agendar_versoes_lote(self, lote: SessaoLoteRequest) -> None:
+        """Agenda, antes do UPDATE, as versões das salas que o lote pode alterar"""
+        if lote.coworking_id is not None:
+            coworking_ids = [lote.coworking_id]
+        else:
+            coworking_ids = self.repository.get_coworking_ids(sessao_ids=lote.sessao_ids)
+        self.agendar_versoes(coworking_ids)
+
+    def _lote_to_response(self, linhas: List[dict], coworking_id: Optional[int]) -> SessaoLoteResponse:
+        registrar_escrita()
+        for linha in linhas:
+            ocupacao_hub.registrar_fim_por_computador(linha["computador_id"], linha["sessao_id"], coworking_id)
+        return SessaoLoteResponse(
+            total=len(linhas),
+            sessoes=[SessaoLoteItem.model_validate(linha) for linha in linhas]
+        )
+
+    def finalizar_sessoes_em_lote(self, lote: SessaoLoteRequest) -> SessaoLoteResponse:
+        """Finaliza todas as sessões abertas de uma sala ou de uma lista de IDs"""
+        self._validar_lote(lote)
+        self._agendar_versoes_lote(lote)
+        linhas = self.repository.finalizar_em_lote(
+            datetime.now(),
+            sessao_ids=lote.sessao_ids,
+            coworking_id=lote.coworking_id
+        )
+        return self._lote_to_response(linhas, lote.coworking_id)
+
+    def desativar_sessoes_em_lote(self, lote: SessaoLoteRequest) -> SessaoLoteResponse:
+        """Desativa todas as sessões ativadas de uma sala ou de uma lista de IDs"""
+        self._validar_lote(lote)
+        self._agendar_versoes_lote(lote)
+        linhas = self.repository.desativar_em_lote(
+            sessao_ids=lote.sessao_ids,
+            coworking_id=lote.coworking_id
+        )
+        return self._lote_to_response(linhas, lote.coworking_id)
+
+    def expirar_sessoes(self, sessoes: List[tuple], duracao_maxima: timedelta) -> SessaoLoteResponse:
+        """Finaliza sessões esquecidas abertas, dadas como (sessao_id, inicio_de_sessao)
+        
+        O final registrado é inicio + duracao_maxima (nunca depois de agora), e não o
+        momento da expiração: a sessão não conta como ocupação depois do limite.
+        """
+        agora = datetime.now()
+        finais = {sessao_id: min(agora, inicio + duracao_maxima) for sessao_id, inicio in sessoes}
+        self._agendar_versoes_lote(SessaoLoteRequest(sessao_ids=list(finais)))
+        linhas = self.repository.finalizar_em_lote_com_horarios(finais)
+        return self._lote_to_response(linhas, None)
 
     def deletar_sessao(self, sessao_id: int) -> bool:
         db_sessao = self.repository.get_by_id(sessao_id)
@@ -203,5 +484,11 @@ class SessaoService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sessão não encontrada"
             )
-        return self.repository.delete(db_sessao)
+        resposta = self._sessao_to_response(db_sessao)
+        self.agendar_versoes([self._coworking_id(resposta)])
+        deletada = self.repository.delete(db_sessao)
+        registrar_escrita()
+        if resposta.ativado and not resposta.final_de_sessao:
+            ocupacao_hub.registrar_fim(resposta)
+        return deletada
 
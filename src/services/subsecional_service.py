@@ -3,10 +3,12 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from src.repositories.subsecional_repository import SubsecionalRepository
 from src.schemas.subsecional import SubsecionalCreate, SubsecionalUpdate, SubsecionalResponse
+from src.services.hierarquia_service import hierarquia_index
 
 
 class SubsecionalService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = SubsecionalRepository(db)
 
     def criar_subsecional(self, subsecional: SubsecionalCreate) -> SubsecionalResponse:
@@ -18,6 +20,7 @@ class SubsecionalService:
             )
         
         subsecional_dict = subsecional.model_dump()
+        hierarquia_index.agendar_invalidacao(self.db)
         db_subsecional = self.repository.create(subsecional_dict)
         return SubsecionalResponse.model_validate(db_subsecional)
 
@@ -51,6 +54,7 @@ class SubsecionalService:
                 )
         
         update_dict = subsecional.model_dump(exclude_unset=True)
+        hierarquia_index.agendar_invalidacao(self.db)
         updated_subsecional = self.repository.update(db_subsecional, update_dict)
         return SubsecionalResponse.model_validate(updated_subsecional)
 
@@ -61,5 +65,7 @@ class SubsecionalService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Subsecional não encontrada"
             )
-        return self.repository.delete(db_subsecional)
+        hierarquia_index.agendar_invalidacao(self.db)
+        deletada = self.repository.delete(db_subsecional)
+        return deletada
 
@@ -4,10 +4,12 @@ from fastapi import HTTPException, status
 from src.repositories.unidade_repository import UnidadeRepository
 from src.repositories.subsecional_repository import SubsecionalRepository
 from src.schemas.unidade import UnidadeCreate, UnidadeUpdate, UnidadeResponse
+from src.services.hierarquia_service import hierarquia_index
 
 
 class UnidadeService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = UnidadeRepository(db)
         self.subsecional_repo = SubsecionalRepository(db)
 
@@ -20,6 +22,7 @@ class UnidadeService:
             )
         
         unidade_dict = unidade.model_dump()
+        hierarquia_index.agendar_invalidacao(self.db)
         db_unidade = self.repository.create(unidade_dict)
         return UnidadeResponse.model_validate(db_unidade)
 
@@ -56,6 +59,7 @@ class UnidadeService:
             )
         
         update_dict = unidade.model_dump(exclude_unset=True)
+        hierarquia_index.agendar_invalidacao(self.db)
         updated_unidade = self.repository.update(db_unidade, update_dict)
         return UnidadeResponse.model_validate(updated_unidade)
 
@@ -66,5 +70,7 @@ class UnidadeService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Unidade não encontrada"
             )
-        return self.repository.delete(db_unidade)
+        hierarquia_index.agendar_invalidacao(self.db)
+        deletada = self.repository.delete(db_unidade)
+        return deletada
 
@@ -3,11 +3,15 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from src.repositories.usuario_advogado_repository import UsuarioAdvogadoRepository
 from src.repositories.cadastro_repository import CadastroRepository
+from src.repositories.sessao_repository import SessaoRepository
 from src.schemas.usuario_advogado import UsuarioAdvogadoCreate, UsuarioAdvogadoUpdate, UsuarioAdvogadoResponse
+from src.schemas.comum import LoteResponse
+from src.services.sessao_service import agendar_versoes_sessoes
 
 
 class UsuarioAdvogadoService:
     def __init__(self, db: Session):
+        self.db = db
         self.repository = UsuarioAdvogadoRepository(db)
         self.cadastro_repo = CadastroRepository(db)
 
@@ -39,6 +43,14 @@ class UsuarioAdvogadoService:
             )
         return UsuarioAdvogadoResponse.model_validate(db_usuario)
 
+    def obter_usuarios(self, ids: List[int]) -> LoteResponse[UsuarioAdvogadoResponse]:
+        """Busca vários usuários advogados em uma única consulta, na ordem de `ids`"""
+        lote = self.repository.get_many(ids)
+        return LoteResponse[UsuarioAdvogadoResponse](
+            itens=[UsuarioAdvogadoResponse.model_validate(u) for u in lote.encontrados],
+            ids_nao_encontrados=lote.ids_nao_encontrados
+        )
+
     def listar_usuarios(self, skip: int = 0, limit: int = 100) -> List[UsuarioAdvogadoResponse]:
         usuarios = self.repository.get_all(skip=skip, limit=limit)
         return [UsuarioAdvogadoResponse.model_validate(u) for u in usuarios]
@@ -70,5 +82,7 @@ class UsuarioAdvogadoService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Usuário advogado não encontrado"
             )
+        # As sessões do usuário perdem o vínculo (usuario_id = NULL): ETags das unidades onde ele as abriu
+        agendar_versoes_sessoes(self.db, SessaoRepository(self.db).get_coworking_ids(usuario_id=usuario_id))
         return self.repository.delete(db_usuario)
 
@@ -0,0 +1,124 @@
+"""
+Servidor de produção com múltiplos workers (gunicorn + workers uvicorn).
+
+- A aplicação é pré-carregada no processo mestre (preload): os imports são feitos
+  uma única vez e os workers sobem por fork, com a memória compartilhada
+- As tabelas/índices são verificados uma vez no mestre, e não em cada worker
+- Após o fork, cada worker descarta as conexões herdadas e abre o próprio pool
+  (reiniciar_pools_apos_fork): conexões nunca são compartilhadas entre processos
+- No SIGTERM, os workers param de aceitar conexões e concluem as requisições em
+  andamento por até SERVIDOR_TIMEOUT_GRACIOSO segundos; o shutdown da aplicação
+  fecha o pool
+- Feed de ocupação (/ocupacao): com PostgreSQL os eventos cruzam os workers por
+  LISTEN/NOTIFY (uma conexão extra por worker com clientes conectados); com
+  MySQL/SQLite e mais de um worker, o feed é recusado
+
+Número de workers: SERVIDOR_WORKERS, WEB_CONCURRENCY ou os núcleos disponíveis
+ao processo. Cada worker mantém o próprio pool (até pool_size + max_overflow
+conexões, 15 por padrão no SQLAlchemy): workers x 15 deve caber no limite de
+conexões do banco.
+
+Execução (Linux/macOS; no Windows use uvicorn):
+    python -m src.servidor
+    python -m src.servidor --workers 4 --bind 0.0.0.0:8000
+"""
+import argparse
+import os
+from typing import Optional
+
+from gunicorn.app.base import BaseApplication
+
+
+SERVIDOR_HOST = os.getenv("SERVIDOR_HOST", "0.0.0.0")
+SERVIDOR_PORTA = int(os.getenv("PORT", os.getenv("SERVIDOR_PORTA", "8000")))
+SERVIDOR_TIMEOUT = int(os.getenv("SERVIDOR_TIMEOUT", "120"))
+SERVIDOR_TIMEOUT_GRACIOSO = int(os.getenv("SERVIDOR_TIMEOUT_GRACIOSO", "30"))
+SERVIDOR_KEEPALIVE = int(os.getenv("SERVIDOR_KEEPALIVE", "5"))
+
+
+def nucleos_disponiveis() -> int:
+    """Núcleos que este processo pode usar (respeita a afinidade de CPU, ex.: containers)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def calcular_workers() -> int:
+    """
+    Workers uvicorn são assíncronos: um por núcleo aproveita todos os núcleos sem
+    multiplicar conexões com o banco além do necessário.
+    """
+    configurado = os.getenv("SERVIDOR_WORKERS") or os.getenv("WEB_CONCURRENCY")
+    if configurado:
+        return max(1, int(configurado))
+    return max(1, nucleos_disponiveis())
+
+
+def _classe_worker() -> str:
+    # uvicorn.workers foi movido para o pacote uvicorn-worker nas versões recentes
+    try:
+        import uvicorn_worker  # noqa: F401
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def _apos_fork(server, worker) -> None:
+    from src.database.connection import reiniciar_pools_apos_fork
+    reiniciar_pools_apos_fork()
+
+
+class ServidorOAB(BaseApplication):
+    def __init__(self, opcoes: dict):
+        self.opcoes = opcoes
+        super().__init__()
+
+    def load_config(self) -> None:
+        for chave, valor in self.opcoes.items():
+            self.cfg.set(chave, valor)
+
+    def load(self):
+        # Com preload_app, executado uma vez no mestre antes do fork
+        import src.main
+        from src.database.connection import encerrar_pools
+
+        from src.services.ocupacao_service import ocupacao_hub
+        ocupacao_hub.configurar_workers(self.cfg.workers)
+        if not ocupacao_hub.feed_disponivel():
+            print("⚠️  Feed de ocupação (/ocupacao) desativado: com vários workers requer PostgreSQL (LISTEN/NOTIFY)")
+
+        if src.main.CRIAR_TABELAS_NA_INICIALIZACAO:
+            src.main.criar_tabelas()
+            src.main.CRIAR_TABELAS_NA_INICIALIZACAO = False
+            # O mestre não atende requisições: nenhuma conexão deve sobreviver ao fork
+            encerrar_pools()
+        return src.main.app
+
+
+def opcoes_servidor(workers: Optional[int] = None, bind: Optional[str] = None) -> dict:
+    return {
+        "bind": bind or f"{SERVIDOR_HOST}:{SERVIDOR_PORTA}",
+        "workers": workers or calcular_workers(),
+        "worker_class": _classe_worker(),
+        "preload_app": True,
+        "post_fork": _apos_fork,
+        "timeout": SERVIDOR_TIMEOUT,
+        "graceful_timeout": SERVIDOR_TIMEOUT_GRACIOSO,
+        "keepalive": SERVIDOR_KEEPALIVE,
+        "accesslog": "-",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor de produção da API (gunicorn + uvicorn)")
+    parser.add_argument("--workers", type=int, help="Número de workers (padrão: SERVIDOR_WORKERS, WEB_CONCURRENCY ou núcleos)")
+    parser.add_argument("--bind", help=f"Endereço (padrão: {SERVIDOR_HOST}:{SERVIDOR_PORTA})")
+    args = parser.parse_args()
+
+    opcoes = opcoes_servidor(args.workers, args.bind)
+    print(f"🚀 {opcoes['workers']} workers em {opcoes['bind']} ({opcoes['worker_class']})")
+    ServidorOAB(opcoes).run()
+
+
+if __name__ == "__main__":
+    main()
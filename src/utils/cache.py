@@ -0,0 +1,100 @@
+"""
+Cache de resultados com backend plugável.
+
+O backend padrão é um LRU em memória (por processo). Para compartilhar o cache
+entre workers, implemente CacheBackend sobre um armazenamento externo (ex.: Redis)
+e registre-o com o método configurar_backend do cache que o utiliza.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Interface mínima de um armazenamento de cache"""
+
+    @abstractmethod
+    def get(self, chave: str) -> Optional[Any]:
+        """Retorna o valor armazenado ou None se ausente/expirado"""
+
+    @abstractmethod
+    def set(self, chave: str, valor: Any, ttl: float) -> None:
+        """Armazena o valor por `ttl` segundos"""
+
+    @abstractmethod
+    def delete(self, chave: str) -> None:
+        """Remove a chave (se existir)"""
+
+    def tamanho(self) -> Optional[int]:
+        """Quantidade de entradas armazenadas (None se o backend não souber informar)"""
+        return None
+
+
+class LRUCacheBackend(CacheBackend):
+    """Cache em memória com política LRU e expiração por TTL"""
+
+    def __init__(self, max_entradas: int = 1024):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            expira_em, valor = entrada
+            if expira_em < time.monotonic():
+                del self._entradas[chave]
+                return None
+            self._entradas.move_to_end(chave)
+            return valor
+
+    def set(self, chave: str, valor: Any, ttl: float) -> None:
+        with self._lock:
+            self._entradas[chave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def delete(self, chave: str) -> None:
+        with self._lock:
+            self._entradas.pop(chave, None)
+
+    def tamanho(self) -> Optional[int]:
+        with self._lock:
+            return len(self._entradas)
+
+
+class CacheMetricas:
+    """Contadores de acertos/erros de um cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+
+    def registrar_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def registrar_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def registrar_invalidacao(self) -> None:
+        with self._lock:
+            self.invalidacoes += 1
+
+    def como_dict(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": (self.hits / total) if total else 0.0,
+            }
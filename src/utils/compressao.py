@@ -0,0 +1,201 @@
+"""
+Compressão das respostas HTTP (gzip, e brotli/zstd quando instalados).
+
+O middleware comprime apenas respostas completas (um único corpo) cujo tipo seja
+texto/JSON/MessagePack e cujo tamanho atinja COMPRESSAO_TAMANHO_MINIMO. Ficam de fora:
+- respostas em streaming (SSE, exportações NDJSON/CSV): o corpo chega em partes
+  (more_body) e é repassado sem alteração
+- websockets, HEAD, 204/304 e respostas que já possuem Content-Encoding
+- corpos que não diminuem ao comprimir
+
+A codificação é escolhida pelo Accept-Encoding do cliente (maior q); em caso de
+empate, prefere zstd > br > gzip. As ETags da API são fracas (W/"..."), então
+continuam válidas para as versões comprimidas.
+
+Configuração:
+- COMPRESSAO_HABILITADA (padrão: true)
+- COMPRESSAO_TAMANHO_MINIMO em bytes (padrão: 1024)
+- COMPRESSAO_NIVEL_GZIP (1-9, padrão: 6), COMPRESSAO_NIVEL_BROTLI (0-11, padrão: 4)
+  e COMPRESSAO_NIVEL_ZSTD (1-22, padrão: 3)
+
+Para escolher os níveis: python -m benchmarks.bench_compressao
+"""
+import gzip
+import os
+from typing import Callable, Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.negociacao import ler_qualidades
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende do ambiente
+    zstandard = None
+
+
+COMPRESSAO_HABILITADA = os.getenv("COMPRESSAO_HABILITADA", "true").lower() in ("1", "true", "sim")
+COMPRESSAO_TAMANHO_MINIMO = int(os.getenv("COMPRESSAO_TAMANHO_MINIMO", "1024"))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+COMPRESSAO_NIVEL_ZSTD = int(os.getenv("COMPRESSAO_NIVEL_ZSTD", "3"))
+
+# Corpos maiores que isso são comprimidos fora do loop de eventos
+# (zlib, brotli e zstd liberam o GIL durante a compressão)
+TAMANHO_COMPRESSAO_EM_THREAD = 256 * 1024
+
+# MessagePack: as listagens tabulares não repetem os nomes dos campos, mas os
+# valores (datas ISO, nomes de salas e advogados) se repetem e comprimem bem
+_TIPOS_COMPRIMIVEIS = (
+    "application/json", "application/msgpack", "application/javascript", "application/xml", "image/svg+xml",
+)
+
+
+def _gzip(corpo: bytes, nivel: int) -> bytes:
+    # mtime=0: a mesma resposta gera sempre os mesmos bytes
+    return gzip.compress(corpo, compresslevel=nivel, mtime=0)
+
+
+def _brotli(corpo: bytes, nivel: int) -> bytes:
+    return brotli.compress(corpo, quality=nivel)
+
+
+def _zstd(corpo: bytes, nivel: int) -> bytes:
+    return zstandard.ZstdCompressor(level=nivel).compress(corpo)
+
+
+def compressores_disponiveis() -> Dict[str, Callable[[bytes, int], bytes]]:
+    """Codificações suportadas neste ambiente, na ordem de preferência do servidor"""
+    compressores = {}
+    if zstandard is not None:
+        compressores["zstd"] = _zstd
+    if brotli is not None:
+        compressores["br"] = _brotli
+    compressores["gzip"] = _gzip
+    return compressores
+
+
+def niveis_padrao() -> Dict[str, int]:
+    return {"zstd": COMPRESSAO_NIVEL_ZSTD, "br": COMPRESSAO_NIVEL_BROTLI, "gzip": COMPRESSAO_NIVEL_GZIP}
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis) -> Optional[str]:
+    """
+    Escolhe a codificação a partir do header Accept-Encoding.
+
+    Considera os valores q (q=0 recusa a codificação) e o curinga "*".
+    Retorna None se nenhuma codificação disponível for aceita.
+    """
+    qualidades = ler_qualidades(accept_encoding)
+    curinga = qualidades.get("*", 0.0)
+    candidatas = [
+        (qualidades.get(codificacao, curinga), -posicao, codificacao)
+        for posicao, codificacao in enumerate(disponiveis)
+    ]
+    q, _, codificacao = max(candidatas, default=(0.0, 0, None))
+    return codificacao if q > 0 else None
+
+
+def tipo_comprimivel(content_type: str) -> bool:
+    tipo = content_type.split(";")[0].strip().lower()
+    if tipo == "text/event-stream":
+        return False
+    return tipo.startswith("text/") or tipo in _TIPOS_COMPRIMIVEIS or tipo.endswith("+json")
+
+
+class MiddlewareCompressao:
+    """Middleware ASGI que comprime respostas completas acima do tamanho mínimo"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tamanho_minimo: int = COMPRESSAO_TAMANHO_MINIMO,
+        niveis: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.niveis = {**niveis_padrao(), **(niveis or {})}
+        self.compressores = compressores_disponiveis()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""), self.compressores)
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _EnvioComprimido(self, codificacao, send))
+
+    def elegivel(self, inicio: Message) -> bool:
+        """Decide pelo status e headers se a resposta pode ser comprimida"""
+        if inicio["status"] < 200 or inicio["status"] in (204, 304):
+            return False
+        headers = Headers(raw=inicio["headers"])
+        if "content-encoding" in headers or not tipo_comprimivel(headers.get("content-type", "")):
+            return False
+        tamanho = headers.get("content-length")
+        return tamanho is None or int(tamanho) >= self.tamanho_minimo
+
+    async def comprimir(self, corpo: bytes, codificacao: str) -> bytes:
+        compressor = self.compressores[codificacao]
+        nivel = self.niveis[codificacao]
+        if len(corpo) > TAMANHO_COMPRESSAO_EM_THREAD:
+            return await run_in_threadpool(compressor, corpo, nivel)
+        return compressor(corpo, nivel)
+
+
+class _EnvioComprimido:
+    """
+    Intercepta as mensagens da resposta: o início é retido até o primeiro corpo
+    para saber se a resposta é completa (comprime) ou em streaming (repassa).
+    """
+
+    def __init__(self, middleware: MiddlewareCompressao, codificacao: str, send: Send):
+        self.middleware = middleware
+        self.codificacao = codificacao
+        self.send = send
+        self.inicio: Optional[Message] = None
+        self.repassar = False
+
+    async def __call__(self, mensagem: Message) -> None:
+        if self.repassar:
+            await self.send(mensagem)
+            return
+
+        if mensagem["type"] == "http.response.start":
+            if self.middleware.elegivel(mensagem):
+                self.inicio = mensagem
+            else:
+                self.repassar = True
+                await self.send(mensagem)
+            return
+
+        if mensagem["type"] != "http.response.body" or self.inicio is None:
+            await self.send(mensagem)
+            return
+
+        self.repassar = True
+        corpo = mensagem.get("body", b"")
+        if mensagem.get("more_body", False) or len(corpo) < self.middleware.tamanho_minimo:
+            # Streaming (SSE, exportações) ou corpo pequeno: envia como está
+            await self.send(self.inicio)
+            await self.send(mensagem)
+            return
+
+        comprimido = await self.middleware.comprimir(corpo, self.codificacao)
+        headers = MutableHeaders(scope=self.inicio)
+        headers.add_vary_header("Accept-Encoding")
+        if len(comprimido) >= len(corpo):
+            await self.send(self.inicio)
+            await self.send(mensagem)
+            return
+        headers["Content-Encoding"] = self.codificacao
+        headers["Content-Length"] = str(len(comprimido))
+        await self.send(self.inicio)
+        await self.send({"type": "http.response.body", "body": comprimido})
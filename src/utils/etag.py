@@ -0,0 +1,51 @@
+"""
+Suporte a ETag / GET condicional.
+
+As ETags são fracas (W/"...") e calculadas a partir de marcadores de versão
+(tabela Versao_cache) e dos parâmetros da requisição, sem serializar o corpo
+da resposta. Se o If-None-Match do cliente corresponder, a rota responde 304
+antes de executar as consultas pesadas.
+
+As rotas com ETag negociam o formato (JSON ou MessagePack, ver
+src.utils.serializacao): a ETag distingue as duas representações e o 304 leva
+Vary: Accept, como a resposta completa.
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from src.utils.serializacao import prefere_msgpack
+
+
+def gerar_etag(*partes) -> str:
+    """Gera uma ETag fraca a partir das partes informadas"""
+    conteudo = "|".join(str(p) for p in partes).encode("utf-8")
+    return f'W/"{hashlib.sha1(conteudo).hexdigest()[:20]}"'
+
+
+def _normalizar(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_corresponde(request: Request, etag: str) -> bool:
+    """Compara a ETag com o header If-None-Match (comparação fraca)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = _normalizar(etag)
+    return any(_normalizar(candidata) == alvo for candidata in if_none_match.split(","))
+
+
+def resposta_condicional(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Define o header ETag da resposta e retorna uma resposta 304 se o cliente
+    já possui a versão atual (None caso contrário).
+    """
+    if prefere_msgpack(request.headers.get("accept")):
+        etag = gerar_etag(etag, "msgpack")
+    if etag_corresponde(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Vary": "Accept"})
+    response.headers["ETag"] = etag
+    return None
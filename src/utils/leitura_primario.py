@@ -0,0 +1,45 @@
+"""
+Read-your-writes por cliente com réplica de leitura.
+
+O middleware abre, para cada requisição HTTP, o registro de escritas de
+src.database.connection. Se a requisição confirmou uma escrita de sessão
+(registrar_escrita), a resposta leva o instante até o qual as leituras daquele
+cliente devem ir ao primário, no cookie LEITURA_PRIMARIO_COOKIE e no header
+LEITURA_PRIMARIO_HEADER. Navegadores reenviam o cookie automaticamente; outros
+clientes podem reenviar o header. get_read_db compara o valor com o relógio.
+
+Só é instalado quando DATABASE_REPLICA_URL está configurada.
+"""
+import math
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.database.connection import (
+    iniciar_requisicao, LEITURA_PRIMARIO_COOKIE, LEITURA_PRIMARIO_HEADER, REPLICA_JANELA_LEITURA_PRIMARIO,
+)
+
+
+class MiddlewareLeituraPrimario:
+    """Middleware ASGI que devolve o cookie/header de leitura no primário após uma escrita"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        estado = iniciar_requisicao()
+
+        async def enviar(mensagem: Message) -> None:
+            if mensagem["type"] == "http.response.start" and estado["ate"] is not None:
+                ate = f"{estado['ate']:.3f}"
+                headers = MutableHeaders(scope=mensagem)
+                headers.append(LEITURA_PRIMARIO_HEADER, ate)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LEITURA_PRIMARIO_COOKIE}={ate}; Max-Age={math.ceil(REPLICA_JANELA_LEITURA_PRIMARIO)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
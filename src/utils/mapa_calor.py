@@ -0,0 +1,38 @@
+"""
+Montagem de mapas de calor (dia da semana x hora) com NumPy.
+
+O banco devolve apenas as combinações que tiveram sessões (trincas esparsas
+dia/hora/quantidade); aqui elas viram uma matriz densa 7x24, com linhas de
+segunda (0) a domingo (6). O NumPy é importado no primeiro uso, para não pesar
+na inicialização dos workers.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+DIAS_DA_SEMANA = 7
+HORAS_DO_DIA = 24
+
+
+def matriz_dia_hora(trincas: Iterable[Tuple[int, int, int]], domingo_primeiro: bool = True):
+    """
+    Matriz densa (7, 24) de int64 a partir de trincas (dia_semana, hora, quantidade).
+
+    Com domingo_primeiro=True (convenção do SQL: 0 = domingo), os dias são
+    deslocados para que a linha 0 seja segunda-feira. Trincas repetidas são somadas.
+    """
+    import numpy as np
+
+    dados = np.array(list(trincas), dtype=np.int64).reshape(-1, 3)
+    matriz = np.zeros((DIAS_DA_SEMANA, HORAS_DO_DIA), dtype=np.int64)
+    if len(dados):
+        dias = (dados[:, 0] + 6) % 7 if domingo_primeiro else dados[:, 0]
+        np.add.at(matriz, (dias, dados[:, 1]), dados[:, 2])
+    return matriz
+
+
+def matriz_de_horas(sessoes_por_hora: Dict[datetime, int]):
+    """Matriz (7, 24) a partir de contagens por hora (ex.: agregados do arquivo Parquet)"""
+    return matriz_dia_hora(
+        ((hora.weekday(), hora.hour, quantidade) for hora, quantidade in sessoes_por_hora.items()),
+        domingo_primeiro=False,
+    )
@@ -0,0 +1,29 @@
+"""
+Leitura dos headers de negociação HTTP (Accept, Accept-Encoding).
+
+Usado pela escolha do formato da resposta (src.utils.serializacao) e da
+codificação de compressão (src.utils.compressao).
+"""
+from typing import Dict
+
+
+def ler_qualidades(header: str) -> Dict[str, float]:
+    """
+    Valores do header (em minúsculas) com seus valores q.
+
+    Sem q, o valor vale 1.0; um q inválido vale 0 (recusa).
+    """
+    qualidades: Dict[str, float] = {}
+    for item in header.lower().split(","):
+        partes = [parte.strip() for parte in item.split(";")]
+        if not partes[0]:
+            continue
+        q = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        qualidades[partes[0]] = q
+    return qualidades
@@ -2,7 +2,6 @@ import os
 import hashlib
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 import bcrypt
 
 # Configurações JWT
@@ -81,6 +80,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    # Import tardio: python-jose carrega os backends de criptografia na importação
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -95,6 +96,7 @@ def verify_token(token: str) -> Optional[dict]:
     Returns:
         Dicionário com os dados do token se válido, None caso contrário
     """
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -0,0 +1,233 @@
+"""
+Serialização rápida de respostas JSON.
+
+As listagens grandes (ex.: /sessoes com limit=1000) montam dicionários simples
+a partir das linhas do banco e os serializam direto para bytes, sem passar pelo
+Pydantic duas vezes (model_validate no service + response_model no FastAPI).
+O response_model continua declarado nas rotas apenas para a documentação.
+
+Usa orjson quando instalado; caso contrário, recorre ao json da biblioteca padrão.
+
+As listagens também podem ser enviadas em MessagePack (Accept: application/msgpack),
+para clientes em links lentos. As linhas projetadas do repositório (Tabela) são
+codificadas direto em formato tabular, sem repetir os nomes dos campos em cada item:
+
+    {"colunas": ["sessao_id", "data", ...], "linhas": [[1, "2025-01-01", ...], ...]}
+
+Datas seguem como strings ISO 8601. Objetos únicos (ex.: dashboard) mantêm a
+estrutura do JSON. Requer o pacote msgpack no servidor.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from src.utils.negociacao import ler_qualidades
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+_TIPOS_MSGPACK = (MEDIA_TYPE_MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+_TIPOS_JSON = ("application/json", "application/*", "*/*")
+
+DESCRICAO_MSGPACK = """
+
+    **MessagePack:** com `Accept: application/msgpack`, a lista é enviada em MessagePack no
+    formato tabular `{"colunas": [...], "linhas": [[...], ...]}` (uma linha por item, nas
+    colunas planas da consulta; datas como strings ISO 8601).
+    """
+
+
+class Tabela(NamedTuple):
+    """
+    Linhas projetadas do repositório (dicionários planos) de uma listagem.
+
+    Em JSON, cada linha passa por `converter` (ex.: para a estrutura aninhada do
+    schema de resposta); em MessagePack, as colunas são enviadas como estão.
+    """
+    linhas: List[dict]
+    colunas: List[str]
+    converter: Optional[Callable[[dict], Any]] = None
+
+    def para_objetos(self) -> List[Any]:
+        if self.converter is None:
+            return self.linhas
+        return [self.converter(linha) for linha in self.linhas]
+
+
+def _padrao(valor: Any) -> Any:
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def para_json(conteudo: Any) -> bytes:
+    """Serializa dicts/listas (com date/datetime/Enum) para bytes JSON"""
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_padrao)
+    return json.dumps(conteudo, default=_padrao, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def para_msgpack(conteudo: Any) -> bytes:
+    """Serializa dicts/listas (com date/datetime/Enum) para bytes MessagePack"""
+    return msgpack.packb(conteudo, default=_padrao, use_bin_type=True)
+
+
+def _indices_temporais(linhas: List[dict], colunas: List[str]) -> List[int]:
+    """Colunas com date/datetime, pelo primeiro valor não nulo de cada uma"""
+    pendentes = dict(enumerate(colunas))
+    temporais = []
+    for linha in linhas:
+        for indice, coluna in list(pendentes.items()):
+            valor = linha[coluna]
+            if valor is not None:
+                del pendentes[indice]
+                if isinstance(valor, (date, datetime)):
+                    temporais.append(indice)
+        if not pendentes:
+            break
+    return temporais
+
+
+def tabela_para_msgpack(tabela: Tabela) -> bytes:
+    """
+    Codifica as linhas projetadas em formato tabular.
+
+    As datas são convertidas só nas colunas temporais: o hook `default` do msgpack
+    (uma chamada Python por valor) custaria mais que a própria codificação.
+    """
+    obter = itemgetter(*tabela.colunas) if len(tabela.colunas) > 1 else (lambda linha: (linha[tabela.colunas[0]],))
+    temporais = _indices_temporais(tabela.linhas, tabela.colunas)
+    if temporais:
+        linhas = []
+        for linha in tabela.linhas:
+            valores = list(obter(linha))
+            for indice in temporais:
+                if valores[indice] is not None:
+                    valores[indice] = valores[indice].isoformat()
+            linhas.append(valores)
+    else:
+        linhas = [obter(linha) for linha in tabela.linhas]
+    return para_msgpack({"colunas": tabela.colunas, "linhas": linhas})
+
+
+class RespostaJSONRapida(Response):
+    """Resposta JSON que serializa o conteúdo sem validação adicional"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return para_json(content)
+
+
+class RespostaMsgpack(Response):
+    """Resposta MessagePack com a mesma estrutura da resposta JSON"""
+    media_type = MEDIA_TYPE_MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, Tabela):
+            return tabela_para_msgpack(content)
+        return para_msgpack(content)
+
+
+def prefere_msgpack(accept: Optional[str]) -> bool:
+    """
+    Indica se o cliente pede MessagePack.
+
+    Levanta 406 se apenas MessagePack for aceito e o pacote msgpack não estiver instalado.
+    """
+    if not accept:
+        return False
+    qualidades = ler_qualidades(accept)
+    q_msgpack = max((qualidades.get(tipo, 0.0) for tipo in _TIPOS_MSGPACK), default=0.0)
+    q_json = max((qualidades.get(tipo, 0.0) for tipo in _TIPOS_JSON), default=0.0)
+    if q_msgpack <= 0 or q_msgpack < q_json:
+        return False
+    if msgpack is None:
+        if q_json > 0:
+            return False
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="MessagePack não está disponível no servidor; use Accept: application/json"
+        )
+    return True
+
+
+def resposta_negociada(request: Request, conteudo: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Resposta em JSON ou MessagePack conforme o header Accept.
+
+    O conteúdo (Tabela de linhas projetadas, dicts/listas ou um modelo Pydantic)
+    é serializado direto, sem passar pelo response_model da rota.
+    """
+    if isinstance(conteudo, BaseModel):
+        conteudo = conteudo.model_dump()
+    if prefere_msgpack(request.headers.get("accept")):
+        resposta = RespostaMsgpack(conteudo, headers=headers)
+    else:
+        if isinstance(conteudo, Tabela):
+            conteudo = conteudo.para_objetos()
+        resposta = RespostaJSONRapida(conteudo, headers=headers)
+    # Caches intermediários devem separar as representações por Accept
+    resposta.headers.add_vary_header("Accept")
+    return resposta
+
+
+def gerar_ndjson(itens: Iterable[Any], linhas_por_bloco: int = 500) -> Iterator[bytes]:
+    """
+    Serializa os itens como NDJSON (um objeto por linha), em blocos de bytes.
+
+    O primeiro item sai sozinho, assim que é lido, para o cliente não esperar um bloco inteiro.
+    """
+    bloco = []
+    limite = 1
+    for item in itens:
+        bloco.append(para_json(item))
+        if len(bloco) >= limite:
+            yield b"\n".join(bloco) + b"\n"
+            bloco = []
+            limite = linhas_por_bloco
+    if bloco:
+        yield b"\n".join(bloco) + b"\n"
+
+
+def gerar_csv(linhas: Iterable[Dict[str, Any]], colunas: List[str], linhas_por_bloco: int = 500) -> Iterator[bytes]:
+    """
+    Serializa dicionários planos como CSV (com cabeçalho), em blocos de bytes.
+
+    O cabeçalho é enviado de imediato e a primeira linha sai sozinha, para o
+    cliente não esperar um bloco inteiro; as demais seguem em blocos de linhas_por_bloco.
+    """
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=colunas, extrasaction="ignore")
+    escritor.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate(0)
+    pendentes = 0
+    limite = 1
+    for linha in linhas:
+        escritor.writerow(linha)
+        pendentes += 1
+        if pendentes >= limite:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pendentes = 0
+            limite = linhas_por_bloco
+    if pendentes:
+        yield buffer.getvalue().encode("utf-8")